@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+bench_startup.py — Cold-start cost of each entry point
+======================================================
+Runs every entry point in a fresh interpreter, the way a user or a script
+launches it, and reports
+  • wall time        (min / median over --runs launches, process start to exit)
+  • import time      (sum of the top-level imports, from python -X importtime)
+  • heavy modules    (whether pandas or matplotlib got imported at all)
+
+The first launch of each entry point is a warm-up (it also writes the
+dashboard's parse cache) and is the one -X importtime is read from; it is not
+counted in the wall times.
+
+Usage
+-----
+  python3 bench_startup.py                                # 5 launches each
+  python3 bench_startup.py --runs 20
+  python3 bench_startup.py --csv /path/to/results.csv
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+HEAVY = ("pandas", "matplotlib")
+
+
+def entry_points(csv_path):
+    """(label, python arguments) for every entry point worth timing."""
+    entries = [
+        ("import ntn_links",        ["-c", "import ntn_links"]),
+        ("import ntn_dashboard",    ["-c", "import ntn_dashboard"]),
+        ("dashboard --cli",         ["ntn_dashboard.py", "--csv", csv_path, "--cli", "--tick", "0"]),
+        ("dashboard --format csv",  ["ntn_dashboard.py", "--csv", csv_path, "--format", "csv", "--tick", "0"]),
+        ("import ntn_mlm",          ["-c", "import ntn_mlm"]),
+    ]
+    if os.path.exists(os.path.join(HERE, "ntn_delay_model.pkl")):
+        entries.append(("ntn_mlm --predict", ["ntn_mlm.py", "--predict"]))
+    return entries
+
+
+def launch(args, importtime=False):
+    """Run python with args from the repo root; (seconds, stderr)."""
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + args
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - t0
+    if proc.returncode:
+        raise SystemExit(f"[error] {' '.join(args)} exited {proc.returncode}:\n{proc.stderr[-2000:]}")
+    return elapsed, proc.stderr
+
+
+def parse_importtime(stderr):
+    """(top-level import ms, set of top-level packages imported) from -X importtime output."""
+    total_us, packages = 0, set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue                                    # the column header
+        packages.add(name.strip().split(".")[0])
+        if not name[1:].startswith(" "):               # not nested under another import
+            total_us += int(cumulative)
+    return total_us / 1000, packages
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the cold-start cost of each entry point")
+    ap.add_argument("--runs", type=int, default=5, help="Timed launches per entry point (default 5)")
+    ap.add_argument("--csv", default="simulation results.csv",
+                    help='Results CSV for the dashboard entry points (default: "simulation results.csv")')
+    args = ap.parse_args()
+
+    print(f"Startup benchmark — {os.path.basename(sys.executable)}, {args.runs} launches per entry point")
+    hdr = (f"  {'entry point':<24} {'min ms':>8} {'median ms':>10} {'import ms':>10} "
+           + " ".join(f"{m:>10}" for m in HEAVY))
+    print(hdr)
+    print("  " + "─" * (len(hdr) - 2))
+    for label, argv in entry_points(args.csv):
+        _, stderr = launch(argv, importtime=True)
+        import_ms, packages = parse_importtime(stderr)
+        times = [launch(argv)[0] * 1000 for _ in range(args.runs)]
+        print(f"  {label:<24} {min(times):>8.0f} {statistics.median(times):>10.0f} {import_ms:>10.0f} "
+              + " ".join(f"{'loaded' if m in packages else '-':>10}" for m in HEAVY))
+    print("\n  import ms = time spent in top-level imports on the warm-up launch (-X importtime)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,30 @@
 #!/usr/bin/env python3
 
+import argparse
+import base64
 import csv 
-import subprocess
+import json
+import os
 import time 
 import math 
-from collections import defaultdict
 import sys
 import signal
+import threading
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from array import array
+
+import numpy as np
+
+from link_table import DOWN, DelayView, LinkTable
+from netns_backend import KernelBackend, Netem, SimulatedBackend, netem_matches
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # ntn_links.py, ntn_mlm.py and the model live here
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+import ntn_links
 
 sys.stdout.reconfigure(line_buffering=True)
 CSV_FILE = "simulation results.csv"
@@ -23,8 +41,10 @@ def signal_handler(sig, frame):
 signal.signal(signal.SIGINT, signal_handler)
 
 # Linking satellite names to interfaces
+# (hand-written for the 6-satellite topology; main() swaps in a generated
+# LinkTable with --topology mesh:N or --topology netns)
 
-LINK_MAP = {
+LINK_MAP = LinkTable.from_link_map({
     # R1 (Sat1) connections
     "Sat1-Sat2": {"ns": "r1", "iface": "v-r1-r2"},
     "Sat1-Sat3": {"ns": "r1", "iface": "v-r1-r3"},
@@ -65,147 +85,951 @@ LINK_MAP = {
     # Host connections
     "Host1-Sat4": {"ns": "h1", "iface": "v-h1-r4"},
     "Host2-Sat6": {"ns": "h2", "iface": "v-h2-r6"},
-}
+})
+
+# Above this many links, per-link lines are replaced by one summary line per tick
+VERBOSE_LINKS = 64
 
 # Cleanup function to ensure topology is normal 
 def cleanup_topology():
     
     print("\n Resetting Topology to default state")
-    for link_key, link_info in LINK_MAP.items():
-        ns = link_info["ns"]
-        iface = link_info["iface"]
-        
-        # Remove all network emulation (delay, loss, jitter)
-        run(f"ip netns exec {ns} tc qdisc del dev {iface} root 2>/dev/null || true", quiet=True)
-        print(f"  Reset {link_key} ({ns}:{iface})")
-    
-    print("\n All interfaces reset to normal state")
+    verbose = len(LINK_MAP) <= VERBOSE_LINKS
+    for ns, ids in LINK_MAP.by_namespace().items():
+        # Remove all network emulation (delay, loss, jitter), one tc process per namespace,
+        # and bring back up every interface a DOWN link set admin-down
+        BACKEND.qdisc_batch(ns, [("del", LINK_MAP.ifaces[i], None) for i in ids], quiet=True)
+        BACKEND.link_batch(ns, [(LINK_MAP.ifaces[i], True) for i in ids], quiet=True)
+        if verbose:
+            for i in ids:
+                print(f"  Reset {LINK_MAP.names[i]} ({ns}:{LINK_MAP.ifaces[i]})")
+    LINK_MAP.applied = None
+    LINK_MAP.applied_rates = None
 
-# Simulating delay
-def compute_delay_ms(alt_a, alt_b, x1, y1, x2, y2):
-    # Estimate delay based on altitude and distance 
-    distance = math.sqrt((x2-x1)**2 + (y2-y1)**2)
-    average_alt = (alt_a + alt_b) / 2
-    base_delay = average_alt * 8 # this and distance delay currently are arbritrary values until we know what we are making them
-    distance_delay = distance * 0.05
-    return round(base_delay + distance_delay, 1)
+    print(f"\n All interfaces reset to normal state ({len(LINK_MAP)} links)")
 
-def compute_jitter(delay_ms):
-    return round(delay_ms * 0.05, 1) # 5% jitter 
+# Simulating delay: the link model (altitude + distance delay, 5% jitter) lives in
+# ntn_links.py, shared with NTN.py, ntn_mlm.py and the dashboard.
+# Both take arrays, e.g. all the links of a tick at once (tick_delays).
+compute_delay_ms = ntn_links.delay_ms
+compute_jitter = ntn_links.jitter_ms
 
 
 # Applying these to actual namespace using TC NETEM
 
 DRY_RUN = True # Flip to false for actual implementation, using this to test 
 
-def run(cmd, quiet=False):
-    # Logic to prevent it from running
-    if DRY_RUN and not quiet: 
-        print(f" [DRY RUN] {cmd}")
-        return 
-    elif DRY_RUN and quiet:
-        return
-    
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    if result.returncode != 0 and "File exists" not in result.stderr and "No such file" not in result.stderr:
-        print(f"[warn] {cmd} \n {result.stderr.strip()}")
+# Every tc/vtysh operation goes through the backend (netns_backend.py);
+# main() swaps in a SimulatedBackend with --backend sim
+BACKEND = KernelBackend(dry_run=DRY_RUN)
 
+# Held while qdiscs are written and LINK_MAP.applied is updated, so the reconciler
+# never compares a namespace against a half-applied tick
+APPLY_LOCK = threading.Lock()
 
-def apply_link_up(link_key, delay_ms, jitter_ms):
-    if link_key not in LINK_MAP:
-        return 
-    ns = LINK_MAP[link_key]["ns"]
-    iface = LINK_MAP[link_key]["iface"]
 
-    # Remove any existing qdisc first to avoid conflicts
-    run(f"ip netns exec {ns} tc qdisc del dev {iface} root 2>/dev/null || true", quiet=True)
+# BANDWIDTH / QUEUE EMULATION
 
-    # Add new qdisc with delay
-    run(f"ip netns exec {ns} tc qdisc add dev {iface} root netem delay {delay_ms}ms {jitter_ms}ms distribution normal loss 0%")
-    print(f"  {link_key}: delay={delay_ms}ms +- {jitter_ms}ms --> UP")
+DEFAULT_BANDWIDTH_MBPS = 100  # NTN.py gives every Link bandwidth=100; 0 leaves links unshaped
+QUEUE_MS = 50  # queueing a saturated link can build up before it starts tail-dropping
+PACKET_BITS = 1500 * 8
 
-def apply_link_down(link_key):
-    if link_key not in LINK_MAP:
-        return 
-    ns = LINK_MAP[link_key]["ns"]
-    iface = LINK_MAP[link_key]["iface"]
+def queue_limit(delay_ms, rate_mbit):
+    # netem's limit counts every packet it holds, including the ones only waiting out
+    # the delay, so size it to the bandwidth-delay product plus QUEUE_MS of queue
+    hold_ms = delay_ms + 2 * compute_jitter(delay_ms) + QUEUE_MS
+    return max(100, math.ceil(rate_mbit * 1000 * hold_ms / PACKET_BITS))
 
-    # Remove any existing qdisc first
-    run(f"ip netns exec {ns} tc qdisc del dev {iface} root 2>/dev/null || true", quiet=True)
-    
-    # Add loss to simulate down
-    run(f"ip netns exec {ns} tc qdisc add dev {iface} root netem loss 100%")
-    print(f"  {link_key}: --> DOWN, NO LINE OF SIGHT")
+def tick_rates(sat_states):
+    # Per-link capacity in Mbit/s, aligned with LINK_MAP link ids: the lower of the two
+    # endpoints' bandwidth_mbps from the CSV, DEFAULT_BANDWIDTH_MBPS where it has none
+    rates = array('d', [DEFAULT_BANDWIDTH_MBPS]) * len(LINK_MAP)
+    by_node = {}
+    for sat, state in sat_states.items():
+        bw = state.get('bandwidth')
+        if bw is not None and sat in LINK_MAP.node_index:
+            by_node[LINK_MAP.node_index[sat]] = bw
+    if by_node:
+        for i, (a, b) in enumerate(zip(LINK_MAP.end_a, LINK_MAP.end_b)):
+            rates[i] = min(by_node.get(a, DEFAULT_BANDWIDTH_MBPS), by_node.get(b, DEFAULT_BANDWIDTH_MBPS))
+    return rates
+
+def link_netem(delay_ms, rate_mbit=0):
+    # UP: delay + jitter, shaped to the link's capacity by netem's own rate/limit;
+    # DOWN: 100% loss to simulate no line of sight (apply_tick also sets the interface
+    # admin-down, so OSPF notices without waiting out its dead interval)
+    if delay_ms >= 0:
+        if rate_mbit:
+            return Netem(delay_ms, compute_jitter(delay_ms), 0, rate_mbit, queue_limit(delay_ms, rate_mbit))
+        return Netem(delay_ms, compute_jitter(delay_ms), 0)
+    return Netem(loss_pct=100)
+
+def change_link_delays(updates):
+    # Low-overhead update path for links that already carry a netem qdisc (i.e. are UP):
+    # `qdisc change` instead of replacing it, sent as one `tc -batch` per namespace.
+    # updates is [(link id, delay_ms)]. Returns the number of tc processes spawned.
+    batches = defaultdict(list)
+    with APPLY_LOCK:
+        for i, delay_ms in updates:
+            netem = link_netem(delay_ms, LINK_MAP.applied_rates[i])
+            batches[LINK_MAP.ns_ids[i]].append(("change", LINK_MAP.ifaces[i], netem))
+            LINK_MAP.applied[i] = delay_ms
+        for ns_id, ops in batches.items():
+            BACKEND.qdisc_batch(LINK_MAP.namespaces[ns_id], ops, quiet=True)
+    return len(batches)
 
 # CSV PARSING 
 
-def load_simulation(csv_file, sim_number):
-    ticks = defaultdict(dict)
-    with open(csv_file, newline='') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if int(row['sim_number']) != sim_number:
-                continue 
-            tick = int(row['tick'])
-            sat = row['sat_name']
-            can_see_raw = row['can_see'].strip()
-            can_see = [s.strip() for s in can_see_raw.split(',') if s.strip()] if can_see_raw else []
-            ticks[tick][sat] = {
-                'alt': float(row['orbit_altitude']),
-                'x': float(row['x']),
-                'y': float(row['y']),
-                'can_see': can_see,
-            }
-    return dict(sorted(ticks.items())) # ensures that all elements are done in correct time order 
+# NTN.py only ever appends whole runs to the CSV, so every sim_number occupies a
+# contiguous block of lines. We keep a small byte-offset index next to the CSV
+# (csv_file + ".idx") so a run can be read by seeking straight to it instead of
+# parsing every row of every other run.
+INDEX_SUFFIX = ".idx"
+INDEX_CHECK_BYTES = 64  # tail bytes remembered to detect a rewritten (not appended) file
+
+def _file_tail(f, size):
+    start = max(0, size - INDEX_CHECK_BYTES)
+    f.seek(start)
+    return f.read(size - start).hex()
+
+def build_run_index(csv_file):
+    # Returns {"header": [...], "runs": {sim: {"segments": [[start, end], ...], "rows": n}}}
+    st = os.stat(csv_file)
+    idx_file = csv_file + INDEX_SUFFIX
+    try:
+        with open(idx_file) as f:
+            index = json.load(f)
+        index["runs"] = {int(k): v for k, v in index["runs"].items()}
+    except (OSError, ValueError, KeyError):
+        index = None
+
+    if index and index["size"] == st.st_size and index["mtime"] == st.st_mtime:
+        return index
+
+    with open(csv_file, "rb") as f:
+        # Reuse the old index only if the file has simply grown past it
+        if index and index["size"] <= st.st_size and _file_tail(f, index["size"]) == index["tail"]:
+            pos = index["size"]
+        else:
+            index = {"header": None, "runs": {}}
+            pos = 0
+
+        # Only whole lines are indexed: NTN.py may still be appending the last one,
+        # which the next call picks up once its newline is there
+        f.seek(pos)
+        if pos == 0:
+            header = f.readline()
+            if header.endswith(b"\n"):
+                pos += len(header)
+                index["header"] = next(csv.reader([header.decode("utf-8")]))
+
+        runs = index["runs"]
+        lines = f if pos else ()  # header not complete yet: nothing to index
+        for line in lines:
+            if not line.endswith(b"\n"):
+                break
+            start = pos
+            pos += len(line)
+            comma = line.find(b",")
+            if comma <= 0:
+                continue
+            try:
+                sim = int(line[:comma])
+            except ValueError:
+                continue
+            run_info = runs.setdefault(sim, {"segments": [], "rows": 0})
+            segments = run_info["segments"]
+            if segments and segments[-1][1] == start:
+                segments[-1][1] = pos
+            else:
+                segments.append([start, pos])
+            run_info["rows"] += 1
+
+        index["size"] = pos
+        index["mtime"] = st.st_mtime
+        index["tail"] = _file_tail(f, pos)
+
+    try:
+        with open(idx_file, "w") as f:
+            json.dump(index, f)
+    except OSError as e:
+        print(f"[warn] could not write run index {idx_file}: {e}")
+    return index
+
+def _segment_lines(f, start, end):
+    f.seek(start)
+    pos = start
+    while pos < end:
+        line = f.readline()
+        if not line:
+            break
+        pos += len(line)
+        yield line.decode("utf-8")
+
+def load_simulation(csv_file, sim_number, index=None):
+    # Lazily yields (tick, sat_states) for one run, in the order NTN.py wrote them.
+    # Only the current tick is ever held in memory.
+    if index is None:
+        index = build_run_index(csv_file)
+    run_info = index["runs"].get(sim_number)
+    if run_info is None:
+        return
+
+    with open(csv_file, "rb") as f:
+        cur_tick = None
+        sats = {}
+        for start, end in run_info["segments"]:
+            reader = csv.DictReader(_segment_lines(f, start, end), fieldnames=index["header"])
+            for row in reader:
+                tick = int(row['tick'])
+                if tick != cur_tick:
+                    if cur_tick is not None:
+                        yield cur_tick, sats
+                    cur_tick, sats = tick, {}
+                sat = row['sat_name']
+                can_see_raw = row['can_see'].strip()
+                can_see = [s.strip() for s in can_see_raw.split(',') if s.strip()] if can_see_raw else []
+                sats[sat] = {
+                    'alt': float(row['orbit_altitude']),
+                    'x': float(row['x']),
+                    'y': float(row['y']),
+                    'can_see': can_see,
+                    # optional column, older CSVs do not have it
+                    'bandwidth': float(row['bandwidth_mbps']) if row.get('bandwidth_mbps') else None,
+                }
+        if cur_tick is not None:
+            yield cur_tick, sats
+
+
+# DELAY PREDICTION (ntn_mlm)
+
+class PredictionPipeline:
+    # Runs ntn_mlm.predict_next_tick() on a background thread while the current tick
+    # is live, so model latency never sits between two tc updates. A prediction made
+    # from tick N is due when the next tick is applied; if it is not finished by
+    # then it counts as a missed deadline and that tick goes without a prediction.
+    # A late prediction cannot be cancelled once it runs, so while it is still
+    # running no new one is queued behind it: those ticks count as missed too.
+
+    def __init__(self, model_path=None):
+        import ntn_mlm
+        self.ntn_mlm = ntn_mlm
+        model_path = model_path or os.path.join(REPO_ROOT, ntn_mlm.MODEL_FILE)
+        self.model = ntn_mlm.load(model_path)["model"]
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ntn-predict")
+        self.pending = None  # (source tick, future or None if skipped)
+        self.running = None  # last future handed to the executor
+        self.on_time = 0
+        self.missed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.latencies = []
+
+    def _predict(self, tick_num, sat_states):
+        start = time.perf_counter()
+        predicted = self.ntn_mlm.predict_next_tick(sat_states, self.model, tick=tick_num)
+        return predicted, time.perf_counter() - start
+
+    def submit(self, tick_num, sat_states):
+        # Call right after tick_num went live
+        if self.running is not None and not self.running.done():
+            # the one worker is still busy with a late prediction
+            self.pending = (tick_num, None)
+            return
+        self.running = self.executor.submit(self._predict, tick_num, sat_states)
+        self.pending = (tick_num, self.running)
+
+    def collect(self, tick_num):
+        # Call at the deadline, just before tick_num is applied
+        if self.pending is None:
+            return None
+        source_tick, future = self.pending
+        self.pending = None
+        if future is None:
+            self.missed += 1
+            self.skipped += 1
+            print(f"  [predict] no prediction from tick {source_tick}: an earlier one was still running "
+                  f"(tick {tick_num})")
+            return None
+        if not future.done():
+            self.missed += 1
+            print(f"  [predict] prediction from tick {source_tick} missed its deadline (tick {tick_num})")
+            return None
+        try:
+            predicted, latency = future.result()
+        except Exception as e:
+            self.failed += 1
+            print(f"[warn] prediction from tick {source_tick} failed: {e}")
+            return None
+        self.on_time += 1
+        self.latencies.append(latency)
+        return predicted
+
+    def summary(self):
+        due = self.on_time + self.missed + self.failed
+        print("\n Prediction pipeline:")
+        if not due:
+            print("  no predictions reached their deadline")
+            return
+        print(f"  deadlines: {due}, on time: {self.on_time}, missed: {self.missed} "
+              f"({self.missed / due * 100:.1f}%, {self.skipped} not started behind a late one), "
+              f"failed: {self.failed}")
+        if self.latencies:
+            mean_ms = sum(self.latencies) / len(self.latencies) * 1000
+            print(f"  prediction latency: mean {mean_ms:.2f} ms, max {max(self.latencies) * 1000:.2f} ms")
+
+    def shutdown(self):
+        # The prediction made from the last tick has no deadline, drop it
+        if self.pending is not None:
+            self.pending[1].cancel()
+            self.pending = None
+        self.executor.shutdown(wait=False)
+
+
+def report_prediction(tick_num, predicted, applied):
+    # Compare what the model expected for this tick with what was just applied
+    errors = []
+    for link_key, pred in sorted(predicted.items()):
+        actual = applied.get(link_key)
+        if actual is None:
+            print(f"  {link_key}: predicted={pred}ms actual=DOWN")
+            continue
+        errors.append(abs(pred - actual))
+        print(f"  {link_key}: predicted={pred}ms actual={actual}ms error={pred - actual:+.1f}ms")
+    if errors:
+        print(f"  Tick {tick_num} prediction MAE: {sum(errors) / len(errors):.2f}ms over {len(errors)} links")
+
+
+# OSPF COST PROGRAMMING
+
+OSPF_COST_PER_MS = 1.0  # ip ospf cost units per ms of predicted one-way delay
+OSPF_MAX_COST = 65535
+
+def delay_to_ospf_cost(delay_ms):
+    return max(1, min(OSPF_MAX_COST, int(round(delay_ms * OSPF_COST_PER_MS))))
+
+class OspfCostProgrammer:
+    # Turns predicted link delays into `ip ospf cost` on both v-rX-rY ends of each
+    # link. Every router gets one vtysh call per tick carrying all of its changes,
+    # and changes smaller than `hysteresis` cost units are skipped so OSPF does not
+    # rerun SPF for noise. Interfaces of links that are DOWN (admin-down) in the tick
+    # being applied carry no traffic and are left alone.
+
+    def __init__(self, hysteresis=5):
+        self.hysteresis = hysteresis
+        self.costs = {}  # (ns, iface) -> cost last pushed
+        self.changed = 0
+        self.skipped = 0
+        self.vtysh_calls = 0
+
+    def _push(self, ns, lines):
+        BACKEND.vtysh(ns, lines)
+        self.vtysh_calls += 1
+
+    def apply(self, tick_num, predicted, delays):
+        # delays is the tick's tick_delays(), the same UP/DOWN state apply_tick() sets.
+        # Returns the number of interfaces whose cost was pushed
+        per_router = defaultdict(list)
+        skipped = down = 0
+        for link_key, delay_ms in predicted.items():
+            sat_a, sat_b = link_key.split('-', 1)
+            cost = delay_to_ospf_cost(delay_ms)
+            for key in (link_key, f"{sat_b}-{sat_a}"):
+                info = LINK_MAP.get(key)
+                if info is None:
+                    continue
+                if delays[LINK_MAP.index[key]] < 0:
+                    down += 1
+                    continue
+                iface_id = (info["ns"], info["iface"])
+                last = self.costs.get(iface_id)
+                if last is not None and abs(cost - last) < self.hysteresis:
+                    skipped += 1
+                    continue
+                per_router[info["ns"]].append((info["iface"], cost))
+
+        for ns in sorted(per_router):
+            lines = []
+            for iface, cost in per_router[ns]:
+                lines += [f"interface {iface}", f"ip ospf cost {cost}"]
+                self.costs[(ns, iface)] = cost
+            self._push(ns, lines)
+
+        changed = sum(len(v) for v in per_router.values())
+        self.changed += changed
+        self.skipped += skipped
+        print(f"  OSPF costs for tick {tick_num}: {changed} interface(s) on {len(per_router)} router(s), "
+              f"{skipped} below hysteresis, {down} on DOWN links")
+        return changed
+
+    def reset(self):
+        # Put every interface we touched back on the default cost
+        per_router = defaultdict(list)
+        for ns, iface in self.costs:
+            per_router[ns] += [f"interface {iface}", "no ip ospf cost"]
+        for ns in sorted(per_router):
+            self._push(ns, per_router[ns])
+        self.costs.clear()
+
+    def summary(self):
+        print("\n OSPF cost programming:")
+        print(f"  interface cost changes: {self.changed}, skipped (hysteresis {self.hysteresis}): "
+              f"{self.skipped}, vtysh calls: {self.vtysh_calls}")
+
+
+# SUB-TICK INTERPOLATION
+
+def _cpu_seconds():
+    # CPU used by this process plus the tc/ip children it has waited on
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+class DelayInterpolator:
+    # Instead of sleeping through a tick, step netem delay linearly from this tick's
+    # delays towards the next tick's every `step_s` seconds. Only links that are UP
+    # in both ticks are interpolated; UP/DOWN transitions still happen on the tick.
+
+    def __init__(self, step_s):
+        self.step_s = step_s
+        self.steps = 0
+        self.link_updates = 0
+        self.tc_calls = 0
+        self.update_wall = 0.0
+        self.update_cpu = 0.0
+        self.emulated_s = 0.0
+
+    def run_interval(self, cur_delays, next_delays, interval_s):
+        # cur_delays / next_delays: per-link delay arrays as returned by tick_delays()
+        links = [i for i, (a, b) in enumerate(zip(cur_delays, next_delays))
+                 if a >= 0 and b >= 0 and a != b]
+        n_steps = max(1, int(round(interval_s / self.step_s)))
+        start = time.monotonic()
+        for k in range(1, n_steps):
+            # absolute schedule so update cost does not make the steps drift
+            time.sleep(max(0.0, start + k * interval_s / n_steps - time.monotonic()))
+            frac = k / n_steps
+            wall0, cpu0 = time.perf_counter(), _cpu_seconds()
+            targets = [(i, round(cur_delays[i] + (next_delays[i] - cur_delays[i]) * frac, 1))
+                       for i in links]
+            self.tc_calls += change_link_delays(targets)
+            self.link_updates += len(targets)
+            self.steps += 1
+            self.update_wall += time.perf_counter() - wall0
+            self.update_cpu += _cpu_seconds() - cpu0
+        time.sleep(max(0.0, start + interval_s - time.monotonic()))
+        self.emulated_s += TICK_INTERVAL
+
+    def summary(self):
+        print("\n Interpolation:")
+        if not self.steps:
+            print("  no sub-tick updates were made")
+            return
+        print(f"  step: {self.step_s * 1000:.0f} ms, sub-tick updates: {self.steps}, "
+              f"link updates: {self.link_updates}, tc calls: {self.tc_calls}")
+        if self.update_wall > 0:
+            print(f"  update throughput: {self.link_updates / self.update_wall:.0f} link updates/s "
+                  f"({self.update_wall / self.steps * 1000:.2f} ms per step)")
+        if self.emulated_s > 0:
+            print(f"  CPU cost: {self.update_cpu / self.emulated_s * 1000:.2f} ms CPU per emulated second "
+                  f"({self.emulated_s:.0f} s emulated)")
+
+
+# KERNEL STATE RECONCILIATION
+
+class Reconciler:
+    # Every `interval_s` seconds, on a background thread: one qdisc dump per namespace,
+    # compared against LINK_MAP.applied. Interfaces whose root qdisc is missing or
+    # differs (a tc command that failed, or someone changed it by hand) are repaired
+    # with one `tc -batch` per namespace; the rest are left alone.
+
+    def __init__(self, interval_s):
+        self.interval_s = interval_s
+        self.groups = LINK_MAP.by_namespace()
+        self.passes = 0
+        self.checked = 0
+        self.drifted = 0
+        self.dumps = 0
+        self.unreadable = 0
+        self.pass_s = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="reconciler", daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_s):
+            self.run_pass()
+
+    def run_pass(self):
+        start = time.perf_counter()
+        drifted = checked = repaired_ns = 0
+        for ns, ids in self.groups.items():
+            if self._stop.is_set():
+                return
+            with APPLY_LOCK:
+                applied, rates = LINK_MAP.applied, LINK_MAP.applied_rates
+                if applied is None:
+                    return  # nothing applied yet
+                have = BACKEND.qdisc_dump(ns)
+                self.dumps += 1
+                if have is None:
+                    self.unreadable += 1
+                    continue
+                repairs = []
+                for i in ids:
+                    want = link_netem(applied[i], rates[i])
+                    if not netem_matches(want, have.get(LINK_MAP.ifaces[i])):
+                        repairs.append(("replace", LINK_MAP.ifaces[i], want))
+                if repairs:
+                    BACKEND.qdisc_batch(ns, repairs, quiet=True)
+                    repaired_ns += 1
+            checked += len(ids)
+            drifted += len(repairs)
+        self.passes += 1
+        self.checked += checked
+        self.drifted += drifted
+        self.pass_s.append(time.perf_counter() - start)
+        if drifted:
+            print(f"  [reconcile] {drifted}/{checked} interface(s) drifted, repaired in "
+                  f"{repaired_ns} namespace(s)")
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def summary(self):
+        print("\n Reconciliation:")
+        if not self.passes:
+            print("  no reconciliation pass completed")
+        else:
+            print(f"  passes: {self.passes} every {self.interval_s:g} s, interfaces checked: {self.checked}, "
+                  f"drifted and repaired: {self.drifted}, qdisc dumps: {self.dumps}")
+            print(f"  pass time: mean {sum(self.pass_s) / len(self.pass_s) * 1000:.2f} ms, "
+                  f"max {max(self.pass_s) * 1000:.2f} ms")
+        if self.unreadable:
+            print(f"  {self.unreadable} dump(s) could not be read (dry run or missing namespace)")
+
+
+# CHECKPOINT / RESUME
+
+class ReplayCheckpoint:
+    # After every applied tick, writes the tick number and the delay array that is
+    # now on the interfaces to `path` (atomically, via a temp file + rename). A run
+    # interrupted with Ctrl+C leaves the qdiscs in place, so --resume can skip the
+    # ticks already replayed and carry on diffing against the checkpointed state
+    # instead of re-applying every link.
+
+    def __init__(self, path, csv_file, sim_number):
+        self.path = path
+        self.csv_file = os.path.abspath(csv_file)
+        self.sim_number = sim_number
+        self.saves = 0
+        self.save_s = 0.0
+
+    def _topology_id(self):
+        return zlib.crc32("\n".join(f"{n} {i}" for n, i in zip(LINK_MAP.names, LINK_MAP.ifaces)).encode())
+
+    def save(self, tick_num):
+        start = time.perf_counter()
+        state = {
+            "csv": self.csv_file,
+            "sim": self.sim_number,
+            "tick": tick_num,
+            "links": len(LINK_MAP),
+            "topology": self._topology_id(),
+            "applied": base64.b64encode(LINK_MAP.applied.tobytes()).decode("ascii"),
+            "rates": base64.b64encode(LINK_MAP.applied_rates.tobytes()).decode("ascii"),
+        }
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.path)
+        self.saves += 1
+        self.save_s += time.perf_counter() - start
+
+    def restore(self):
+        # Returns the last applied tick and puts its state back into LINK_MAP.applied,
+        # or None if there is no usable checkpoint for this run and topology
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[warn] no checkpoint to resume from ({self.path}): {e}")
+            return None
+        if (state.get("csv"), state.get("sim")) != (self.csv_file, self.sim_number):
+            print(f"[warn] checkpoint {self.path} is for simulation {state.get('sim')} of "
+                  f"{state.get('csv')}, starting from the beginning")
+            return None
+        if state.get("links") != len(LINK_MAP) or state.get("topology") != self._topology_id():
+            print(f"[warn] checkpoint {self.path} was taken on a different topology, starting from the beginning")
+            return None
+        applied, rates = array('d'), array('d')
+        applied.frombytes(base64.b64decode(state["applied"]))
+        rates.frombytes(base64.b64decode(state["rates"]))
+        LINK_MAP.applied, LINK_MAP.applied_rates = applied, rates
+        if isinstance(BACKEND, SimulatedBackend):
+            # the simulated kernel lives in memory: put the checkpointed qdiscs back
+            for i, (delay, rate) in enumerate(zip(applied, rates)):
+                ns = LINK_MAP.namespaces[LINK_MAP.ns_ids[i]]
+                BACKEND.qdiscs[ns][LINK_MAP.ifaces[i]] = link_netem(delay, rate)
+                if delay < 0:
+                    BACKEND.down[ns].add(LINK_MAP.ifaces[i])
+        return state["tick"]
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def summary(self):
+        if self.saves:
+            print(f"\n Checkpoints: {self.saves} written to {self.path}, "
+                  f"mean {self.save_s / self.saves * 1000:.2f} ms each")
 
 
 # FINALLY MAIN LOOP
 
-def apply_tick(tick_num, sat_states):
-    print(f"Tick {tick_num} --> APPLYING TO NAMESPACE")
+def tick_delays(sat_states):
+    # Returns array('d') aligned with LINK_MAP link ids: delay_ms, or DOWN if the link is down.
+    # Only the links some satellite can actually see are visited, so a tick costs
+    # O(visible links) rather than O(every interface in the mesh).
+    delays = array('d', [DOWN]) * len(LINK_MAP)
+    index = LINK_MAP.index
 
-    # building set of active links per tick 
-    active_links = set()
+    # building set of active links per tick, then every delay in one array call
+    ids, ends = [], []
     for sat_a, state_a in sat_states.items():
         for sat_b in state_a['can_see']:
-            link_key = f"{sat_a}-{sat_b}"
-            active_links.add(link_key)
-
-    # Applying UP/DOWN to every link 
-    for link_key in LINK_MAP:
-        sat_a, sat_b = link_key.split('-', 1)
-        if link_key in active_links:
+            i = index.get(f"{sat_a}-{sat_b}")
             # endpoints do exist within the tick output
-            if sat_a in sat_states and sat_b in sat_states:
-                state_a = sat_states[sat_a]
-                state_b = sat_states[sat_b]
-                delay = compute_delay_ms(
-                    state_a['alt'], state_b['alt'],
-                    state_a['x'], state_b['x'],
-                    state_a['y'], state_b['y'],
-                )
-                jitter = compute_jitter(delay)
-                apply_link_up(link_key, delay, jitter)
+            if i is None or sat_b not in sat_states:
+                continue
+            state_b = sat_states[sat_b]
+            ids.append(i)
+            ends.append((state_a['alt'], state_b['alt'],
+                         state_a['x'], state_a['y'],
+                         state_b['x'], state_b['y']))
+    if ids:
+        alt_a, alt_b, x1, y1, x2, y2 = np.array(ends, dtype=float).T
+        for i, d in zip(ids, compute_delay_ms(alt_a, alt_b, x1, y1, x2, y2).tolist()):
+            delays[i] = d
+    return delays
+
+def apply_tick(tick_num, sat_states, delays=None):
+    # Applies only the links whose delay, capacity or UP/DOWN state changed since the last
+    # tick, one `tc -batch` per namespace. Links that change UP/DOWN are also set admin
+    # up/down, one `ip -batch` per namespace. Returns a {link_key: delay_ms or None} view of the tick.
+    delays = delays if delays is not None else tick_delays(sat_states)
+    rates = tick_rates(sat_states)
+    previous, previous_rates = LINK_MAP.applied, LINK_MAP.applied_rates
+    verbose = len(LINK_MAP) <= VERBOSE_LINKS
+    if verbose:
+        print(f"Tick {tick_num} --> APPLYING TO NAMESPACE")
+
+    batches = defaultdict(list)
+    link_ops = defaultdict(list)
+    for i, (delay, rate) in enumerate(zip(delays, rates)):
+        if previous is not None:
+            before = previous[i]
+            if before == delay and previous_rates[i] == rate:
+                continue
+            # a netem root is already there: change it in place
+            verb = "change" if before >= 0 and delay >= 0 else "replace"
+            if (before >= 0) != (delay >= 0):
+                link_ops[LINK_MAP.ns_ids[i]].append((LINK_MAP.ifaces[i], delay >= 0))
+        else:
+            verb = "replace"
+            link_ops[LINK_MAP.ns_ids[i]].append((LINK_MAP.ifaces[i], delay >= 0))
+        batches[LINK_MAP.ns_ids[i]].append((verb, LINK_MAP.ifaces[i], link_netem(delay, rate)))
+        if verbose:
+            if delay >= 0:
+                shaped = f" rate={rate:g}Mbit" if rate else ""
+                print(f"  {LINK_MAP.names[i]}: delay={delay}ms +- {compute_jitter(delay)}ms{shaped} --> UP")
             else:
-                apply_link_down(link_key)
+                print(f"  {LINK_MAP.names[i]}: --> DOWN, NO LINE OF SIGHT")
+
+    with APPLY_LOCK:
+        for ns_id, ops in batches.items():
+            BACKEND.qdisc_batch(LINK_MAP.namespaces[ns_id], ops, quiet=not verbose)
+        # after the qdiscs, so a link coming UP already carries its delay
+        for ns_id, ops in link_ops.items():
+            BACKEND.link_batch(LINK_MAP.namespaces[ns_id], ops, quiet=not verbose)
+        if previous is None:
+            LINK_MAP.applied = array('d', delays)
+            LINK_MAP.applied_rates = rates
+        else:
+            previous[:] = delays
+            previous_rates[:] = rates
+    changed = sum(len(ops) for ops in batches.values())
+    up = sum(1 for d in delays if d >= 0)
+    print(f"Tick {tick_num} applied: {up}/{len(delays)} links UP, {changed} changed, "
+          f"{len(batches)} namespace batch(es)")
+    return DelayView(LINK_MAP, delays)
+
+def link_state_changes(delays):
+    # Links whose UP/DOWN state differs from what is currently applied, one entry per link pair
+    changes = set()
+    applied = LINK_MAP.applied
+    if applied is None:
+        return []
+    for i, (before, delay) in enumerate(zip(applied, delays)):
+        if (before < 0) != (delay < 0):
+            pair = '-'.join(sorted(LINK_MAP.names[i].split('-', 1)))
+            changes.add(f"{pair} {'UP' if delay >= 0 else 'DOWN'}")
+    return sorted(changes)
+
+class Replay:
+    # The optional stages wrapped around apply_tick(); each one is None when disabled
+
+    def __init__(self, pipeline=None, ospf=None, monitor=None, collector=None, checkpoint=None,
+                 reconciler=None, traffic=None):
+        self.pipeline = pipeline
+        self.ospf = ospf
+        self.monitor = monitor
+        self.collector = collector
+        self.checkpoint = checkpoint
+        self.reconciler = reconciler
+        self.traffic = traffic
+        self.ticks = 0
+        self.started = time.monotonic()
+
+    def tick(self, tick_num, sat_states):
+        delays = tick_delays(sat_states)
+        predicted = self.pipeline.collect(tick_num) if self.pipeline is not None else None
+
+        if self.monitor is not None:
+            # one timestamp per tick, taken before the first routing or tc change goes out
+            marked = time.monotonic()
+            changes = link_state_changes(delays) if LINK_MAP.applied is not None else ["initial state"]
+
+        if predicted and self.ospf is not None:
+            # routing sees the expected delays before netem switches to them;
+            # only a tick that actually moved a cost counts as an OSPF change
+            if self.ospf.apply(tick_num, predicted, delays) and self.monitor is not None:
+                changes.append("ospf costs")
+        if self.monitor is not None and changes:
+            self.monitor.mark(f"tick {tick_num}", ", ".join(changes), t=marked)
+        applied = apply_tick(tick_num, sat_states, delays)
+        self.ticks += 1
+        if self.checkpoint is not None:
+            self.checkpoint.save(tick_num)
+        if self.traffic is not None:
+            self.traffic.mark_tick(tick_num)
+        if self.collector is not None:
+            self.collector.probe_tick(tick_num, applied)
+        if predicted:
+            report_prediction(tick_num, predicted, applied)
+        if self.pipeline is not None:
+            self.pipeline.submit(tick_num, sat_states)
+        return applied
+
+    def close(self, settle=0.0, convergence_csv=None, keep_state=False):
+        # keep_state leaves qdiscs and OSPF costs as they are so a checkpointed run can resume
+        if self.reconciler is not None:
+            # stop before cleanup so it does not "repair" the reset
+            self.reconciler.stop()
+        if self.monitor is not None:
+            # stop before cleanup so the reset itself is not counted as churn
+            self.monitor.stop(settle=settle)
+            self.monitor.report(convergence_csv)
+        if self.collector is not None:
+            self.collector.close()
+        if self.traffic is not None:
+            self.traffic.close()
+        if keep_state:
+            print(f"\n Topology left as is; resume with --resume (checkpoint {self.checkpoint.path})")
         else:
-            apply_link_down(link_key)
+            cleanup_topology()
+        if self.ospf is not None:
+            if not keep_state:
+                self.ospf.reset()
+            self.ospf.summary()
+        if self.pipeline is not None:
+            self.pipeline.shutdown()
+            self.pipeline.summary()
+        if self.collector is not None:
+            self.collector.summary()
+        if self.traffic is not None:
+            self.traffic.summary()
+        if self.reconciler is not None:
+            self.reconciler.summary()
+        if self.checkpoint is not None:
+            self.checkpoint.summary()
+        wall = time.monotonic() - self.started
+        if self.ticks and wall > 0:
+            emulated = self.ticks * TICK_INTERVAL
+            print(f"\n Replayed {self.ticks} ticks ({emulated} s of orbit time) in {wall:.1f} s "
+                  f"({emulated / wall:.1f}x real time)")
+
+def with_next(ticks):
+    # (tick_num, sat_states, next (tick_num, sat_states) or None) without materializing the run
+    pending = next(ticks, None)
+    while pending is not None:
+        following = next(ticks, None)
+        yield pending[0], pending[1], following
+        pending = following
 
 def main():
+    global BACKEND, LINK_MAP, DEFAULT_BANDWIDTH_MBPS
+    ap = argparse.ArgumentParser(description="Replay simulation ticks onto the namespace topology")
+    ap.add_argument("--predict", action="store_true",
+                    help="Predict next-tick delays with ntn_mlm on a background thread")
+    ap.add_argument("--model", default=None,
+                    help="Path to the trained model (default: ntn_delay_model.pkl in the repo root)")
+    ap.add_argument("--speed", type=float, default=None, metavar="N",
+                    help="Replay automatically at N times real time (TICK_INTERVAL / N between ticks), "
+                         "without prompting")
+    ap.add_argument("--checkpoint", nargs="?", const="replay.ckpt", default=None, metavar="PATH",
+                    help="Save the last applied tick and link state to PATH after every tick "
+                         "(default replay.ckpt); an interrupted run keeps its qdiscs for --resume")
+    ap.add_argument("--resume", action="store_true",
+                    help="Continue from the checkpoint instead of starting at the first tick "
+                         "(implies --checkpoint)")
+    ap.add_argument("--interpolate", type=float, default=None, metavar="MS",
+                    help="(automatic mode) interpolate netem delay between ticks every MS milliseconds")
+    ap.add_argument("--ospf-costs", action="store_true",
+                    help="(with --predict) program predicted delays into FRR as OSPF interface costs")
+    ap.add_argument("--ospf-hysteresis", type=int, default=5, metavar="COST",
+                    help="Skip OSPF cost changes smaller than this (default 5)")
+    ap.add_argument("--convergence", action="store_true",
+                    help="Measure route convergence and churn after every applied link change")
+    ap.add_argument("--convergence-csv", default=None, metavar="PATH",
+                    help="(with --convergence) also write per-event results to this CSV")
+    ap.add_argument("--settle", type=float, default=10.0, metavar="S",
+                    help="(with --convergence) seconds to keep listening after the last tick (default 10)")
+    ap.add_argument("--telemetry", nargs="?", const="telemetry.csv", default=None, metavar="PATH",
+                    help="Probe every link and Host1->Host2 each tick and append RTT/loss to PATH "
+                         "(default telemetry.csv)")
+    ap.add_argument("--probe-count", type=int, default=5, metavar="N",
+                    help="(with --telemetry) probes per target per tick (default 5)")
+    ap.add_argument("--topology", default="default", metavar="SPEC",
+                    help="default: the 6-satellite LINK_MAP; mesh:N[:H]: full mesh of N satellites "
+                         "and H hosts as full-mesh-namespace.sh builds it; netns: read the live namespaces")
+    ap.add_argument("--traffic", default=None, metavar="STREAMS",
+                    help="Send paced h1->h2 streams (e.g. udp:10,tcp:20, Mbit/s) and measure per-tick "
+                         "goodput, one-way latency and reordering")
+    ap.add_argument("--traffic-csv", default="traffic.csv", metavar="PATH",
+                    help="(with --traffic) per-tick results CSV (default traffic.csv)")
+    ap.add_argument("--bandwidth", type=float, default=DEFAULT_BANDWIDTH_MBPS, metavar="MBPS",
+                    help="Link capacity where the CSV has no bandwidth_mbps column "
+                         f"(default {DEFAULT_BANDWIDTH_MBPS}, as in NTN.py; 0 disables shaping)")
+    ap.add_argument("--reconcile", type=float, default=None, metavar="S",
+                    help="Every S seconds, dump each namespace's qdiscs once and repair interfaces "
+                         "that drifted from the applied state")
+    ap.add_argument("--backend", choices=["kernel", "sim"], default="kernel",
+                    help="kernel: real tc/vtysh (honours DRY_RUN); sim: in-memory simulated kernel")
+    ap.add_argument("--sim-latency", type=float, default=0.0, metavar="MS",
+                    help="(with --backend sim) latency injected per operation (default 0)")
+    ap.add_argument("--sim-fail-rate", type=float, default=0.0, metavar="P",
+                    help="(with --backend sim) fraction of qdisc writes silently lost (default 0)")
+    args = ap.parse_args()
+    if args.ospf_costs and not args.predict:
+        ap.error("--ospf-costs requires --predict")
+    if args.speed is not None and args.speed <= 0:
+        ap.error("--speed must be positive")
+    if args.resume and args.checkpoint is None:
+        args.checkpoint = "replay.ckpt"
+
+    DEFAULT_BANDWIDTH_MBPS = args.bandwidth
+    if args.topology.startswith("mesh:"):
+        try:
+            sizes = [int(n) for n in args.topology[5:].split(":")]
+        except ValueError:
+            ap.error(f"bad --topology {args.topology!r}, expected mesh:N or mesh:N:H")
+        LINK_MAP = LinkTable.full_mesh(*sizes[:2])
+    elif args.topology == "netns":
+        LINK_MAP = LinkTable.from_netns()
+        if not LINK_MAP:
+            ap.error("no v-X-Y interfaces found in any rN/hN namespace")
+    elif args.topology != "default":
+        ap.error(f"unknown --topology {args.topology!r}")
+    print(f"Topology: {len(LINK_MAP)} links in {len(LINK_MAP.namespaces)} namespaces")
+
+    if args.backend == "sim":
+        BACKEND = SimulatedBackend.from_link_map(LINK_MAP, op_latency=args.sim_latency / 1000,
+                                                 fail_rate=args.sim_fail_rate)
+        print(f"Using simulated kernel backend ({args.sim_latency:g} ms per operation, "
+              f"{args.sim_fail_rate:g} of writes lost)")
+
+    # before any stage starts a thread or opens a socket, so there is nothing to close
     print(f"Loading simulation {Sim_num} from {CSV_FILE}...")
-    sim_ticks = load_simulation(CSV_FILE, Sim_num)
-    print(f"found {len(sim_ticks)} ticks: {list(sim_ticks.keys())}")
+    index = build_run_index(CSV_FILE)
+    if Sim_num not in index["runs"]:
+        print(f"Simulation {Sim_num} not found. Available: {sorted(index['runs'])}")
+        return
+    print(f"found {index['runs'][Sim_num]['rows']} rows for simulation {Sim_num}")
+    sim_ticks = load_simulation(CSV_FILE, Sim_num, index)
 
-    
+    pipeline = None
+    if args.predict:
+        pipeline = PredictionPipeline(args.model)
+        print("Delay-predictive mode enabled")
+    ospf = None
+    if args.ospf_costs:
+        ospf = OspfCostProgrammer(args.ospf_hysteresis)
+        print(f"Programming OSPF costs from predictions (hysteresis {args.ospf_hysteresis})")
+
+    monitor = None
+    if args.convergence:
+        from route_convergence import RouteMonitor
+        routers = sorted(ns for ns in LINK_MAP.namespaces if ns.startswith("r"))
+        monitor = RouteMonitor(routers)
+        print(f"Watching route changes in {' '.join(routers)}")
+
+    collector = None
+    if args.telemetry:
+        from telemetry_collector import TelemetryCollector, resolve_targets
+        links = [(link_key, info["ns"], info["iface"]) for link_key, info in LINK_MAP.items()]
+        collector = TelemetryCollector(resolve_targets(links), args.telemetry, count=args.probe_count)
+        print(f"Streaming telemetry for {len(collector.targets)} targets to {args.telemetry}")
+
+    checkpoint = None
+    if args.checkpoint:
+        checkpoint = ReplayCheckpoint(args.checkpoint, CSV_FILE, Sim_num)
+        # Ctrl+C should stop the loop, not reset the topology the checkpoint describes
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    traffic = None
+    if args.traffic:
+        from traffic_gen import TrafficGenerator, parse_streams
+        try:
+            streams = parse_streams(args.traffic)
+        except ValueError as e:
+            ap.error(str(e))
+        traffic = TrafficGenerator(streams, args.traffic_csv)
+        print(f"Sending {args.traffic} from {traffic.src_ns} to {traffic.dst_ip}, results in {args.traffic_csv}")
+
+    reconciler = None
+    if args.reconcile:
+        reconciler = Reconciler(args.reconcile)
+        print(f"Reconciling qdisc state every {args.reconcile:g} s")
+
+    replay = Replay(pipeline, ospf, monitor, collector, checkpoint, reconciler, traffic)
+
+    if args.resume:
+        last_tick = checkpoint.restore()
+        if last_tick is not None:
+            print(f"Resuming after tick {last_tick} from {checkpoint.path}")
+            sim_ticks = (t for t in sim_ticks if t[0] > last_tick)
+
+    interpolator = None
+    finished = False
     try:
         # Modes to test topology per tick 
-        mode = input("Choose automatic (a) or manual (m). [a/m]").strip().lower()
+        if args.speed:
+            mode = "a"
+        else:
+            mode = input("Choose automatic (a) or manual (m). [a/m]").strip().lower()
 
         if mode == "m":
             # Manual - go through each tick individually
             print("Manual mode selected, press enter to move to the next tick, and press q to quit.")
+            if args.interpolate:
+                print("Note: --interpolate only applies in automatic mode, ignoring it")
 
-            for tick_num, sat_states in sim_ticks.items():
+            pending = next(sim_ticks, None)
+            while pending is not None:
+                tick_num, sat_states = pending
                 print(f"\nReady for tick {tick_num}.")
                 
                 # Show what links will be active
@@ -220,11 +1044,17 @@ def main():
                     print("Exiting simulation.")
                     break
 
-                apply_tick(tick_num, sat_states)
+                replay.tick(tick_num, sat_states)
                 print(f"tick {tick_num} applied. Waiting for next input, now you can test network")
                 
-                if tick_num != list(sim_ticks.keys())[-1]:
+                pending = next(sim_ticks, None)
+                if pending is not None:
                     input("Press Enter for the next tick")
+            # 'q' leaves ticks unapplied: only a run played to the end is finished
+            finished = pending is None
+        elif args.speed:
+            delay = TICK_INTERVAL / args.speed
+            print(f"Replaying at {args.speed:g}x real time ({delay:g} s between ticks)")
         else:
             try:
                 custom_delay = input(f"Enter delay between ticks in seconds (default {TICK_INTERVAL}): ")
@@ -236,16 +1066,39 @@ def main():
                 delay = TICK_INTERVAL
                 print(f"Invalid input, using default: {delay}s")
             
-            for tick_num, sat_states in sim_ticks.items():
+        if mode != "m":
+            if args.interpolate:
+                interpolator = DelayInterpolator(args.interpolate / 1000)
+                print(f"Interpolating delays every {args.interpolate:g} ms between ticks")
+
+            for tick_num, sat_states, following in with_next(sim_ticks):
                 print(f"\nApplying Tick {tick_num}...")
-                apply_tick(tick_num, sat_states)
+                applied = replay.tick(tick_num, sat_states)
                 print(f"Tick {tick_num} applied. Waiting {delay} seconds...")
-                time.sleep(delay)
+                if interpolator is not None and following is not None:
+                    interpolator.run_interval(applied.delays, tick_delays(following[1]), delay)
+                else:
+                    time.sleep(delay)
+            finished = True
+
+    except KeyboardInterrupt:
+        print("\n\nInterrupt received!")
 
     finally:
-        # NEW: Always cleanup when done
-        cleanup_topology()
-        print("\nSimulation Cleaned up")
+        # NEW: Always cleanup when done (unless a checkpointed run stopped early)
+        keep_state = checkpoint is not None and not finished
+        replay.close(args.settle, args.convergence_csv, keep_state=keep_state)
+        if checkpoint is not None and finished:
+            checkpoint.clear()
+        if interpolator is not None:
+            interpolator.summary()
+        if isinstance(BACKEND, SimulatedBackend):
+            ops = ", ".join(f"{op}: {n}" for op, n in sorted(BACKEND.ops.items()))
+            print(f"\n Simulated backend operations: {ops or 'none'}; errors: {len(BACKEND.errors)}; "
+                  f"writes lost: {BACKEND.lost}")
+            for err in BACKEND.errors[:10]:
+                print(f"  {err}")
+        print("\nSimulation Cleaned up" if not keep_state else "\nSimulation stopped")
 
     print("\n Simulation Complete")
 
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+bench_applier.py — Benchmark attempt-to-link.py against the simulated kernel
+============================================================================
+Replays synthetic ticks for full-mesh topologies of several sizes (the same
+v-rI-rJ naming full-mesh-namespace.sh uses) through the applier's real
+apply_tick(), with a SimulatedBackend in place of tc/vtysh. No root or netns
+support is needed.
+
+For every topology size it reports
+  • apply latency per tick   (mean / p99 / max)
+  • throughput               (links and backend operations per second)
+  • scheduling jitter        (how late each tick started vs. its slot, with --interval)
+  • diff correctness         (simulated qdisc state vs. what the applier intended,
+                              plus any operation the simulated kernel rejected)
+  • peak RSS                 (the whole process, after the size has run)
+
+Usage
+-----
+  python3 bench_applier.py                            # 6,20,50,100,200 satellites
+  python3 bench_applier.py --sats 6,200 --ticks 10
+  python3 bench_applier.py --op-latency 2             # 2 ms per tc call, like a real fork/exec
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import math
+import os
+import random
+import resource
+import time
+
+from link_table import LinkTable
+from netns_backend import SimulatedBackend
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_applier():
+    # attempt-to-link.py is not importable by name because of the dashes
+    spec = importlib.util.spec_from_file_location("attempt_to_link", os.path.join(HERE, "attempt-to-link.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 1.  SYNTHETIC TOPOLOGY + TICKS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def synthetic_ticks(n_sats, n_ticks, grid=324.0, see_range=150.0, seed=0):
+    """Satellites drifting on a grid; two satellites see each other within see_range."""
+    rng = random.Random(seed)
+    sats = [f"Sat{i}" for i in range(1, n_sats + 1)]
+    pos = {s: [rng.uniform(0, grid), rng.uniform(0, grid)] for s in sats}
+    vel = {s: [rng.uniform(-15, 15), rng.uniform(-15, 15)] for s in sats}
+    alt = {s: rng.choice([5, 10, 15]) for s in sats}
+    for tick in range(n_ticks):
+        states = {s: {"alt": float(alt[s]), "x": pos[s][0], "y": pos[s][1], "can_see": []} for s in sats}
+        for i, a in enumerate(sats):
+            for b in sats[i + 1:]:
+                if math.hypot(pos[a][0] - pos[b][0], pos[a][1] - pos[b][1]) <= see_range:
+                    states[a]["can_see"].append(b)
+                    states[b]["can_see"].append(a)
+        yield tick, states
+        for s in sats:
+            pos[s][0] = (pos[s][0] + vel[s][0]) % grid
+            pos[s][1] = (pos[s][1] + vel[s][1]) % grid
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 2.  BENCHMARK
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def check_state(applier, backend):
+    """Number of links whose simulated root qdisc differs from what the applier intended."""
+    table = applier.LINK_MAP
+    wrong = 0
+    for i, (delay, rate) in enumerate(zip(table.applied, table.applied_rates)):
+        ns = table.namespaces[table.ns_ids[i]]
+        if backend.qdiscs[ns].get(table.ifaces[i]) != applier.link_netem(delay, rate):
+            wrong += 1
+    return wrong
+
+
+def pct(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def bench_size(applier, n_sats, n_ticks, interval, op_latency, seed):
+    link_map = LinkTable.full_mesh(n_sats)
+    backend = SimulatedBackend.from_link_map(link_map, op_latency=op_latency)
+    applier.LINK_MAP = link_map
+    applier.BACKEND = backend
+
+    ticks = list(synthetic_ticks(n_sats, n_ticks, seed=seed))
+    apply_s, lateness_s, wrong = [], [], 0
+    # the correctness check is the benchmark's own work, not the applier's:
+    # its time pushes the schedule back instead of counting as lateness
+    start, check_s = time.perf_counter(), 0.0
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for k, (tick, states) in enumerate(ticks):
+            slot = start + k * interval + check_s
+            now = time.perf_counter()
+            if now < slot:
+                time.sleep(slot - now)
+            t0 = time.perf_counter()
+            if interval > 0:    # back to back there is no slot to be late for
+                lateness_s.append(t0 - slot)
+            applier.apply_tick(tick, states)
+            t1 = time.perf_counter()
+            apply_s.append(t1 - t0)
+            wrong += check_state(applier, backend)
+            check_s += time.perf_counter() - t1
+
+    total = sum(apply_s)
+    return {
+        "sats": n_sats,
+        "links": len(link_map),
+        "ticks": n_ticks,
+        "apply_mean_ms": total / n_ticks * 1000,
+        "apply_p99_ms": pct(apply_s, 99) * 1000,
+        "apply_max_ms": max(apply_s) * 1000,
+        "links_per_s": len(link_map) * n_ticks / total if total else float("inf"),
+        "ops_per_s": sum(backend.ops.values()) / total if total else float("inf"),
+        "jitter_p50_ms": pct(lateness_s, 50) * 1000 if lateness_s else None,
+        "jitter_p99_ms": pct(lateness_s, 99) * 1000 if lateness_s else None,
+        "wrong": wrong,
+        "errors": len(backend.errors),
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the applier on a simulated kernel backend")
+    ap.add_argument("--sats", default="6,20,50,100,200",
+                    help="Comma-separated topology sizes (default 6,20,50,100,200)")
+    ap.add_argument("--ticks", type=int, default=5, help="Ticks per size (default 5)")
+    ap.add_argument("--interval", type=float, default=0.0,
+                    help="Seconds between tick slots for jitter measurement (default 0: back to back)")
+    ap.add_argument("--op-latency", type=float, default=0.0, metavar="MS",
+                    help="Latency injected per backend operation (default 0)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    applier = load_applier()
+    sizes = [int(s) for s in args.sats.split(",") if s.strip()]
+
+    print(f"Applier benchmark — simulated backend, {args.op_latency:g} ms/op, "
+          f"{args.ticks} ticks, interval {args.interval:g} s")
+    hdr = (f"  {'sats':>5} {'links':>7} {'apply ms':>9} {'p99 ms':>8} {'max ms':>8} "
+           f"{'links/s':>10} {'ops/s':>10} {'late p50':>9} {'late p99':>9} {'diff':>5} {'err':>4} {'rss MB':>7}")
+    print(hdr)
+    print("  " + "─" * (len(hdr) - 2))
+    for n in sizes:
+        r = bench_size(applier, n, args.ticks, args.interval, args.op_latency / 1000, args.seed)
+        late = [f"{v:>9.2f}" if v is not None else f"{'—':>9}" for v in (r["jitter_p50_ms"], r["jitter_p99_ms"])]
+        print(f"  {r['sats']:>5} {r['links']:>7} {r['apply_mean_ms']:>9.1f} {r['apply_p99_ms']:>8.1f} "
+              f"{r['apply_max_ms']:>8.1f} {r['links_per_s']:>10.0f} {r['ops_per_s']:>10.0f} "
+              f"{late[0]} {late[1]} {r['wrong']:>5} {r['errors']:>4} {r['rss_mb']:>7.0f}")
+    print("\n  late = how long after its slot each tick started (only with --interval > 0)")
+    print("  diff = links whose simulated qdisc differed from the intended state after a tick")
+    print("  err  = operations the simulated kernel rejected")
+
+
+if __name__ == "__main__":
+    main()
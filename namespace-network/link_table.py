@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+link_table.py — Link → (namespace, interface) table for the applier
+===================================================================
+The applier used to work from a hand-written LINK_MAP dict for the six-satellite
+topology. LinkTable holds the same information column-wise in flat arrays
+indexed by a link id, so a 200-satellite full mesh (~40,000 directed links) costs
+a few lists and arrays rather than one dict per link, and a tick can be diffed
+and applied with plain index loops.
+
+A table can be built from
+  • a LINK_MAP-style dict              LinkTable.from_link_map(...)
+  • the full-mesh naming scheme        LinkTable.full_mesh(n_sats, n_hosts)
+    (v-rI-rJ between satellites, hosts wired as in full-mesh-namespace.sh)
+  • the live namespaces                LinkTable.from_netns()
+
+Per-link delays travel as array('d') aligned with link ids: a delay in ms for
+an UP link, DOWN for a link that is down. DelayView wraps such an array as a
+read-only {link_key: delay_ms or None} mapping for the code that wants names.
+"""
+
+import os
+import re
+import subprocess
+from array import array
+from collections.abc import Mapping
+
+NETNS_DIR = "/var/run/netns"
+
+DOWN = -1.0   # delay value of a link that is down
+
+
+def node_name(ns):
+    """r12 -> Sat12, h3 -> Host3 (namespace naming used by both topology scripts)."""
+    if ns.startswith("r"):
+        return f"Sat{ns[1:]}"
+    if ns.startswith("h"):
+        return f"Host{ns[1:]}"
+    return ns
+
+
+class LinkTable(Mapping):
+    """
+    Column-wise link table. For link id i:
+      names[i]   "SatA-SatB"       ifaces[i]  "v-rA-rB"
+      ns_ids[i]  index into namespaces
+      end_a[i], end_b[i]  indexes into nodes ("SatA", "SatB")
+
+    applied       : array('d') of the delay last applied per link (None until the first tick)
+    applied_rates : array('d') of the capacity (Mbit/s, 0 = unshaped) last applied per link
+
+    Read as a Mapping it still answers table["SatA-SatB"] -> {"ns": ..., "iface": ...}
+    like LINK_MAP did.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.index = {}
+        self.ifaces = []
+        self.namespaces = []
+        self._ns_index = {}
+        self.ns_ids = array("I")
+        self.nodes = []
+        self.node_index = {}
+        self.end_a = array("I")
+        self.end_b = array("I")
+        self.applied = None
+        self.applied_rates = None
+
+    def _intern(self, values, lookup, value):
+        i = lookup.get(value)
+        if i is None:
+            i = lookup[value] = len(values)
+            values.append(value)
+        return i
+
+    def add(self, link_key, ns, iface):
+        if link_key in self.index:
+            return self.index[link_key]
+        sat_a, sat_b = link_key.split("-", 1)
+        i = len(self.names)
+        self.names.append(link_key)
+        self.index[link_key] = i
+        self.ifaces.append(iface)
+        self.ns_ids.append(self._intern(self.namespaces, self._ns_index, ns))
+        self.end_a.append(self._intern(self.nodes, self.node_index, sat_a))
+        self.end_b.append(self._intern(self.nodes, self.node_index, sat_b))
+        return i
+
+    # ── Mapping interface ────────────────────────────────────────────────────
+
+    def __getitem__(self, link_key):
+        i = self.index[link_key]
+        return {"ns": self.namespaces[self.ns_ids[i]], "iface": self.ifaces[i]}
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, link_key):
+        return link_key in self.index
+
+    def by_namespace(self):
+        """{ns: [link ids]} — for batching one command per namespace."""
+        groups = {}
+        for i, ns_id in enumerate(self.ns_ids):
+            groups.setdefault(self.namespaces[ns_id], []).append(i)
+        return groups
+
+    # ── builders ─────────────────────────────────────────────────────────────
+
+    @classmethod
+    def from_link_map(cls, link_map):
+        table = cls()
+        for link_key, info in link_map.items():
+            table.add(link_key, info["ns"], info["iface"])
+        return table
+
+    @classmethod
+    def full_mesh(cls, n_sats, n_hosts=0):
+        """Every interface full-mesh-namespace.sh creates for n_sats satellites and n_hosts hosts."""
+        table = cls()
+        for i in range(1, n_sats + 1):
+            for j in range(1, n_sats + 1):
+                if i != j:
+                    table.add(f"Sat{i}-Sat{j}", f"r{i}", f"v-r{i}-r{j}")
+        for k in range(1, n_hosts + 1):
+            s = (k - 1) % n_sats + 1
+            table.add(f"Host{k}-Sat{s}", f"h{k}", f"v-h{k}-r{s}")
+            table.add(f"Sat{s}-Host{k}", f"r{s}", f"v-r{s}-h{k}")
+        return table
+
+    @classmethod
+    def from_netns(cls):
+        """Every v-X-Y interface found in the rN / hN namespaces that exist right now."""
+        table = cls()
+        try:
+            namespaces = [n for n in os.listdir(NETNS_DIR) if re.fullmatch(r"[rh]\d+", n)]
+        except OSError:
+            namespaces = []
+        for ns in sorted(namespaces, key=lambda n: (n[0], int(n[1:]))):
+            out = subprocess.run(["ip", "-n", ns, "-o", "link", "show"],
+                                 capture_output=True, text=True).stdout
+            for a, b in re.findall(r"^\d+: v-([rh]\d+)-([rh]\d+)[:@]", out, re.M):
+                if a == ns:
+                    table.add(f"{node_name(a)}-{node_name(b)}", ns, f"v-{a}-{b}")
+        return table
+
+
+class DelayView(Mapping):
+    """Read-only {link_key: delay_ms or None} over a per-link delay array."""
+    __slots__ = ("table", "delays")
+
+    def __init__(self, table, delays):
+        self.table = table
+        self.delays = delays
+
+    def __getitem__(self, link_key):
+        d = self.delays[self.table.index[link_key]]
+        return d if d >= 0 else None
+
+    def __iter__(self):
+        return iter(self.table.names)
+
+    def __len__(self):
+        return len(self.table.names)
+
+    def __contains__(self, link_key):
+        return link_key in self.table.index
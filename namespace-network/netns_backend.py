@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+netns_backend.py — Backends the applier drives the namespace topology through
+============================================================================
+attempt-to-link.py never shells out directly; every qdisc / link / OSPF operation
+goes through one of these objects:
+
+  KernelBackend     runs tc / vtysh against the real namespaces
+                    (dry_run=True prints the commands instead of running them)
+  SimulatedBackend  keeps an in-memory model of namespaces, interfaces, root
+                    qdiscs, link admin state and OSPF costs, accepts the same
+                    operations, and can
+                    inject a fixed latency per operation. Lets bench_applier.py
+                    measure the applier on machines without root or netns.
+
+Both can dump the root qdiscs of a namespace in one call (qdisc_dump), which is
+what the applier's reconciler compares against the state it intended.
+"""
+
+import json
+import random
+import shlex
+import subprocess
+import time
+from collections import Counter, defaultdict, namedtuple
+
+# Root netem qdisc on one interface. jitter_ms=None means no jitter/distribution;
+# rate_mbit=None means no bandwidth cap; limit=None keeps netem's default queue (1000 packets).
+Netem = namedtuple("Netem", "delay_ms jitter_ms loss_pct rate_mbit limit",
+                   defaults=(None, None, 0, None, None))
+
+
+def netem_args(netem):
+    """Netem -> tc argument list, e.g. ['netem', 'delay', '40.1ms', '2.0ms', ...]."""
+    args = ["netem"]
+    if netem.delay_ms is not None:
+        args += ["delay", f"{netem.delay_ms}ms"]
+        if netem.jitter_ms is not None:
+            args += [f"{netem.jitter_ms}ms", "distribution", "normal"]
+    args += ["loss", f"{netem.loss_pct}%"]
+    if netem.rate_mbit:
+        args += ["rate", f"{netem.rate_mbit}mbit"]
+    if netem.limit:
+        args += ["limit", str(netem.limit)]
+    return args
+
+
+def netem_matches(want, have, tol=0.05):
+    """True if the Netem read back from the kernel is `want` (up to tc's rounding)."""
+    if have is None:
+        return False
+    if abs((want.rate_mbit or 0) - (have.rate_mbit or 0)) > tol * max(1, want.rate_mbit or 0):
+        return False
+    if want.limit and want.limit != have.limit:
+        return False
+    return all(abs((w or 0) - (h or 0)) <= tol
+               for w, h in zip((want.delay_ms, want.jitter_ms, want.loss_pct),
+                               (have.delay_ms, have.jitter_ms, have.loss_pct)))
+
+
+def parse_qdisc_dump(text):
+    """`tc -j qdisc show` output -> {iface: Netem} for every interface whose root is netem."""
+    out = {}
+    for q in json.loads(text or "[]"):
+        if not q.get("root") or q.get("kind") != "netem":
+            continue
+        opts = q.get("options", {})
+        delay = opts.get("delay", {})
+        d, j = delay.get("delay"), delay.get("jitter")
+        loss = opts.get("loss-random", {}).get("loss", 0)
+        rate = opts.get("rate", {}).get("rate")
+        # tc reports seconds, fractions and bytes/s; Netem holds ms, percent and Mbit/s
+        out[q["dev"]] = Netem(round(d * 1000, 1) if d else None,
+                              round(j * 1000, 1) if j else None,
+                              round(loss * 100, 3),
+                              round(rate * 8 / 1e6, 3) if rate else None,
+                              opts.get("limit"))
+    return out
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 1.  REAL KERNEL
+# ═══════════════════════════════════════════════════════════════════════════════
+
+VTYSH = "/usr/lib/frr/vtysh"
+
+# tc errors that just mean "already in that state"
+IGNORED_ERRORS = ("File exists", "No such file")
+
+
+class KernelBackend:
+    name = "kernel"
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+
+    def _run(self, argv, stdin=None, quiet=False):
+        if self.dry_run:
+            if not quiet:
+                print(f" [DRY RUN] {shlex.join(argv)}")
+            return None
+        # argv list, no shell: one fork/exec per operation
+        result = subprocess.run(argv, input=stdin, capture_output=True, text=True)
+        if result.returncode != 0 and not any(e in result.stderr for e in IGNORED_ERRORS):
+            print(f"[warn] {shlex.join(argv)} \n {result.stderr.strip()}")
+        return result
+
+    def qdisc_batch(self, ns, ops, quiet=False):
+        """
+        [(verb, iface, Netem or None)] in one `tc -force -batch` process for namespace ns.
+        verb is "replace", "change" (interface already has a netem root) or "del".
+        -force keeps going past a failing line so one bad interface does not drop the rest.
+        """
+        lines = []
+        for verb, iface, netem in ops:
+            words = ["qdisc", verb, "dev", iface, "root"]
+            if netem is not None:
+                words += netem_args(netem)
+            lines.append(" ".join(words))
+        if self.dry_run and not quiet:
+            print(f" [DRY RUN] tc -n {ns} -force -batch -  ({len(lines)} commands)")
+        self._run(["tc", "-n", ns, "-force", "-batch", "-"], stdin="\n".join(lines) + "\n", quiet=True)
+
+    def link_batch(self, ns, ops, quiet=False):
+        """[(iface, up)] as `link set dev IFACE up|down` lines in one `ip -force -batch` process."""
+        lines = [f"link set dev {iface} {'up' if up else 'down'}" for iface, up in ops]
+        if self.dry_run and not quiet:
+            print(f" [DRY RUN] ip -n {ns} -force -batch -  ({len(lines)} commands)")
+        self._run(["ip", "-n", ns, "-force", "-batch", "-"], stdin="\n".join(lines) + "\n", quiet=True)
+
+    def qdisc_dump(self, ns):
+        """{iface: Netem} for every netem root qdisc in ns, from a single `tc -j qdisc show`.
+        None when nothing can be read (dry run, or the namespace is gone)."""
+        result = self._run(["tc", "-n", ns, "-j", "qdisc", "show"], quiet=True)
+        if result is None or result.returncode != 0:
+            return None
+        try:
+            return parse_qdisc_dump(result.stdout)
+        except ValueError as e:
+            print(f"[warn] could not parse qdisc dump of {ns}: {e}")
+            return None
+
+    def vtysh(self, ns, lines):
+        """Run config lines in one vtysh session: configure terminal, *lines, end."""
+        argv = ["ip", "netns", "exec", ns, VTYSH, "-N", ns, "-c", "configure terminal"]
+        for line in lines:
+            argv += ["-c", line]
+        argv += ["-c", "end"]
+        self._run(argv)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 2.  SIMULATED KERNEL
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class SimulatedBackend:
+    """
+    In-memory stand-in for the kernel + FRR.
+
+    interfaces   : iterable of (ns, iface) that exist in the topology
+    op_latency   : seconds every operation takes (a tc/vtysh process spawn)
+    line_latency : extra seconds per line of a batched operation
+    fail_rate    : fraction of qdisc writes silently lost (the kernel "succeeded"
+                   but the state never changed), to exercise reconciliation
+
+    Operations on unknown interfaces, or `qdisc change` on an interface without
+    a qdisc, are recorded in `errors` the way the kernel would reject them.
+    """
+    name = "sim"
+
+    def __init__(self, interfaces, op_latency=0.0, line_latency=0.0, fail_rate=0.0, seed=None):
+        self.interfaces = defaultdict(set)
+        for ns, iface in interfaces:
+            self.interfaces[ns].add(iface)
+        self.op_latency = op_latency
+        self.line_latency = line_latency
+        self.fail_rate = fail_rate
+        self.lost = 0
+        self._rng = random.Random(seed)
+        self.qdiscs = defaultdict(dict)   # ns -> {iface: Netem}
+        self.down = defaultdict(set)      # ns -> ifaces set admin-down
+        self.ospf_costs = {}   # (ns, iface) -> int
+        self.ops = Counter()
+        self.errors = []
+
+    @classmethod
+    def from_link_map(cls, link_map, **kwargs):
+        return cls(((info["ns"], info["iface"]) for info in link_map.values()), **kwargs)
+
+    def _op(self, op, lines=1):
+        self.ops[op] += 1
+        cost = self.op_latency + self.line_latency * lines
+        if cost > 0:
+            time.sleep(cost)
+
+    def _lost(self):
+        if self.fail_rate and self._rng.random() < self.fail_rate:
+            self.lost += 1
+            return True
+        return False
+
+    def _exists(self, op, ns, iface):
+        if iface in self.interfaces.get(ns, ()):
+            return True
+        self.errors.append(f"{op} {ns}:{iface}: Cannot find device")
+        return False
+
+    def qdisc_batch(self, ns, ops, quiet=False):
+        self._op("qdisc_batch", len(ops))
+        qdiscs = self.qdiscs[ns]
+        for verb, iface, netem in ops:
+            if verb == "del":
+                # deleting a missing qdisc is ignored, as on the kernel path
+                qdiscs.pop(iface, None)
+                continue
+            if not self._exists(f"qdisc_{verb}", ns, iface):
+                continue
+            if verb == "change" and iface not in qdiscs:
+                self.errors.append(f"qdisc_change {ns}:{iface}: no qdisc to change")
+                continue
+            if not self._lost():
+                qdiscs[iface] = netem
+
+    def link_batch(self, ns, ops, quiet=False):
+        self._op("link_batch", len(ops))
+        down = self.down[ns]
+        for iface, up in ops:
+            if not self._exists("link_set", ns, iface):
+                continue
+            if up:
+                down.discard(iface)
+            else:
+                down.add(iface)
+
+    def vtysh(self, ns, lines):
+        self._op("vtysh", len(lines))
+        iface = None
+        for line in lines:
+            words = line.split()
+            if words[:1] == ["interface"]:
+                iface = words[1]
+                if not self._exists("vtysh", ns, iface):
+                    iface = None
+            elif iface is None:
+                continue
+            elif words[:3] == ["ip", "ospf", "cost"]:
+                self.ospf_costs[(ns, iface)] = int(words[3])
+            elif words[:4] == ["no", "ip", "ospf", "cost"]:
+                self.ospf_costs.pop((ns, iface), None)
+
+    def qdisc_dump(self, ns):
+        """{iface: Netem} for every interface in `ns` that has a root qdisc."""
+        self._op("qdisc_dump")
+        return dict(self.qdiscs[ns])
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+route_convergence.py — Route convergence measurement for the namespace topology
+===============================================================================
+Opens one rtnetlink socket inside every router namespace, subscribed to IPv4
+route notifications (RTM_NEWROUTE / RTM_DELROUTE), and timestamps every route
+change FRR/zebra installs in the kernel. attempt-to-link.py marks each applied
+link change on the same clock, so for every change we can report how long the
+routing tables kept moving (convergence time) and how many route updates it
+caused (churn).
+
+A change's window runs from its mark up to the next mark; convergence time is
+the gap between the mark and the last route update inside that window.
+
+This attribution only holds if OSPF reacts within one tick. attempt-to-link.py
+therefore sets a link that goes DOWN admin-down, on top of its 100% loss qdisc.
+The veth loses carrier and OSPF drops the adjacency at once. A link left up
+with only 100% loss would go unnoticed until the dead interval (40 s by default)
+expired, and its reroute would land in a later tick's window. A link that comes
+back UP still needs a hello exchange and database sync before OSPF uses it
+again. That usually takes a few seconds, but up to the hello interval (10 s).
+With ticks replayed faster than that (--speed), the reroute can spill into the
+next mark's window. Compare such runs by total churn rather than per event.
+
+Usage
+-----
+  sudo python3 route_convergence.py              # watch every rN namespace
+  sudo python3 route_convergence.py r1 r2 r5     # watch only these
+  sudo python3 attempt-to-link.py --convergence  # measure a replay run
+"""
+
+import csv
+import ctypes
+import os
+import re
+import selectors
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import Counter
+
+NETNS_DIR = "/var/run/netns"
+CLONE_NEWNET = 0x40000000
+
+# rtnetlink constants (linux/rtnetlink.h)
+RTM_NEWROUTE = 24
+RTM_DELROUTE = 25
+RTMGRP_IPV4_ROUTE = 0x40
+RT_TABLE_MAIN = 254
+RTM_F_CLONED = 0x200
+RTA_DST = 1
+RTA_OIF = 4
+RTA_GATEWAY = 5
+
+NLMSGHDR = struct.Struct("=IHHII")     # len, type, flags, seq, pid
+RTMSG    = struct.Struct("=BBBBBBBBI")  # family, dst_len, src_len, tos, table, protocol, scope, type, flags
+RTATTR   = struct.Struct("=HH")         # len, type
+
+RT_PROTO = {2: "kernel", 3: "boot", 4: "static", 11: "zebra", 186: "bgp", 188: "ospf"}
+
+
+def _setns(fd):
+    if hasattr(os, "setns"):
+        os.setns(fd, CLONE_NEWNET)
+        return
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.setns(fd, CLONE_NEWNET) != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err))
+
+
+def netns_socket(ns, family, type, proto=0):
+    """
+    Create a socket inside namespace `ns` without moving the process there:
+    the calling thread enters the namespace, creates the socket and switches
+    back. The socket stays bound to `ns` for its lifetime.
+    """
+    own = os.open("/proc/thread-self/ns/net", os.O_RDONLY)
+    target = os.open(os.path.join(NETNS_DIR, ns), os.O_RDONLY)
+    try:
+        _setns(target)
+        try:
+            sock = socket.socket(family, type, proto)
+        finally:
+            _setns(own)
+    finally:
+        os.close(target)
+        os.close(own)
+    sock.setblocking(False)
+    return sock
+
+
+def open_route_socket(ns):
+    """rtnetlink socket bound to the IPv4 route group inside namespace `ns`."""
+    sock = netns_socket(ns, socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+    sock.bind((0, RTMGRP_IPV4_ROUTE))
+    return sock
+
+
+def parse_route_messages(data):
+    """Yield (kind, dst, gateway, oif, protocol) for each route message in a netlink datagram."""
+    offset = 0
+    while offset + NLMSGHDR.size <= len(data):
+        msg_len, msg_type, _, _, _ = NLMSGHDR.unpack_from(data, offset)
+        if msg_len < NLMSGHDR.size:
+            break
+        if msg_type in (RTM_NEWROUTE, RTM_DELROUTE):
+            body = offset + NLMSGHDR.size
+            family, dst_len, _, _, table, proto, _, _, flags = RTMSG.unpack_from(data, body)
+            if family == socket.AF_INET and table == RT_TABLE_MAIN and not flags & RTM_F_CLONED:
+                dst, gateway, oif = "0.0.0.0", None, None
+                attr = body + RTMSG.size
+                end = offset + msg_len
+                while attr + RTATTR.size <= end:
+                    rta_len, rta_type = RTATTR.unpack_from(data, attr)
+                    if rta_len < RTATTR.size:
+                        break
+                    value = data[attr + RTATTR.size:attr + rta_len]
+                    if rta_type == RTA_DST:
+                        dst = socket.inet_ntoa(value)
+                    elif rta_type == RTA_GATEWAY:
+                        gateway = socket.inet_ntoa(value)
+                    elif rta_type == RTA_OIF:
+                        oif = struct.unpack("=I", value)[0]
+                    attr += (rta_len + 3) & ~3
+                kind = "add" if msg_type == RTM_NEWROUTE else "del"
+                yield kind, f"{dst}/{dst_len}", gateway, oif, RT_PROTO.get(proto, str(proto))
+        offset += (msg_len + 3) & ~3
+
+
+def router_namespaces():
+    """Every rN namespace currently present, in numeric order."""
+    try:
+        names = os.listdir(NETNS_DIR)
+    except OSError:
+        return []
+    return sorted((n for n in names if re.fullmatch(r"r\d+", n)), key=lambda n: int(n[1:]))
+
+
+class RouteMonitor:
+    """
+    Background listener for route changes in a set of namespaces.
+
+    route_events : list of (t, ns, kind, dst, gateway, protocol)
+    marks        : list of (t, label, detail) — one per applied link change
+    """
+
+    def __init__(self, namespaces, verbose=False):
+        self.namespaces = list(namespaces)
+        self.verbose = verbose
+        self.route_events = []
+        self.marks = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sel = selectors.DefaultSelector()
+        for ns in self.namespaces:
+            self._sel.register(open_route_socket(ns), selectors.EVENT_READ, ns)
+        self._thread = threading.Thread(target=self._loop, name="route-monitor", daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            for key, _ in self._sel.select(timeout=0.2):
+                try:
+                    data = key.fileobj.recv(65536)
+                except BlockingIOError:
+                    continue
+                except OSError as e:
+                    # ENOBUFS: the kernel dropped notifications, churn is under-counted
+                    print(f"[warn] route monitor {key.data}: {e}")
+                    continue
+                t = time.monotonic()
+                for kind, dst, gateway, _, proto in parse_route_messages(data):
+                    with self._lock:
+                        self.route_events.append((t, key.data, kind, dst, gateway, proto))
+                    if self.verbose:
+                        via = f" via {gateway}" if gateway else ""
+                        print(f"  [route] {key.data}: {kind} {dst}{via} ({proto})")
+
+    def mark(self, label, detail="", t=None):
+        """Timestamp an applied link change (now, or at monotonic time t)."""
+        with self._lock:
+            self.marks.append((time.monotonic() if t is None else t, label, detail))
+
+    def stop(self, settle=0.0):
+        """Keep listening `settle` seconds for the last change to converge, then close."""
+        if settle:
+            time.sleep(settle)
+        self._stop.set()
+        self._thread.join()
+        for key in list(self._sel.get_map().values()):
+            key.fileobj.close()
+        self._sel.close()
+
+    def results(self):
+        """[{label, detail, convergence_s, churn, per_ns}] — one entry per mark."""
+        with self._lock:
+            marks = list(self.marks)
+            events = sorted(self.route_events, key=lambda e: e[0])
+        out = []
+        i = 0
+        for n, (t_mark, label, detail) in enumerate(marks):
+            t_end = marks[n + 1][0] if n + 1 < len(marks) else float("inf")
+            while i < len(events) and events[i][0] < t_mark:
+                i += 1
+            window = []
+            while i < len(events) and events[i][0] < t_end:
+                window.append(events[i])
+                i += 1
+            out.append({
+                "label": label,
+                "detail": detail,
+                "convergence_s": (window[-1][0] - t_mark) if window else None,
+                "churn": len(window),
+                "per_ns": Counter(e[1] for e in window),
+            })
+        return out
+
+    def report(self, csv_path=None):
+        results = self.results()
+        print("\n Route convergence:")
+        if not results:
+            print("  no link changes were marked")
+            return results
+        for r in results:
+            conv = f"{r['convergence_s']:.3f} s" if r["convergence_s"] is not None else "no route change"
+            per_ns = " ".join(f"{ns}:{c}" for ns, c in sorted(r["per_ns"].items()))
+            print(f"  {r['label']:<10} {conv:>16}  churn {r['churn']:>4}  {per_ns}  {r['detail']}")
+
+        times = sorted(r["convergence_s"] for r in results if r["convergence_s"] is not None)
+        total_churn = sum(r["churn"] for r in results)
+        print(f"  link changes: {len(results)}, caused route changes: {len(times)}, "
+              f"total churn: {total_churn}")
+        if times:
+            print(f"  convergence: mean {sum(times) / len(times):.3f} s, "
+                  f"median {times[len(times) // 2]:.3f} s, max {times[-1]:.3f} s")
+
+        if csv_path:
+            with open(csv_path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["label", "detail", "convergence_s", "churn"] + self.namespaces)
+                for r in results:
+                    conv = f"{r['convergence_s']:.6f}" if r["convergence_s"] is not None else ""
+                    writer.writerow([r["label"], r["detail"], conv, r["churn"]]
+                                    + [r["per_ns"].get(ns, 0) for ns in self.namespaces])
+            print(f"  per-event results written to {csv_path}")
+        return results
+
+
+def main():
+    namespaces = sys.argv[1:] or router_namespaces()
+    if not namespaces:
+        print("[error] No router namespaces found. Run new-net-namespace.sh first.")
+        sys.exit(1)
+    print(f"Watching route changes in {' '.join(namespaces)} (Ctrl+C to stop)")
+    monitor = RouteMonitor(namespaces, verbose=True)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        monitor.stop()
+    print(f"\n{len(monitor.route_events)} route changes seen")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+telemetry_collector.py — Live latency/loss telemetry for the namespace topology
+===============================================================================
+Probes every link (and the Host1 → Host2 path) with ICMP echo from inside the
+namespaces, all targets concurrently on one asyncio loop. Each namespace gets a
+single raw ICMP socket created in that namespace (see route_convergence.
+netns_socket), so a probe round costs no `ip netns exec` / ping processes.
+
+Each round is tagged with the tick the applier just put on the topology and the
+delays it applied, and the per-target results (RTT min/avg/max, loss) are
+streamed in batches by a writer thread to a CSV store — measured delays the
+model can be trained on next to the synthetic compute_delay_ms() values.
+
+The peer of a point-to-point interface is found from its own address: both
+topology scripts give the two ends of each /24 the .1 and .2 addresses.
+
+Usage
+-----
+  sudo python3 telemetry_collector.py                   # probe all v-* links every 10 s
+  sudo python3 telemetry_collector.py --interval 2 --count 10
+  sudo python3 attempt-to-link.py --telemetry           # tag probes with applied ticks
+"""
+
+import argparse
+import asyncio
+import csv
+import os
+import queue
+import re
+import socket
+import struct
+import subprocess
+import threading
+import time
+
+from route_convergence import NETNS_DIR, netns_socket
+
+STORE_FILE = "telemetry.csv"
+STORE_FIELDS = [
+    "tick", "time", "target", "src_ns", "iface", "dst_ip",
+    "sent", "received", "loss_pct",
+    "rtt_min_ms", "rtt_avg_ms", "rtt_max_ms",
+    "applied_delay_ms", "expected_rtt_ms",
+]
+
+# Host-to-host paths probed end to end: (name, src_ns, dst_ns, dst_iface)
+HOST_PATHS = [("Host1-Host2", "h1", "h2", "v-h2-r6")]
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+ICMP_HEADER = struct.Struct("!BBHHH")  # type, code, checksum, id, seq
+PROBE_PAYLOAD = b"ntn-telemetry-probe"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 1.  TARGET DISCOVERY
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def iface_address(ns, iface):
+    """IPv4 address (without prefix) of `iface` inside `ns`, or None."""
+    out = subprocess.run(["ip", "-n", ns, "-o", "-4", "addr", "show", "dev", iface],
+                         capture_output=True, text=True).stdout
+    m = re.search(r"inet (\d+\.\d+\.\d+\.\d+)/", out)
+    return m.group(1) if m else None
+
+
+def peer_address(addr):
+    """The other end of a .1/.2 point-to-point subnet."""
+    a, b, c, d = addr.split(".")
+    return f"{a}.{b}.{c}.{2 if d == '1' else 1}"
+
+
+def live_links():
+    """(name, ns, iface) for every v-X-Y interface in every namespace."""
+    links = []
+    try:
+        namespaces = sorted(os.listdir(NETNS_DIR))
+    except OSError:
+        return links
+    for ns in namespaces:
+        out = subprocess.run(["ip", "-n", ns, "-o", "link", "show"],
+                             capture_output=True, text=True).stdout
+        for iface in re.findall(r"^\d+: (v-[^:@]+)", out, re.M):
+            links.append((iface[2:], ns, iface))
+    return links
+
+
+def resolve_targets(links, host_paths=HOST_PATHS):
+    """
+    links : iterable of (name, src_ns, iface)
+    Returns [(name, src_ns, iface, dst_ip)], skipping interfaces without an address.
+    """
+    targets = []
+    for name, ns, iface in links:
+        addr = iface_address(ns, iface)
+        if addr is None:
+            print(f"[warn] telemetry: no IPv4 address on {ns}:{iface}, not probing {name}")
+            continue
+        targets.append((name, ns, iface, peer_address(addr)))
+    for name, src_ns, dst_ns, dst_iface in host_paths:
+        dst = iface_address(dst_ns, dst_iface)
+        if dst is None:
+            print(f"[warn] telemetry: no IPv4 address on {dst_ns}:{dst_iface}, not probing {name}")
+            continue
+        targets.append((name, src_ns, None, dst))
+    return targets
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 2.  ICMP ECHO
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def icmp_checksum(data):
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def echo_request(ident, seq):
+    header = ICMP_HEADER.pack(ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    checksum = icmp_checksum(header + PROBE_PAYLOAD)
+    return ICMP_HEADER.pack(ICMP_ECHO_REQUEST, 0, checksum, ident, seq) + PROBE_PAYLOAD
+
+
+class _EchoSocket:
+    """One raw ICMP socket inside a namespace; replies are matched back by sequence number."""
+
+    def __init__(self, ns, loop):
+        self.ns = ns
+        self.loop = loop
+        self.sock = netns_socket(ns, socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        self.ident = (os.getpid() ^ hash(ns)) & 0xFFFF
+        self.seq = 0
+        self.waiting = {}   # seq -> future resolved with the receive time
+        loop.add_reader(self.sock.fileno(), self._on_readable)
+
+    def _on_readable(self):
+        while True:
+            try:
+                data, _ = self.sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            t = time.monotonic()
+            ihl = (data[0] & 0x0F) * 4
+            if len(data) < ihl + ICMP_HEADER.size:
+                continue
+            icmp_type, _, _, ident, seq = ICMP_HEADER.unpack_from(data, ihl)
+            if icmp_type != ICMP_ECHO_REPLY or ident != self.ident:
+                continue
+            fut = self.waiting.pop(seq, None)
+            if fut is not None and not fut.done():
+                fut.set_result(t)
+
+    async def ping(self, dst, timeout):
+        """RTT in ms, or None on loss."""
+        self.seq = (self.seq + 1) & 0xFFFF
+        seq = self.seq
+        fut = self.loop.create_future()
+        self.waiting[seq] = fut
+        sent = time.monotonic()
+        try:
+            self.sock.sendto(echo_request(self.ident, seq), (dst, 0))
+            received = await asyncio.wait_for(fut, timeout)
+            return (received - sent) * 1000
+        except (asyncio.TimeoutError, OSError):
+            return None
+        finally:
+            self.waiting.pop(seq, None)
+
+    def close(self):
+        self.loop.remove_reader(self.sock.fileno())
+        self.sock.close()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 3.  STORE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TelemetryWriter:
+    """
+    Appends result rows to the CSV store from a background thread, in batches of
+    up to `batch_size` rows (or whatever is queued once the queue goes idle).
+    """
+
+    def __init__(self, path=STORE_FILE, batch_size=500):
+        self.path = path
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self.batches = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="telemetry-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, rows):
+        self._queue.put(rows)
+
+    def _loop(self):
+        write_header = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=STORE_FIELDS)
+            if write_header:
+                writer.writeheader()
+            pending, done = [], False
+            while not done:
+                try:
+                    rows = self._queue.get(timeout=1.0)
+                    if rows is None:
+                        done = True
+                    else:
+                        pending.extend(rows)
+                except queue.Empty:
+                    pass
+                if pending and (done or len(pending) >= self.batch_size or self._queue.empty()):
+                    writer.writerows(pending)
+                    f.flush()
+                    self.rows_written += len(pending)
+                    self.batches += 1
+                    pending = []
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 4.  COLLECTOR
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _fmt(value):
+    return "" if value is None else f"{value:.3f}"
+
+
+class TelemetryCollector:
+    """
+    Runs probe rounds on a dedicated asyncio thread. probe_tick() returns at once;
+    the round for that tick runs while the tick is live. One round runs at a
+    time: a tick that comes while the previous round is still probing (a high
+    --speed) is skipped and counted. Rows go to the writer as each round ends;
+    only counters are kept here.
+
+    targets : [(name, src_ns, iface, dst_ip)] from resolve_targets()
+    """
+
+    def __init__(self, targets, store_path=STORE_FILE, count=5, spacing=0.02, timeout=1.0, batch_size=500):
+        self.targets = targets
+        self.count = count
+        self.spacing = spacing
+        self.timeout = timeout
+        self.rounds = 0
+        self.rounds_skipped = 0
+        self.rounds_failed = 0
+        self._current = None
+        self.probes_sent = 0
+        self.probes_received = 0
+        self.writer = TelemetryWriter(store_path, batch_size)
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="telemetry-probe", daemon=True)
+        self._thread.start()
+        self.sockets = asyncio.run_coroutine_threadsafe(self._open_sockets(), self.loop).result()
+
+    async def _open_sockets(self):
+        return {ns: _EchoSocket(ns, self.loop) for ns in sorted({t[1] for t in self.targets})}
+
+    async def _probe_target(self, target, tick_num, applied, started):
+        name, ns, iface, dst = target
+        sock = self.sockets[ns]
+
+        async def one(i):
+            await asyncio.sleep(i * self.spacing)
+            return await sock.ping(dst, self.timeout)
+
+        rtts = [r for r in await asyncio.gather(*(one(i) for i in range(self.count))) if r is not None]
+        self.probes_sent += self.count
+        self.probes_received += len(rtts)
+
+        delay = applied.get(name)
+        sat_a, _, sat_b = name.partition("-")
+        reverse = applied.get(f"{sat_b}-{sat_a}")
+        return {
+            "tick": tick_num,
+            "time": f"{started:.3f}",
+            "target": name,
+            "src_ns": ns,
+            "iface": iface or "",
+            "dst_ip": dst,
+            "sent": self.count,
+            "received": len(rtts),
+            "loss_pct": f"{(self.count - len(rtts)) / self.count * 100:.1f}",
+            "rtt_min_ms": _fmt(min(rtts)) if rtts else "",
+            "rtt_avg_ms": _fmt(sum(rtts) / len(rtts)) if rtts else "",
+            "rtt_max_ms": _fmt(max(rtts)) if rtts else "",
+            "applied_delay_ms": _fmt(delay),
+            "expected_rtt_ms": _fmt(delay + reverse) if delay is not None and reverse is not None else "",
+        }
+
+    async def _round(self, tick_num, applied):
+        started = time.time()
+        rows = await asyncio.gather(*(self._probe_target(t, tick_num, applied, started)
+                                      for t in self.targets))
+        self.writer.put(rows)
+        return rows
+
+    def probe_tick(self, tick_num, applied=None):
+        """
+        Start a probe round for the tick that was just applied ({link_key: delay_ms
+        or None}). Returns its future, or None if the previous round is still running.
+        """
+        if self._current is not None and not self._current.done():
+            self.rounds_skipped += 1
+            return None
+        fut = asyncio.run_coroutine_threadsafe(self._round(tick_num, applied or {}), self.loop)
+        fut.add_done_callback(self._round_done)
+        self._current = fut
+        self.rounds += 1
+        return fut
+
+    def _round_done(self, fut):
+        if fut.cancelled() or fut.exception() is None:
+            return
+        self.rounds_failed += 1
+        print(f"[warn] telemetry round failed: {fut.exception()}")
+
+    def close(self):
+        if self._current is not None:
+            try:
+                self._current.result(timeout=self.timeout + self.count * self.spacing + 1)
+            except Exception:
+                pass        # reported by _round_done
+            self._current = None
+        for sock in self.sockets.values():
+            self.loop.call_soon_threadsafe(sock.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.writer.close()
+
+    def summary(self):
+        print("\n Telemetry:")
+        lost = self.probes_sent - self.probes_received
+        loss = lost / self.probes_sent * 100 if self.probes_sent else 0.0
+        print(f"  rounds: {self.rounds} ({self.rounds_skipped} skipped while busy, {self.rounds_failed} failed), "
+              f"targets: {len(self.targets)}, probes: {self.probes_sent} ({loss:.1f}% lost)")
+        print(f"  {self.writer.rows_written} rows written to {self.writer.path} "
+              f"in {self.writer.batches} batch(es)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Probe every namespace link and stream RTT/loss to a CSV store")
+    ap.add_argument("--store", default=STORE_FILE, help=f"CSV store to append to (default {STORE_FILE})")
+    ap.add_argument("--interval", type=float, default=10.0, help="Seconds between probe rounds (default 10)")
+    ap.add_argument("--count", type=int, default=5, help="Probes per target per round (default 5)")
+    args = ap.parse_args()
+
+    targets = resolve_targets(live_links())
+    if not targets:
+        print("[error] No links found. Build the topology first.")
+        return
+    print(f"Probing {len(targets)} targets every {args.interval:g} s (Ctrl+C to stop)")
+    collector = TelemetryCollector(targets, args.store, count=args.count)
+    round_num = 0
+    try:
+        while True:
+            started = time.monotonic()
+            rows = collector.probe_tick(round_num).result()
+            lossy = [r["target"] for r in rows if r["received"] < r["sent"]]
+            print(f"round {round_num}: {len(rows)} targets probed, loss on: {', '.join(lossy) or 'none'}")
+            round_num += 1
+            time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        collector.close()
+        collector.summary()
+
+
+if __name__ == "__main__":
+    main()
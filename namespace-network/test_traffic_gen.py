@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+test_traffic_gen.py — Unit tests for traffic_gen.py's --traffic / --streams parsing
+
+  python3 -m unittest test_traffic_gen     # from namespace-network/
+  python3 -m pytest namespace-network      # from the repo root
+"""
+
+import unittest
+
+from traffic_gen import parse_streams
+
+
+class ParseStreamsTest(unittest.TestCase):
+
+    def test_streams(self):
+        self.assertEqual(parse_streams("udp:10,tcp:20"), [("udp", 10.0), ("tcp", 20.0)])
+        self.assertEqual(parse_streams(" UDP:2.5 , tcp:0.1 "), [("udp", 2.5), ("tcp", 0.1)])
+
+    def test_malformed(self):
+        for spec in ("", "udp", "udp:", ":10", "icmp:10", "udp:10,,tcp:5"):
+            with self.subTest(spec=spec), self.assertRaisesRegex(ValueError, "expected udp:MBIT or tcp:MBIT"):
+                parse_streams(spec)
+
+    def test_rate_not_positive(self):
+        # a negative rate used to hang the pacer, a zero one to kill its sender task
+        for spec in ("udp:-5", "tcp:0", "udp:abc", "udp:nan", "tcp:inf", "udp:10,tcp:-1"):
+            with self.subTest(spec=spec), self.assertRaisesRegex(ValueError, "rate must be a positive Mbit/s"):
+                parse_streams(spec)
+
+
+if __name__ == "__main__":
+    unittest.main()
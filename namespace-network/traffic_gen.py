@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+traffic_gen.py — Traffic generator and throughput/latency meter between hosts
+============================================================================
+Sends paced UDP and TCP streams from h1 to h2 and measures, for every tick the
+applier puts on the topology:
+
+  • goodput          bytes received per stream, over the tick's wall duration
+  • one-way latency  p50 / p90 / p99 / max — sender and receiver live in this
+                     process, so both ends read the same monotonic clock
+  • loss             UDP packets sent in the tick that never arrived
+  • reordering       UDP packets that arrived after a higher sequence number
+
+Every packet carries its stream, sequence number, send time and the tick that
+was live when it was sent, so results are attributed to the tick that carried
+them. Sockets are created inside the host namespaces (route_convergence.
+netns_socket) and driven from one asyncio loop on a background thread.
+
+Per-tick results go to a CSV (tick, stream, ...) that can be lined up with the
+telemetry and convergence CSVs of the same run, or with an OSPF-only run.
+
+Usage
+-----
+  sudo python3 traffic_gen.py --streams udp:10,udp:10,tcp:20        # 60 s, 10 s "ticks"
+  sudo python3 traffic_gen.py --streams udp:50 --duration 120 --interval 5
+  sudo python3 attempt-to-link.py --traffic udp:10,tcp:20           # tag with applied ticks
+"""
+
+import argparse
+import asyncio
+import csv
+import math
+import socket
+import struct
+import threading
+import time
+from collections import defaultdict
+
+from route_convergence import netns_socket
+from telemetry_collector import HOST_PATHS, iface_address
+
+RESULTS_FILE = "traffic.csv"
+RESULTS_FIELDS = [
+    "tick", "stream", "proto", "rate_mbit",
+    "sent", "received", "loss_pct", "reordered", "goodput_mbit",
+    "owd_p50_ms", "owd_p90_ms", "owd_p99_ms", "owd_max_ms",
+]
+
+BASE_PORT = 5201
+PACKET_SIZE = 1200   # bytes of UDP payload / TCP record
+DRAIN_S = 1.0        # how long to keep receiving after the senders stop
+
+# stream id, sequence number, tick it was sent in, send time (monotonic)
+PACKET_HEADER = struct.Struct("!HIid")
+RECORD_LEN = struct.Struct("!I")
+
+
+def parse_streams(spec):
+    """'udp:10,tcp:20' -> [('udp', 10.0), ('tcp', 20.0)] (rates in Mbit/s)."""
+    streams = []
+    for item in spec.split(","):
+        proto, _, rate = item.strip().partition(":")
+        proto = proto.lower()
+        if proto not in ("udp", "tcp") or not rate:
+            raise ValueError(f"bad stream {item!r}, expected udp:MBIT or tcp:MBIT")
+        try:
+            mbit = float(rate)
+        except ValueError:
+            mbit = math.nan
+        # the pacer divides by the rate: a zero, negative or non-finite one would stall or kill it
+        if not (math.isfinite(mbit) and mbit > 0):
+            raise ValueError(f"bad stream {item!r}: rate must be a positive Mbit/s")
+        streams.append((proto, mbit))
+    return streams
+
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+class _TickStats:
+    __slots__ = ("sent", "received", "bytes", "owd", "reordered")
+
+    def __init__(self):
+        self.sent = 0
+        self.received = 0
+        self.bytes = 0
+        self.owd = []
+        self.reordered = 0
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 1.  GENERATOR / METER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TrafficGenerator:
+    """
+    streams : [(proto, rate_mbit)] — one h1 -> h2 flow each, on BASE_PORT + index.
+
+    mark_tick(tick) starts the senders on the first call and moves the tick every
+    later packet is tagged with; close() drains, stops and writes the CSV.
+    """
+
+    def __init__(self, streams, results_path=RESULTS_FILE, path=HOST_PATHS[0], size=PACKET_SIZE):
+        self.streams = streams
+        self.results_path = results_path
+        self.size = max(size, PACKET_HEADER.size)
+        name, self.src_ns, self.dst_ns, dst_iface = path
+        self.dst_ip = iface_address(self.dst_ns, dst_iface)
+        if self.dst_ip is None:
+            raise RuntimeError(f"no IPv4 address on {self.dst_ns}:{dst_iface}, cannot send {name} traffic")
+        self.tick = None
+        self.tick_starts = {}
+        self.stopped_at = None
+        self.stats = defaultdict(_TickStats)   # (tick, stream) -> _TickStats
+        self.max_seq = defaultdict(lambda: -1)  # stream -> highest sequence number received
+        self.send_errors = 0
+        self._running = False
+        self._tasks = []
+        self._sockets = []
+        self._servers = []
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="traffic-gen", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._open_receivers(), self.loop).result()
+
+    # ── receive side ─────────────────────────────────────────────────────────
+
+    def _record(self, data, now):
+        stream, seq, tick, sent_at = PACKET_HEADER.unpack_from(data)
+        st = self.stats[(tick, stream)]
+        st.received += 1
+        st.bytes += len(data)
+        st.owd.append((now - sent_at) * 1000)
+        if seq < self.max_seq[stream]:
+            st.reordered += 1
+        else:
+            self.max_seq[stream] = seq
+
+    def _on_udp_readable(self, sock):
+        while True:
+            try:
+                data = sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                return
+            if len(data) >= PACKET_HEADER.size:
+                self._record(data, time.monotonic())
+
+    async def _on_tcp_client(self, reader, writer):
+        try:
+            while True:
+                (length,) = RECORD_LEN.unpack(await reader.readexactly(RECORD_LEN.size))
+                data = await reader.readexactly(length)
+                self._record(data, time.monotonic())
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _open_receivers(self):
+        for i, (proto, _) in enumerate(self.streams):
+            port = BASE_PORT + i
+            if proto == "udp":
+                sock = netns_socket(self.dst_ns, socket.AF_INET, socket.SOCK_DGRAM)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 << 20)
+                sock.bind((self.dst_ip, port))
+                self.loop.add_reader(sock.fileno(), self._on_udp_readable, sock)
+                self._sockets.append(sock)
+            else:
+                sock = netns_socket(self.dst_ns, socket.AF_INET, socket.SOCK_STREAM)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                sock.bind((self.dst_ip, port))
+                sock.listen()
+                self._servers.append(await asyncio.start_server(self._on_tcp_client, sock=sock))
+
+    # ── send side ────────────────────────────────────────────────────────────
+
+    def _packet(self, stream, seq, pad):
+        return PACKET_HEADER.pack(stream, seq, self.tick, time.monotonic()) + pad
+
+    async def _paced(self, rate_mbit, send_one):
+        # Absolute schedule; if the loop falls more than 100 ms behind, skip ahead
+        # instead of bursting to catch up
+        gap = self.size * 8 / (rate_mbit * 1e6)
+        next_t = time.monotonic()
+        while self._running:
+            now = time.monotonic()
+            if now - next_t > 0.1:
+                next_t = now
+            while next_t <= now and self._running:
+                await send_one()
+                next_t += gap
+            await asyncio.sleep(max(0.0, next_t - time.monotonic()))
+
+    async def _udp_sender(self, stream, rate_mbit):
+        sock = netns_socket(self.src_ns, socket.AF_INET, socket.SOCK_DGRAM)
+        self._sockets.append(sock)
+        dst = (self.dst_ip, BASE_PORT + stream)
+        pad = bytes(self.size - PACKET_HEADER.size)
+        seq = 0
+
+        async def send_one():
+            nonlocal seq
+            self.stats[(self.tick, stream)].sent += 1
+            try:
+                sock.sendto(self._packet(stream, seq, pad), dst)
+            except (BlockingIOError, OSError):
+                self.send_errors += 1
+            seq += 1
+
+        await self._paced(rate_mbit, send_one)
+
+    async def _tcp_sender(self, stream, rate_mbit):
+        sock = netns_socket(self.src_ns, socket.AF_INET, socket.SOCK_STREAM)
+        # records are paced already; Nagle would only add its own batching delay
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            await self.loop.sock_connect(sock, (self.dst_ip, BASE_PORT + stream))
+        except OSError as e:
+            print(f"[warn] traffic: tcp stream {stream} could not connect: {e}")
+            sock.close()
+            return
+        _, writer = await asyncio.open_connection(sock=sock)
+        pad = bytes(self.size - PACKET_HEADER.size)
+        seq = 0
+
+        async def send_one():
+            nonlocal seq
+            self.stats[(self.tick, stream)].sent += 1
+            writer.write(RECORD_LEN.pack(self.size) + self._packet(stream, seq, pad))
+            seq += 1
+            # the send time in the record includes any wait for the socket buffer
+            if writer.transport.get_write_buffer_size() > 64 * self.size:
+                await writer.drain()
+
+        try:
+            await self._paced(rate_mbit, send_one)
+        except ConnectionError as e:
+            print(f"[warn] traffic: tcp stream {stream} dropped: {e}")
+        finally:
+            writer.close()
+
+    def _start(self):
+        self._running = True
+        for i, (proto, rate) in enumerate(self.streams):
+            sender = self._udp_sender if proto == "udp" else self._tcp_sender
+            self._tasks.append(self.loop.create_task(sender(i, rate)))
+
+    def _set_tick(self, tick_num):
+        self.tick = tick_num
+        if not self._running:
+            self._start()
+
+    def mark_tick(self, tick_num):
+        """Call right after tick_num was applied; traffic sent from now on belongs to it."""
+        self.tick_starts.setdefault(tick_num, time.monotonic())
+        self.loop.call_soon_threadsafe(self._set_tick, tick_num)
+
+    # ── shutdown / results ───────────────────────────────────────────────────
+
+    async def _stop_senders(self):
+        self._running = False
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _close_receivers(self):
+        for server in self._servers:
+            server.close()
+        for sock in self._sockets:
+            try:
+                self.loop.remove_reader(sock.fileno())
+            except ValueError:
+                pass
+            sock.close()
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self._stop_senders(), self.loop).result()
+        self.stopped_at = time.monotonic()
+        time.sleep(DRAIN_S)
+        asyncio.run_coroutine_threadsafe(self._close_receivers(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.write_results()
+
+    def _tick_duration(self, tick_num):
+        starts = sorted(self.tick_starts.items(), key=lambda kv: kv[1])
+        for n, (tick, start) in enumerate(starts):
+            if tick == tick_num:
+                end = starts[n + 1][1] if n + 1 < len(starts) else (self.stopped_at or time.monotonic())
+                return max(end - start, 1e-9)
+        return None
+
+    def results(self):
+        """One dict per (tick, stream) with RESULTS_FIELDS, in tick order."""
+        rows = []
+        for (tick, stream), st in sorted(self.stats.items()):
+            proto, rate = self.streams[stream]
+            duration = self._tick_duration(tick)
+            owd = sorted(st.owd)
+            row = {
+                "tick": tick,
+                "stream": stream,
+                "proto": proto,
+                "rate_mbit": f"{rate:g}",
+                "sent": st.sent,
+                "received": st.received,
+                "loss_pct": f"{(st.sent - st.received) / st.sent * 100:.2f}" if st.sent and proto == "udp" else "",
+                "reordered": st.reordered if proto == "udp" else "",
+                "goodput_mbit": f"{st.bytes * 8 / duration / 1e6:.3f}" if duration else "",
+            }
+            for q in (50, 90, 99):
+                row[f"owd_p{q}_ms"] = f"{percentile(owd, q):.3f}" if owd else ""
+            row["owd_max_ms"] = f"{owd[-1]:.3f}" if owd else ""
+            rows.append(row)
+        return rows
+
+    def write_results(self):
+        with open(self.results_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=RESULTS_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.results())
+
+    def summary(self):
+        print("\n Traffic:")
+        if not self.tick_starts:
+            print("  no traffic was sent")
+            return
+        for i, (proto, rate) in enumerate(self.streams):
+            per_tick = [st for (_, s), st in self.stats.items() if s == i]
+            sent = sum(st.sent for st in per_tick)
+            received = sum(st.received for st in per_tick)
+            owd = sorted(x for st in per_tick for x in st.owd)
+            elapsed = (self.stopped_at or time.monotonic()) - min(self.tick_starts.values())
+            goodput = sum(st.bytes for st in per_tick) * 8 / elapsed / 1e6 if elapsed > 0 else 0.0
+            line = f"  stream {i} {proto} {rate:g} Mbit/s: goodput {goodput:.2f} Mbit/s"
+            if owd:
+                line += f", one-way p50 {percentile(owd, 50):.2f} ms, p99 {percentile(owd, 99):.2f} ms"
+            if proto == "udp" and sent:
+                line += (f", loss {(sent - received) / sent * 100:.2f}%, "
+                         f"reordered {sum(st.reordered for st in per_tick)}")
+            print(line)
+        if self.send_errors:
+            print(f"  {self.send_errors} UDP send(s) failed (socket buffer full)")
+        print(f"  per-tick results written to {self.results_path}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Send paced UDP/TCP streams from h1 to h2 and measure them")
+    ap.add_argument("--streams", default="udp:10", help="Comma-separated proto:Mbit streams (default udp:10)")
+    ap.add_argument("--size", type=int, default=PACKET_SIZE, help=f"Bytes per packet/record (default {PACKET_SIZE})")
+    ap.add_argument("--duration", type=float, default=60.0, help="Seconds to run (default 60)")
+    ap.add_argument("--interval", type=float, default=10.0, help="Seconds per measurement tick (default 10)")
+    ap.add_argument("--out", default=RESULTS_FILE, help=f"Per-tick results CSV (default {RESULTS_FILE})")
+    args = ap.parse_args()
+
+    try:
+        streams = parse_streams(args.streams)
+    except ValueError as e:
+        ap.error(str(e))
+    gen = TrafficGenerator(streams, args.out, size=args.size)
+    print(f"Sending {args.streams} from {gen.src_ns} to {gen.dst_ip} for {args.duration:g} s (Ctrl+C to stop)")
+    start = time.monotonic()
+    tick = 0
+    try:
+        while time.monotonic() - start < args.duration:
+            gen.mark_tick(tick)
+            time.sleep(max(0.0, min(start + (tick + 1) * args.interval, start + args.duration) - time.monotonic()))
+            tick += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        gen.close()
+        gen.summary()
+
+
+if __name__ == "__main__":
+    main()
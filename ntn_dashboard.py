@@ -10,30 +10,67 @@ Visualises simulation results.csv with:
   • Satellite position map    (square orbits)
 
 Runs as a matplotlib GUI by default.
-Pass --cli to print a formatted table to the terminal instead.
+Pass --cli to print a formatted table to the terminal instead, or
+--format json|ndjson|csv to stream the per-tick link data to stdout.
 
 Usage
 -----
   python3 ntn_dashboard.py                       # interactive GUI
   python3 ntn_dashboard.py --cli                 # terminal table, all ticks
   python3 ntn_dashboard.py --cli --tick 3        # terminal table, single tick
+  python3 ntn_dashboard.py --format ndjson > ticks.ndjson   # one JSON object per tick
   python3 ntn_dashboard.py --csv other.csv       # custom CSV path
+  python3 ntn_dashboard.py --follow              # keep up with a CSV NTN.py is writing
+  python3 ntn_dashboard.py --export frames/      # one PNG per tick, headless
+  python3 ntn_dashboard.py --export run.mp4 --ticks 0:500 --fps 20
+  python3 ntn_dashboard.py --serve               # browser dashboards at http://127.0.0.1:8050/
 """
 
 import argparse
-import math
+import bisect
+import collections
+import concurrent.futures
+import csv
+import functools
+import gc
+import gzip
+import hashlib
+import http.server
+import io
+import json
+import multiprocessing
 import os
+import shutil
+import subprocess
 import sys
+import threading
+import time
+import urllib.parse
+from collections.abc import Mapping
 
-import matplotlib
-import matplotlib.gridspec as gridspec
-import matplotlib.lines
-import matplotlib.patches as mpatches
-import matplotlib.pyplot as plt
-from matplotlib.ticker import MaxNLocator
-from matplotlib.widgets import Button, Slider
 import numpy as np
-import pandas as pd
+
+import ntn_links
+
+# matplotlib is imported on first use by _load_matplotlib(): the CLI, the
+# --format streams and --serve never draw, so they start without it.
+matplotlib = gridspec = mpatches = plt = None
+LineCollection = PolyCollection = MaxNLocator = Button = Slider = None
+
+
+def _load_matplotlib():
+    global matplotlib, gridspec, mpatches, plt
+    global LineCollection, PolyCollection, MaxNLocator, Button, Slider
+    if plt is not None:
+        return
+    import matplotlib
+    import matplotlib.gridspec as gridspec
+    import matplotlib.lines
+    import matplotlib.patches as mpatches
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection, PolyCollection
+    from matplotlib.ticker import MaxNLocator
+    from matplotlib.widgets import Button, Slider
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -63,6 +100,10 @@ SAT_LAYER = {
     "Sat4": "L1", "Sat5": "L1", "Sat6": "L1",
 }
 
+FIGSIZE = (18, 11)   # dashboard window / exported frame, inches
+
+MODEL_FILE = 'ntn_delay_model.pkl'      # ntn_mlm.py's default, for --model
+
 PLANET_ROOT = 3
 GRID        = (PLANET_ROOT + 15) ** 2   # = 324
 CENTER      = GRID / 2                  # = 162.0
@@ -92,11 +133,555 @@ LINK_COLOR = {lnk: LINK_PALETTE[i] for i, lnk in enumerate(ALL_LINKS)}
 # 2.  DATA LOADING
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def _delay(alt_a, alt_b, x1, y1, x2, y2):
-    return round((alt_a + alt_b) / 2 * 8 + math.hypot(x2 - x1, y2 - y1) * 0.05, 1)
+def _node_key(name):
+    # Sat2 < Sat10 < Host1: satellites first, then hosts, in numeric order
+    base = name.rstrip('0123456789')
+    num  = name[len(base):]
+    return (base != 'Sat', base, int(num) if num else 0, name)
+
+
+def _pack(vis):
+    """bool (..., N) -> uint8 (..., ceil(N/8)), bit j of byte j // 8 set for vis[..., j]."""
+    return np.packbits(vis, axis=-1, bitorder='little')
+
+
+def _unpack(adj, n):
+    return np.unpackbits(adj, axis=-1, count=n, bitorder='little').view(bool)
+
+
+class RunData:
+    """
+    One simulation run as arrays — T ticks × N nodes × L links.
+
+    nodes   : list[str]            satellites (rows in the CSV) and anything they can see
+    ticks   : int64   (T,)         tick numbers, ascending
+    time_s  : float64 (T,)
+    x, y    : float32 (T, N)       NaN where the node has no row that tick
+    alt     : float32 (T, N)
+    present : bool    (T, N)
+    adj     : uint8   (T, N, B)    can_see bit-packed, B = ceil(N / 8): bit j of
+                                   adj[t, i] — nodes[j] is in nodes[i]'s can_see
+    delay   : float64 (T, L)       delay of ALL_LINKS[l] in ms, NaN while the link is down
+
+    Positions are kept in float32 and can_see as bits, which is what makes a
+    long or wide run fit: a tick of N nodes costs 13N + N·B bytes there. The
+    delays are computed from the positions as given, before the downcast
+    (float64 straight from the CSV, like the applier and NTN.py), and stay
+    float64, exact to the 0.1 ms they are rounded to. Read can_see through
+    sees(), can_see() or visibility() rather than unpacking adj by hand.
+
+    The aggregates the panels and the CLI table draw from are built once per
+    run and kept in .stats (a RunStats), and model predictions in
+    .predictions(model); call invalidate() after changing the arrays so they
+    are rebuilt on next use.
+    """
+
+    ARRAYS = ('ticks', 'time_s', 'x', 'y', 'alt', 'present', 'adj', 'delay')
+
+    def __init__(self, nodes, ticks, time_s, x, y, alt, present, adj, delay=None):
+        self.nodes   = nodes
+        self.ticks   = ticks
+        self.time_s  = time_s
+        self.present = present
+        self.adj     = adj
+        self.delay   = self._link_delays(x, y, alt) if delay is None else delay
+        self.x       = x.astype(np.float32, copy=False)
+        self.y       = y.astype(np.float32, copy=False)
+        self.alt     = alt.astype(np.float32, copy=False)
+        self._stats  = None
+        self._predictions = {}
+
+    # ── can_see accessors ─────────────────────────────────────────────────────
+
+    def sees(self, rows, i, j):
+        """bool (T, K): nodes[j[k]] is in nodes[i[k]]'s can_see, at the given tick rows."""
+        j = np.asarray(j)
+        return ((self.adj[rows][:, i, j >> 3] >> (j & 7).astype(np.uint8)) & 1).astype(bool)
+
+    def can_see(self, k, i):
+        """Indexes (into nodes) of what nodes[i] can see at tick row k."""
+        return np.flatnonzero(_unpack(self.adj[k, i], len(self.nodes))).tolist()
+
+    def visibility(self, rows=slice(None)):
+        """Unpacked bool (T, N, N) can_see of the given tick rows — meant for slices, not whole runs."""
+        return _unpack(self.adj[rows], len(self.nodes))
+
+    def tick_row(self, tick):
+        """Row of tick in the (T, ·) arrays; KeyError if the run has no such tick."""
+        k = int(np.searchsorted(self.ticks, tick))
+        if k == len(self.ticks) or self.ticks[k] != tick:
+            raise KeyError(tick)
+        return k
+
+    @property
+    def stats(self):
+        if self._stats is None:
+            self._stats = RunStats(self)
+        return self._stats
+
+    def predictions(self, model):
+        """RunPredictions of a DelayModel, computed on first use and kept per model version."""
+        if model.version not in self._predictions:
+            self._predictions[model.version] = RunPredictions(self, model)
+        return self._predictions[model.version]
+
+    def invalidate(self):
+        """Drop the cached aggregates and predictions — the arrays changed."""
+        self._stats = None
+        self._predictions = {}
+
+    def _link_delays(self, x, y, alt, rows=slice(None)):
+        """Delay and up-state of every link at the given tick rows, in one vectorized pass.
+        x, y, alt are those rows' positions."""
+        index = {n: i for i, n in enumerate(self.nodes)}
+        T = len(self.ticks[rows])
+        delay = np.full((T, len(ALL_LINKS)), np.nan)
+        known = [l for l, (a, b) in enumerate(TOPOLOGY) if a in index and b in index]
+        if not known or not T:
+            return delay
+        a = np.array([index[TOPOLOGY[l][0]] for l in known])
+        b = np.array([index[TOPOLOGY[l][1]] for l in known])
+        x, y, alt = (np.asarray(v, dtype=float) for v in (x, y, alt))
+        d = ntn_links.delay_ms(alt[:, a], alt[:, b], x[:, a], y[:, a], x[:, b], y[:, b])
+        present = self.present[rows]
+        up = self.sees(rows, a, b) & present[:, a] & present[:, b]
+        delay[:, known] = np.where(up, d, np.nan)
+        return delay
+
+    def merge(self, other):
+        """
+        Fold another RunData of the same run (rows appended to the CSV since)
+        into this one. A tick both hold — one whose rows were split across two
+        reads — takes the other's rows on top of its own. The other's delays
+        are taken as computed (from its float64 positions); only links of a
+        split tick that neither read had up on its own are recomputed here,
+        from the stored positions.
+
+        Returns the tick rows (in the merged arrays) that changed.
+        """
+        if not self.x.flags.writeable:
+            # arrays mapped read-only from the parse cache: take a private copy
+            for name in self.ARRAYS:
+                setattr(self, name, np.array(getattr(self, name)))
+        held = np.isin(other.ticks, self.ticks)
+        nodes = sorted(set(self.nodes) | set(other.nodes), key=_node_key)
+        ticks = np.union1d(self.ticks, other.ticks)
+        T, N = len(ticks), len(nodes)
+        if nodes != self.nodes or T != len(self.ticks):
+            mine = np.searchsorted(ticks, self.ticks)
+            cols = np.array([nodes.index(n) for n in self.nodes], dtype=np.int64)
+            grid = np.ix_(mine, cols)
+            for name, fill in (('x', np.nan), ('y', np.nan), ('alt', np.nan), ('present', False)):
+                old = getattr(self, name)
+                new = np.full((T, N), fill, dtype=old.dtype)
+                new[grid] = old
+                setattr(self, name, new)
+            if nodes == self.nodes:
+                adj = np.zeros((T, N, self.adj.shape[2]), dtype=np.uint8)
+                adj[mine] = self.adj
+            else:
+                # new nodes move bit positions: repack through the unpacked matrix
+                vis = np.zeros((T, N, N), dtype=bool)
+                vis[np.ix_(mine, cols, cols)] = self.visibility()
+                adj = _pack(vis)
+            time_s = np.zeros(T)
+            time_s[mine] = self.time_s
+            delay = np.full((T, len(ALL_LINKS)), np.nan)
+            delay[mine] = self.delay
+            self.nodes, self.ticks, self.adj, self.time_s, self.delay = nodes, ticks, adj, time_s, delay
+
+        rows = np.searchsorted(ticks, other.ticks)
+        cols = np.array([nodes.index(n) for n in other.nodes], dtype=np.int64)
+        grid = np.ix_(rows, cols)
+        here = other.present
+        for name in ('x', 'y', 'alt'):
+            mine = getattr(self, name)[grid]
+            getattr(self, name)[grid] = np.where(here, getattr(other, name), mine)
+        self.present[grid] |= here
+        vis = self.visibility(rows)
+        vis[np.ix_(np.arange(len(rows)), cols, cols)] |= other.visibility()
+        self.adj[rows] = _pack(vis)
+        self.time_s[rows] = other.time_s
+        if held.any():
+            # split ticks: a link up in the other read takes its delay; one up before whose
+            # ends the other read did not touch keeps ours; the rest (ends from both reads)
+            # is recomputed from the merged rows
+            k = rows[held]
+            at = {n: i for i, n in enumerate(other.nodes)}
+            touched = np.zeros((len(k), len(ALL_LINKS)), dtype=bool)
+            for l, link in enumerate(TOPOLOGY):
+                for n in link:
+                    if n in at:
+                        touched[:, l] |= other.present[held, at[n]]
+            theirs, ours = other.delay[held], self.delay[k]
+            redo = self._link_delays(self.x[k], self.y[k], self.alt[k], k)
+            self.delay[k] = np.where(theirs == theirs, theirs,
+                                     np.where((ours == ours) & ~touched, ours, redo))
+        self.delay[rows[~held]] = other.delay[~held]
+        self.invalidate()
+        return rows
+
+
+def _mean(values):
+    # same summation order and rounding as the per-dict averages this replaces
+    up = [v for v in values if v == v]
+    return round(sum(up) / len(up), 1) if up else 0.0
+
+
+def _spans(mask, ticks):
+    """
+    Runs of equal state in mask over consecutive ticks, as (start, stop) index
+    pairs plus the state of each run. A gap in the tick numbers ends a run.
+    """
+    if not len(mask):
+        return np.zeros((0, 2), dtype=np.int64), np.zeros(0, dtype=bool)
+    brk = (np.diff(mask.astype(np.int8)) != 0) | (np.diff(ticks) != 1)
+    start = np.r_[0, np.flatnonzero(brk) + 1]
+    stop  = np.r_[start[1:], len(mask)]
+    return np.column_stack([start, stop]), mask[start]
+
+
+class RunStats:
+    """
+    Per-run aggregates, computed once from a RunData.
+
+    tick_pos   : {tick: row}       row of a tick in the (T, ·) arrays (a view, no dict)
+    up         : bool    (T, L)    link up at each tick
+    active     : int64   (T,)      links up at each tick
+    tick_avg   : float64 (T,)      mean delay of the up links (0.0 with none up)
+    tick_max   : float64 (T,)      largest delay of the up links (1.0 with none up)
+    link_avg   : {link: float}     mean delay over the ticks the link was up (0.0 if never)
+    uptime     : {link: float}     fraction of ticks the link was up
+    intervals  : {link: (up, down)}  broken_barh spans (tick - 0.5, width) per state,
+                                     built on first use (only short runs draw them unbucketed)
+    segments   : {link: int64 (K, 2)}  row ranges [start, stop) where the link is continuously up
+    sats       : [str]             nodes with a position at some tick
+    """
+
+    def __init__(self, run):
+        ticks = run.ticks
+        delay = run.delay
+        up    = ~np.isnan(delay)
+        zero  = np.where(up, delay, 0.0)
+        self.up = up
+        self._ticks = ticks
+
+        self.tick_pos = _TickView(run, _tick_row, cache_size=0)
+        self.active   = up.sum(axis=1)
+        self.tick_avg = np.array([_mean(row) for row in delay.tolist()])
+        self.tick_max = np.where(self.active > 0, zero.max(axis=1, initial=0.0), 1.0)
+
+        n_up = up.sum(axis=0)
+        frac = n_up / len(ticks) if len(ticks) else np.zeros(len(ALL_LINKS))
+        self.link_avg = dict(zip(ALL_LINKS, (_mean(col) for col in delay.T.tolist())))
+        self.uptime   = dict(zip(ALL_LINKS, frac.tolist()))
+
+        self.segments = {}
+        for l, link in enumerate(ALL_LINKS):
+            runs, state = _spans(up[:, l], ticks)
+            self.segments[link] = runs[state]
+
+        self.sats = [n for n, seen in zip(run.nodes, run.present.any(axis=0)) if seen]
+
+    @functools.cached_property
+    def intervals(self):
+        tl = self._ticks.tolist()
+        out = {}
+        for l, link in enumerate(ALL_LINKS):
+            runs, state = _spans(self.up[:, l], self._ticks)
+            spans = [(tl[a] - 0.5, tl[b - 1] - tl[a] + 1) for a, b in runs.tolist()]
+            out[link] = ([sp for sp, st in zip(spans, state) if st],
+                         [sp for sp, st in zip(spans, state) if not st])
+        return out
+
+
+# ── model predictions (--model) ──────────────────────────────────────────────
+# The overlay scores a trained ntn_mlm model against the run. A run is
+# predicted in one batched call the first time it is shown and the result is
+# kept on the RunData per model version, so scrubbing only indexes arrays.
+
+class DelayModel:
+    """
+    A trained ntn_mlm model file. version is a hash of the file's bytes, so
+    predictions cached for one model are never shown for a retrained one.
+    """
+
+    def __init__(self, path=MODEL_FILE):
+        import ntn_mlm      # only the overlay needs it
+        with open(path, 'rb') as f:
+            self.version = hashlib.sha1(f.read()).hexdigest()[:8]
+        self.path  = path
+        self.model = ntn_mlm.load(path)['model']
 
 
-def load_data(csv_path):
+class RunPredictions:
+    """
+    A model's next-tick delay predictions for every (tick, link) of one run,
+    scored against the run's delays.
+
+    pred     : float64 (T, L)  delay of ALL_LINKS[l] at tick row k predicted
+                               from row k - 1 (NaN for the first tick, after a
+                               gap in the ticks, or with an endpoint missing)
+    err      : float64 (T, L)  pred - delay, NaN unless both exist
+    tick_mae : float64 (T,)    mean |err| over the links scored at each tick (NaN if none)
+    n        : int             (tick, link) pairs scored
+    mae, rmse, max_err : float over the whole run (NaN if n == 0)
+    """
+
+    def __init__(self, run, model):
+        import ntn_mlm
+        T = len(run.ticks)
+        self.pred = np.full((T, len(ALL_LINKS)), np.nan)
+        index = {n: i for i, n in enumerate(run.nodes)}
+        known = [l for l, (a, b) in enumerate(TOPOLOGY)
+                 if a in index and b in index and (a, b) in ntn_mlm.TOPOLOGY]
+        if known and T > 1:
+            a = np.array([index[TOPOLOGY[l][0]] for l in known])
+            b = np.array([index[TOPOLOGY[l][1]] for l in known])
+            # source row k - 1 -> target row k, for consecutive ticks only
+            ok = ((np.diff(run.ticks) == 1)[:, None]
+                  & run.present[:-1][:, a] & run.present[:-1][:, b])
+            k, l = np.nonzero(ok)
+            x, y, alt = (getattr(run, name)[:-1].astype(float) for name in ('x', 'y', 'alt'))
+            src = (k, a[l]), (k, b[l])
+            p = ntn_mlm.predict_delays(
+                model.model,
+                x[src[0]], y[src[0]], alt[src[0]], x[src[1]], y[src[1]], alt[src[1]],
+                np.array([ntn_mlm.TOPOLOGY.index(TOPOLOGY[c]) for c in known])[l],
+                run.ticks[k])
+            self.pred[k + 1, np.array(known)[l]] = np.round(p, ntn_links.DELAY_DECIMALS)
+
+        self.err = self.pred - run.delay
+        scored = ~np.isnan(self.err)
+        abs_err = np.where(scored, np.abs(self.err), 0.0)
+        per_tick = scored.sum(axis=1)
+        self.tick_mae = np.full(T, np.nan)
+        np.divide(abs_err.sum(axis=1), per_tick, out=self.tick_mae, where=per_tick > 0)
+        self.n = int(scored.sum())
+        if self.n:
+            self.mae     = float(abs_err.sum() / self.n)
+            self.rmse    = float(np.sqrt((abs_err ** 2).sum() / self.n))
+            self.max_err = float(abs_err.max())
+        else:
+            self.mae = self.rmse = self.max_err = float('nan')
+
+
+# ── CSV columns ──────────────────────────────────────────────────────────────
+# The CSV is read with the stdlib csv module straight into numpy columns, so
+# the CLI, export and server paths start without importing pandas.
+
+CSV_COLUMNS = ('sim_number', 'tick', 'time_s', 'sat_name', 'orbit_altitude', 'x', 'y', 'can_see')
+_INT_COLUMNS   = ('sim_number', 'tick')
+_FLOAT_COLUMNS = ('time_s', 'orbit_altitude', 'x', 'y')
+
+
+def _float_column(values):
+    try:
+        return np.array(values, dtype=float)
+    except ValueError:                  # empty cells -> NaN
+        return np.array([v or 'nan' for v in values], dtype=float)
+
+
+def read_columns(lines):
+    """
+    Parse CSV text lines (header first) into {column: array} for CSV_COLUMNS.
+    sat_name and can_see are object arrays of str ('' for an empty can_see).
+    Returns None if there are no data rows.
+    """
+    # the row lists and column tuples are all new container objects: with the
+    # cyclic GC running it rescans them over and over and the parse is ~5x slower
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        reader = csv.reader(lines)
+        header = next(reader, [])
+        rows = [row for row in reader if row]
+        if not rows:
+            return None
+        values = dict(zip(header, zip(*rows)))
+        del rows
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    cols = {}
+    for name in CSV_COLUMNS:
+        if name in _INT_COLUMNS:
+            cols[name] = np.array(values[name], dtype=np.int64)
+        elif name in _FLOAT_COLUMNS:
+            cols[name] = _float_column(values[name])
+        else:
+            cols[name] = np.array(values[name], dtype=object)
+    return cols
+
+
+def take_rows(cols, mask):
+    """The rows of a read_columns() result where mask is True (None if none are)."""
+    if cols is None or not mask.any():
+        return None
+    return {name: col[mask] for name, col in cols.items()}
+
+
+def load_runs(csv_path, tail=None, cache=True):
+    """
+    Parse the CSV into {sim: RunData} with one sort and one can_see split over
+    the whole file — no per-sim or per-tick filtering, no per-row Python.
+
+    The parsed arrays are kept in a cache file next to the CSV (see
+    read_cache); while the CSV is unchanged, later loads map that file
+    instead of parsing again. With a CsvTail the file is read through it, so
+    the tail's next read() picks up exactly where this load stopped (the
+    cache is not used: the file is still growing).
+    """
+    if tail is not None:
+        cols = tail.read()
+        return _frame_runs(cols) if cols is not None else {}
+    if cache:
+        runs = read_cache(csv_path)
+        if runs is not None:
+            return runs
+    with open(csv_path, newline='') as f:
+        cols = read_columns(f)
+    runs = _frame_runs(cols) if cols is not None else {}
+    if cache:
+        write_cache(csv_path, runs)
+    return runs
+
+
+# ── parse cache ───────────────────────────────────────────────────────────────
+# <csv>.cache holds every run's arrays as raw, 64-byte aligned blocks after a
+# small JSON header, so loading it is one mmap and a few np.frombuffer views:
+# nothing is parsed or copied, and repeat launches read straight from the OS
+# page cache. The header records the CSV's path, size and mtime; any change
+# to the CSV makes the cache stale and the next load rebuilds it.
+
+CACHE_SUFFIX  = '.cache'
+CACHE_MAGIC   = b'NTNCACHE'
+CACHE_VERSION = 3          # 2: float32 positions, bit-packed can_see; 3: delays from float64 positions
+CACHE_ALIGN   = 64
+
+
+def _cache_key(csv_path):
+    st = os.stat(csv_path)
+    return {'path': os.path.abspath(csv_path), 'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns, 'version': CACHE_VERSION}
+
+
+def _align(n):
+    return -(-n // CACHE_ALIGN) * CACHE_ALIGN
+
+
+def write_cache(csv_path, runs):
+    """Persist runs next to csv_path. Best effort: a failure only costs the next launch a parse."""
+    cache_file = csv_path + CACHE_SUFFIX
+    try:
+        layout, blocks, offset = [], [], 0
+        for sim, run in sorted(runs.items()):
+            entry = {'sim': sim, 'nodes': run.nodes, 'arrays': {}}
+            for name in RunData.ARRAYS:
+                arr = np.ascontiguousarray(getattr(run, name))
+                entry['arrays'][name] = [arr.dtype.str, list(arr.shape), offset]
+                blocks.append((offset, arr))
+                offset = _align(offset + arr.nbytes)
+            layout.append(entry)
+        header = json.dumps({'key': _cache_key(csv_path), 'runs': layout}).encode()
+        start = _align(len(CACHE_MAGIC) + 8 + len(header))
+
+        tmp = cache_file + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(CACHE_MAGIC + len(header).to_bytes(8, 'little') + header)
+            for off, arr in blocks:
+                f.seek(start + off)
+                f.write(arr.tobytes())
+            f.truncate(start + offset)
+        os.replace(tmp, cache_file)
+    except OSError as e:
+        print(f'[warn] could not write parse cache {cache_file}: {e}', file=sys.stderr)
+
+
+def read_cache(csv_path):
+    """{sim: RunData} backed by a read-only mmap of the cache, or None if it is missing or stale."""
+    cache_file = csv_path + CACHE_SUFFIX
+    try:
+        with open(cache_file, 'rb') as f:
+            if f.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+                return None
+            size = int.from_bytes(f.read(8), 'little')
+            header = json.loads(f.read(size))
+        if header.get('key') != _cache_key(csv_path):
+            return None
+        data = np.memmap(cache_file, dtype=np.uint8, mode='r')
+    except (OSError, ValueError):
+        return None
+
+    start = _align(len(CACHE_MAGIC) + 8 + size)
+    runs = {}
+    for entry in header['runs']:
+        arrays = {}
+        for name, (dtype, shape, off) in entry['arrays'].items():
+            dtype = np.dtype(dtype)
+            count = int(np.prod(shape))
+            arrays[name] = np.frombuffer(data, dtype, count, start + off).reshape(shape)
+        runs[entry['sim']] = RunData(entry['nodes'], **arrays)
+    return runs
+
+
+def _frame_runs(cols):
+    """{sim: RunData} for one read_columns() result (whole file or an appended chunk)."""
+    order = np.lexsort((cols['tick'], cols['sim_number']))      # stable
+    cols = {name: col[order] for name, col in cols.items()}
+
+    # can_see "Sat2,Sat5" -> one (row, seen) pair per entry: one join and one
+    # split over the whole column, then a lookup per distinct name ('' = none)
+    can_see = cols['can_see'].tolist()
+    seen = ','.join(can_see).split(',')
+    names = {n: n.strip() for n in set(seen)}
+
+    sat_names = cols['sat_name'].tolist()
+    nodes = sorted(set(sat_names) | (set(names.values()) - {''}), key=_node_key)
+    index = {n: i for i, n in enumerate(nodes)}
+    N = len(nodes)
+
+    dst_of = {n: index[name] if name else -1 for n, name in names.items()}
+    sim_col  = cols['sim_number']
+    node_col = np.fromiter(map(index.__getitem__, sat_names), np.int64, len(sat_names))
+    pair_dst = np.fromiter(map(dst_of.__getitem__, seen), np.int64, len(seen))
+    pair_row = np.repeat(np.arange(len(can_see)), [text.count(',') + 1 for text in can_see])
+    keep = pair_dst >= 0
+    pair_row, pair_dst = pair_row[keep], pair_dst[keep]
+
+    runs = {}
+    bounds = np.flatnonzero(np.diff(sim_col)) + 1
+    for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(sim_col)]):
+        if lo == hi:
+            continue
+        ticks, t_idx = np.unique(cols['tick'][lo:hi], return_inverse=True)
+        n_idx = node_col[lo:hi]
+        T = len(ticks)
+
+        time_s = np.zeros(T)
+        time_s[t_idx] = cols['time_s'][lo:hi]
+        # float64 here so the delays are computed at full precision; RunData stores float32
+        x   = np.full((T, N), np.nan)
+        y   = np.full((T, N), np.nan)
+        alt = np.full((T, N), np.nan)
+        present = np.zeros((T, N), dtype=bool)
+        x[t_idx, n_idx]   = cols['x'][lo:hi]
+        y[t_idx, n_idx]   = cols['y'][lo:hi]
+        alt[t_idx, n_idx] = cols['orbit_altitude'][lo:hi]
+        present[t_idx, n_idx] = True
+
+        # set the can_see bits straight into the packed matrix
+        adj = np.zeros((T, N, -(-N // 8)), dtype=np.uint8)
+        a, b = np.searchsorted(pair_row, [lo, hi])
+        rows = pair_row[a:b] - lo
+        dst = pair_dst[a:b]
+        np.bitwise_or.at(adj, (t_idx[rows], n_idx[rows], dst >> 3), (1 << (dst & 7)).astype(np.uint8))
+
+        runs[int(sim_col[lo])] = RunData(nodes, ticks, time_s, x, y, alt, present, adj)
+    return runs
+
+
+def load_data(csv_path, tail=None, cache=True):
     """
     Returns
     -------
@@ -104,45 +689,148 @@ def load_data(csv_path):
     tick_data : { sim: { tick: { link: float|None } } }
     pos_data  : { sim: { tick: { sat: {x,y,alt} } } }
     time_data : { sim: { tick: float } }
+    runs      : { sim: RunData }   arrays + cached per-run aggregates (RunData.stats)
+
+    The per-tick mappings are read-only views over each run's arrays (see
+    _TickView), not dicts holding every tick.
     """
-    df = pd.read_csv(csv_path)
-    df['can_see'] = df['can_see'].fillna('')
-    sim_nums  = sorted(df['sim_number'].unique().tolist())
+    runs = load_runs(csv_path, tail, cache)
+    sim_nums  = sorted(runs)
     tick_data, pos_data, time_data = {}, {}, {}
 
     for sim in sim_nums:
-        sdf = df[df['sim_number'] == sim]
-        tick_data[sim] = {}
-        pos_data[sim]  = {}
-        time_data[sim] = {}
-
-        for tick in sorted(sdf['tick'].unique().tolist()):
-            tdf  = sdf[sdf['tick'] == tick]
-            sats = {}
-            for _, row in tdf.iterrows():
-                can_see = [s.strip() for s in str(row['can_see']).split(',') if s.strip()]
-                sats[row['sat_name']] = {
-                    'x': float(row['x']), 'y': float(row['y']),
-                    'alt': int(row['orbit_altitude']),
-                    'can_see': can_see,
-                }
-            time_data[sim][tick] = float(tdf['time_s'].iloc[0])
-            pos_data[sim][tick]  = sats
-
-            delays = {}
-            for (a, b) in TOPOLOGY:
-                link = f"{a}-{b}"
-                if a in sats and b in sats:
-                    sa, sb = sats[a], sats[b]
-                    delays[link] = (
-                        _delay(sa['alt'], sb['alt'], sa['x'], sa['y'], sb['x'], sb['y'])
-                        if b in sa['can_see'] else None
-                    )
-                else:
-                    delays[link] = None
-            tick_data[sim][tick] = delays
+        tick_data[sim], pos_data[sim], time_data[sim] = _tick_views(runs[sim])
+
+    return sim_nums, tick_data, pos_data, time_data, runs
+
+
+def _tick_views(run):
+    return (_TickView(run, _tick_delays), _TickView(run, _tick_positions),
+            _TickView(run, _tick_time, cache_size=0))
+
+
+def _tick_delays(run, k):
+    return {link: (None if d != d else d) for link, d in zip(ALL_LINKS, run.delay[k].tolist())}
+
 
-    return sim_nums, tick_data, pos_data, time_data
+def _tick_positions(run, k):
+    nodes = run.nodes
+    sats = {}
+    for i in np.flatnonzero(run.present[k]).tolist():
+        sats[nodes[i]] = {
+            'x': float(run.x[k, i]), 'y': float(run.y[k, i]),
+            'alt': int(run.alt[k, i]),
+            'can_see': [nodes[j] for j in run.can_see(k, i)],
+        }
+    return sats
+
+
+def _tick_time(run, k):
+    return float(run.time_s[k])
+
+
+def _tick_row(run, k):
+    return k
+
+
+class _TickView(Mapping):
+    """
+    {tick: value} over a RunData, each tick's value built from the arrays when
+    it is asked for — a launch that shows one tick only pays for that tick.
+    The last cache_size built values are kept, so scrubbing a long run does
+    not leave a dict behind for every tick it passed.
+    """
+
+    def __init__(self, run, build, cache_size=256):
+        self.run    = run
+        self._build = build
+        self._size  = cache_size
+        self._cache = {}
+
+    def __getitem__(self, tick):
+        value = self._cache.get(tick)
+        if value is None:
+            value = self._build(self.run, self.run.tick_row(tick))
+            if self._size:
+                if len(self._cache) >= self._size:
+                    del self._cache[next(iter(self._cache))]
+                self._cache[tick] = value
+        return value
+
+    def __iter__(self):
+        return iter(self.run.ticks.tolist())
+
+    def __len__(self):
+        return len(self.run.ticks)
+
+    def __contains__(self, tick):
+        try:
+            self.run.tick_row(tick)
+        except KeyError:
+            return False
+        return True
+
+    def forget(self, ticks):
+        """Drop the built dicts of ticks whose arrays changed."""
+        for tick in ticks:
+            self._cache.pop(tick, None)
+
+
+class CsvTail:
+    """
+    Follows a results CSV that NTN.py is still appending to. read() parses only
+    the complete lines written since the previous call, starting from the byte
+    offset where that call stopped. If the file shrinks (rewritten), the next
+    read starts over from the top.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._rewind()
+
+    def _rewind(self):
+        with open(self.path, 'rb') as f:
+            self.header = f.readline()
+        self.offset = len(self.header)
+
+    def read(self):
+        """New rows as read_columns() columns (None if nothing complete was appended)."""
+        try:
+            size = os.path.getsize(self.path)
+            if size < self.offset:
+                self._rewind()
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset)
+                chunk = f.read(size - self.offset)
+        except OSError:
+            return None
+        end = chunk.rfind(b'\n') + 1       # leave a half-written last line for next time
+        if not end:
+            return None
+        self.offset += end
+        return read_columns(io.StringIO((self.header + chunk[:end]).decode(), newline=''))
+
+
+def merge_rows(cols, sim_nums, tick_data, pos_data, time_data, runs):
+    """
+    Merge freshly appended rows (CsvTail.read()) into the load_data()
+    structures in place. Returns {sim: tick rows changed} for the runs touched.
+    """
+    changed = {}
+    for sim, part in _frame_runs(cols).items():
+        if sim in runs:
+            run = runs[sim]
+            rows = run.merge(part)
+            ticks = run.ticks[rows].tolist()
+            tick_data[sim].forget(ticks)
+            pos_data[sim].forget(ticks)
+        else:
+            run = runs[sim] = part
+            rows = np.arange(len(part.ticks))
+            tick_data[sim], pos_data[sim], time_data[sim] = _tick_views(run)
+            bisect.insort(sim_nums, sim)
+        changed[sim] = rows
+    return changed
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -154,9 +842,10 @@ def _bar(value, max_val, width=20):
     return '█' * filled + '░' * (width - filled)
 
 
-def print_cli(sim_nums, tick_data, pos_data, time_data, tick_filter=None):
+def print_cli(sim_nums, tick_data, pos_data, time_data, runs, tick_filter=None):
     W = 66
     for sim in sim_nums:
+        stats = runs[sim].stats
         ticks = sorted(tick_data[sim].keys())
         if tick_filter is not None:
             if tick_filter not in ticks:
@@ -165,18 +854,19 @@ def print_cli(sim_nums, tick_data, pos_data, time_data, tick_filter=None):
             ticks = [tick_filter]
 
         for tick in ticks:
+            k       = stats.tick_pos[tick]
             delays  = tick_data[sim][tick]
-            active  = {k: v for k, v in delays.items() if v is not None}
-            avg     = round(sum(active.values()) / len(active), 1) if active else 0.0
+            n_up    = int(stats.active[k])
+            avg     = float(stats.tick_avg[k])
             time_s  = time_data[sim].get(tick, 0)
-            max_dly = max(active.values()) if active else 1
+            max_dly = float(stats.tick_max[k])
 
             print('╔' + '═' * W + '╗')
             title = f'NTN DASHBOARD  —  Simulation #{sim}'
             print(f'║{title:^{W}}║')
             print('╠' + '═' * W + '╣')
             kpi = (f'  TICK: {tick}  │  TIME: {time_s:.0f}s  │  '
-                   f'ACTIVE: {len(active)}/{len(ALL_LINKS)}  │  '
+                   f'ACTIVE: {n_up}/{len(ALL_LINKS)}  │  '
                    f'AVG DELAY: {avg} ms')
             print(f'║{kpi:<{W}}║')
             print('╠' + '═' * W + '╣')
@@ -202,6 +892,72 @@ def print_cli(sim_nums, tick_data, pos_data, time_data, tick_filter=None):
             print()
 
 
+# ── machine-readable export ───────────────────────────────────────────────────
+# One record per tick straight from the run arrays, CHUNK_TICKS ticks at a time
+# through a buffered writer, so the report is never held in memory whole:
+#   csv     sim,tick,time_s,active,avg_delay,<one delay column per link>
+#   ndjson  {"sim","tick","time_s","active","avg_delay","delay":{link: ms}} per line
+#   json    {"links": [...], "ticks": [<the ndjson records>]}
+# A down link has an empty / null delay; avg_delay is empty / null with none up.
+
+FORMATS     = ('table', 'json', 'ndjson', 'csv')
+CHUNK_TICKS = 8192
+
+
+def _nullable(a, digits=None):
+    """Array -> nested lists with NaN as None (JSON null)."""
+    a = np.asarray(a, dtype=float)
+    if digits is not None:
+        a = np.round(a, digits)
+    return np.where(np.isnan(a), None, a).tolist()
+
+
+def _record_chunks(runs, sim_nums, tick_filter=None):
+    """Yield (sim, ticks, time_s, active, avg_delay, delay) lists per chunk of ticks."""
+    for sim in sim_nums:
+        run   = runs[sim]
+        stats = run.stats
+        if tick_filter is None:
+            chunks = [slice(i0, i0 + CHUNK_TICKS) for i0 in range(0, len(run.ticks), CHUNK_TICKS)]
+        elif tick_filter in stats.tick_pos:
+            k = stats.tick_pos[tick_filter]
+            chunks = [slice(k, k + 1)]
+        else:
+            print(f'[warn] Tick {tick_filter} not found in simulation #{sim}', file=sys.stderr)
+            continue
+        for sl in chunks:
+            avg = np.where(stats.active[sl] > 0, stats.tick_avg[sl], np.nan)
+            yield (sim, run.ticks[sl].tolist(), run.time_s[sl].tolist(), stats.active[sl].tolist(),
+                   _nullable(avg), _nullable(run.delay[sl]))
+
+
+def write_records(out, runs, sim_nums, fmt, tick_filter=None):
+    """Stream every tick of sim_nums to the text stream out as fmt ('json', 'ndjson' or 'csv')."""
+    chunks = _record_chunks(runs, sim_nums, tick_filter)
+    if fmt == 'csv':
+        writer = csv.writer(out, lineterminator='\n')
+        writer.writerow(['sim', 'tick', 'time_s', 'active', 'avg_delay', *ALL_LINKS])
+        for sim, ticks, time_s, active, avg, delay in chunks:
+            writer.writerows([(sim, *rec[:4], *rec[4]) for rec in zip(ticks, time_s, active, avg, delay)])
+        return
+
+    dumps = json.JSONEncoder(separators=(',', ':')).encode
+    if fmt == 'json':
+        out.write(f'{{"links":{dumps(ALL_LINKS)},"ticks":[')
+    first = True
+    for sim, ticks, time_s, active, avg, delay in chunks:
+        lines = [dumps({'sim': sim, 'tick': t, 'time_s': ts, 'active': a, 'avg_delay': av,
+                        'delay': dict(zip(ALL_LINKS, d))})
+                 for t, ts, a, av, d in zip(ticks, time_s, active, avg, delay)]
+        if fmt == 'ndjson':
+            out.write(''.join(line + '\n' for line in lines))
+        elif lines:
+            out.write(('\n' if first else ',\n') + ',\n'.join(lines))
+            first = False
+    if fmt == 'json':
+        out.write('\n]}\n')
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # 4.  MATPLOTLIB GUI
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -235,40 +991,140 @@ def _kpi(ax, label, value, unit='', color=ACCENT):
     ax.text(0.5, 0.73, label,
             transform=ax.transAxes, ha='center', va='center',
             color=MUTED, fontsize=8, fontweight='bold')
-    ax.text(0.5, 0.38, str(value),
-            transform=ax.transAxes, ha='center', va='center',
-            color=color, fontsize=22, fontweight='bold')
-    if unit:
-        ax.text(0.5, 0.10, unit,
-                transform=ax.transAxes, ha='center', va='center',
-                color=MUTED, fontsize=8)
+    value_txt = ax.text(0.5, 0.38, str(value),
+                        transform=ax.transAxes, ha='center', va='center',
+                        color=color, fontsize=22, fontweight='bold')
+    unit_txt = ax.text(0.5, 0.10, unit,
+                       transform=ax.transAxes, ha='center', va='center',
+                       color=MUTED, fontsize=8)
+    return value_txt, unit_txt
+
+
+# ── level of detail ───────────────────────────────────────────────────────────
+# Long runs are drawn at the resolution of the axes, not of the data: at most a
+# few points (or bars) per horizontal pixel of the visible tick range.
+
+def _view_rows(ticks, lo, hi):
+    """Row range of the ticks inside [lo, hi], plus one neighbour each side."""
+    i0 = max(int(np.searchsorted(ticks, lo, 'left')) - 1, 0)
+    i1 = min(int(np.searchsorted(ticks, hi, 'right')) + 1, len(ticks))
+    return i0, i1
+
+
+def _minmax_lod(x, y, n):
+    """
+    Min/max decimation of one series to n buckets: the lowest and highest
+    point of every bucket, in their original order, and a NaN after any bucket
+    that has a gap so outages still break the line. Series that already fit
+    in 2n points come back untouched.
+    """
+    m = len(x)
+    if m <= 2 * n:
+        return x, y
+    k   = -(-m // n)
+    nb  = -(-m // k)
+    pad = nb * k - m
+    xs = np.concatenate([x, np.full(pad, x[-1])]).reshape(nb, k).astype(float)
+    ys = np.concatenate([y, np.full(pad, np.nan)]).reshape(nb, k)
+    gap = np.isnan(ys)
+    gap[-1, k - pad:] = False
+    lo = np.where(gap, np.inf, ys).argmin(axis=1)
+    hi = np.where(gap, -np.inf, ys).argmax(axis=1)
+    rows = np.arange(nb)
+    first, second = np.minimum(lo, hi), np.maximum(lo, hi)
+    px = np.column_stack([xs[rows, first], xs[rows, second], xs[:, -1]])
+    py = np.column_stack([ys[rows, first], ys[rows, second], np.full(nb, np.nan)])
+    keep = np.ones((nb, 3), dtype=bool)
+    keep[:, 2] = gap.any(axis=1)
+    return (np.r_[x[0], px[keep], x[-1]], np.r_[y[0], py[keep], y[-1]])
+
+
+def _state_lod(ticks, up, i0, i1, n):
+    """
+    Up/down spans of every link over rows i0:i1 with at most n buckets. A
+    bucket the link was up for all of is up, one it was down for all of is
+    down, anything else is mixed — a short outage stays visible however far
+    the view is zoomed out.
+
+    Returns [(up_spans, down_spans, mixed_spans)] per link, spans as
+    (start, width) in ticks.
+    """
+    m = i1 - i0
+    if m <= 0:
+        return [([], [], [])] * up.shape[1]
+    k = max(-(-m // n), 1)
+    edges = np.arange(i0, i1, k)
+    all_up  = np.logical_and.reduceat(up[i0:i1], edges - i0, axis=0)
+    any_up  = np.logical_or.reduceat(up[i0:i1], edges - i0, axis=0)
+    bucket  = all_up.astype(np.int8) + any_up      # 2 up, 1 mixed, 0 down
+    start = ticks[edges] - 0.5
+    end   = ticks[np.minimum(edges + k, i1) - 1] + 0.5
+    order = ticks[edges] if k == 1 else np.arange(len(edges))
+    out = []
+    for l in range(up.shape[1]):
+        runs, state = _spans(bucket[:, l], order)
+        a, b = runs[:, 0], runs[:, 1] - 1
+        spans = list(zip(start[a].tolist(), (end[b] - start[a]).tolist()))
+        out.append(tuple([sp for sp, st in zip(spans, state) if st == want] for want in (2, 0, 1)))
+    return out
+
+
+# Timeline cells get their delay printed in them up to this many ticks
+TIMELINE_LABEL_TICKS = 60
+
+SAT_MARKERS = {'L3': 'D', 'L2': '^', 'L1': 'o'}
 
 
 class NTNDashboard:
+    """
+    Artists are created once per simulation run (_build_run) and only updated
+    when the tick changes (_update_tick): the cursor lines, KPI values and map
+    markers are redrawn over a cached background with blitting, so scrubbing
+    cost does not grow with the number of ticks or links. Per-run averages,
+    up/down intervals and line segments come from RunData.stats.
+
+    With a DelayModel the delay chart overlays its predictions (dashed) and a
+    fifth card shows the prediction error. A run is predicted once, when it
+    is first shown (RunData.predictions); moving the tick never calls the model.
+    """
 
-    def __init__(self, sim_nums, tick_data, pos_data, time_data):
+    def __init__(self, sim_nums, tick_data, pos_data, time_data, runs, blit=True, model=None):
+        _load_matplotlib()
+        self.model     = model
         self.sim_nums  = sim_nums
         self.tick_data = tick_data
         self.pos_data  = pos_data
         self.time_data = time_data
+        self.runs      = runs
         self.sim_idx   = 0
         self.cur_tick  = 0
+        self._tick_lists = {}
+        self._bg = None
         self._build()
+        self._blit = blit and self.fig.canvas.supports_blit
         self._widgets()
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+        self.fig.canvas.mpl_connect('resize_event', self._on_view)
         self.render()
 
     @property
     def sim(self):
         return self.sim_nums[self.sim_idx]
 
+    @property
+    def stats(self):
+        return self.runs[self.sim].stats
+
     @property
     def ticks(self):
-        return sorted(self.tick_data[self.sim].keys())
+        if self.sim not in self._tick_lists:
+            self._tick_lists[self.sim] = sorted(self.tick_data[self.sim].keys())
+        return self._tick_lists[self.sim]
 
     # ── layout ────────────────────────────────────────────────────────────────
 
     def _build(self):
-        self.fig = plt.figure(figsize=(18, 11), facecolor=BG)
+        self.fig = plt.figure(figsize=FIGSIZE, facecolor=BG)
         try:
             self.fig.canvas.manager.set_window_title('NTN Dashboard')
         except Exception:
@@ -280,9 +1136,10 @@ class NTNDashboard:
             hspace=0.40, left=0.06, right=0.97, top=0.94, bottom=0.09,
         )
 
-        # Row 0 — KPI cards
-        kpi_gs = gridspec.GridSpecFromSubplotSpec(1, 4, subplot_spec=outer[0], wspace=0.16)
-        self.ax_kpi = [self.fig.add_subplot(kpi_gs[0, i]) for i in range(4)]
+        # Row 0 — KPI cards (a fifth for the prediction error with --model)
+        n_kpi = 5 if self.model else 4
+        kpi_gs = gridspec.GridSpecFromSubplotSpec(1, n_kpi, subplot_spec=outer[0], wspace=0.16)
+        self.ax_kpi = [self.fig.add_subplot(kpi_gs[0, i]) for i in range(n_kpi)]
 
         # Row 1 — delay line + avg bar
         mid = gridspec.GridSpecFromSubplotSpec(
@@ -317,6 +1174,9 @@ class NTNDashboard:
         )
         self.slider.label.set_color(TEXT)
         self.slider.valtext.set_color(TEXT)
+        # the slider is drawn with the other tick-dependent artists (_refresh),
+        # never on its own
+        self.slider.drawon = False
 
         for ax, label in [(self.ax_prev, '◀  Prev Sim'), (self.ax_next, 'Next Sim  ▶')]:
             ax.set_facecolor(PANEL)
@@ -333,11 +1193,16 @@ class NTNDashboard:
         self.btn_next.on_clicked(self._next_sim)
 
     def _on_tick(self, val):
-        self.cur_tick = int(round(val))
         t = self.ticks
-        if self.cur_tick not in t:
-            self.cur_tick = min(t, key=lambda x: abs(x - self.cur_tick))
-        self.render()
+        tick = int(round(val))
+        if tick not in self.tick_data[self.sim]:
+            i = bisect.bisect_left(t, tick)
+            tick = min(t[max(0, i - 1):i + 1], key=lambda x: abs(x - tick))
+        if tick != self.cur_tick or not self._blit:
+            self.cur_tick = tick
+            self._update_tick()
+        else:
+            self._refresh()
 
     def _prev_sim(self, _):
         self.sim_idx = (self.sim_idx - 1) % len(self.sim_nums)
@@ -350,23 +1215,136 @@ class NTNDashboard:
         self.render()
 
     def _reset_slider(self):
-        self.cur_tick = 0
+        self.cur_tick = self.ticks[0] if self.ticks else 0
         max_t = max(self.ticks) if self.ticks else 1
         self.slider.valmax = max_t
         self.slider.ax.set_xlim(0, max_t)
-        self.slider.set_val(0)
+        self.slider.eventson = False
+        self.slider.set_val(self.cur_tick)
+        self.slider.eventson = True
+
+    def goto(self, sim, tick):
+        """Show the given run and tick without redrawing (headless export)."""
+        if sim != self.sim:
+            self.sim_idx = self.sim_nums.index(sim)
+            self._reset_slider()
+            self.render()
+        self.cur_tick = tick
+        self._update_tick(draw=False)
+
+    # ── live tail (--follow) ──────────────────────────────────────────────────
+
+    def follow(self, tail, interval_s=1.0, sim=None):
+        """
+        Poll tail for appended rows every interval_s and grow the plots with
+        them. With sim set, rows of other runs are ignored.
+        """
+        self._tail = tail
+        self._follow_sim = sim
+        self._follow_timer = self.fig.canvas.new_timer(interval=int(interval_s * 1000))
+        self._follow_timer.add_callback(self._poll)
+        self._follow_timer.start()
+
+    def _poll(self):
+        cols = self._tail.read()
+        if cols is not None and self._follow_sim is not None:
+            cols = take_rows(cols, cols['sim_number'] == self._follow_sim)
+        if cols is None:
+            return
+        sim, last = self.sim, self.ticks[-1]
+        changed = merge_rows(cols, self.sim_nums, self.tick_data, self.pos_data,
+                             self.time_data, self.runs)
+        self._tick_lists.clear()
+        self.sim_idx = self.sim_nums.index(sim)
+        self._title()
+        self._kpi_text[0][1].set_text(f'{self.sim_idx + 1} of {len(self.sim_nums)}')
+        if sim in changed:
+            # a cursor parked on the newest tick keeps following the run
+            if self.cur_tick == last:
+                self.cur_tick = self.ticks[-1]
+            self._extend()
+        self.fig.canvas.draw_idle()
+
+    def _extend(self):
+        """Grow the current run's panels after new rows were merged into it."""
+        run = self.runs[self.sim]
+        links = [link for link in ALL_LINKS if len(self.stats.segments[link])]
+        if links != list(self._lines) or self.stats.sats != self._map_sats:
+            # a link came up or a node appeared for the first time: new legend
+            # entries / map labels, so build the run's artists again
+            self.render()
+            return
+        # a view showing the whole run grows with it; a zoomed-in one stays put
+        full = self.ax_line.get_autoscalex_on()
+        self._lod_lines(full_range=full)
+        if full:
+            with self.ax_line.callbacks.blocked(signal='xlim_changed'):
+                self.ax_line.relim()
+                self.ax_line.autoscale_view()
+        self._avg_bar()
+        if self._tl_full:
+            self._timeline_xlim()
+        self._timeline_bars()
+
+        max_t = max(self.ticks)
+        self.slider.valmax = max_t
+        self.slider.ax.set_xlim(0, max_t)
+        self._update_tick(draw=False)
 
     # ── render ────────────────────────────────────────────────────────────────
 
     def render(self):
+        """Rebuild every panel for the current run (sim change / first draw)."""
+        if self.cur_tick not in self.tick_data[self.sim] and self.ticks:
+            self.cur_tick = self.ticks[0]
+        self._dynamic = []       # artists redrawn on every tick change
+        self._dynamic_axes = []  # axes redrawn whole on every tick change
         self._title()
         self._kpis()
         self._delay_line()
         self._avg_bar()
         self._timeline()
         self._sat_map()
+        self._dynamic_axes.append(self.ax_slider)
+        for artist in self._dynamic:
+            artist.set_animated(self._blit)
+        self._update_tick(draw=False)
+        self._bg = None
         self.fig.canvas.draw_idle()
 
+    def _update_tick(self, draw=True):
+        self._update_kpis()
+        self._update_cursors()
+        self._update_sat_map()
+        if draw:
+            self._refresh()
+
+    # ── blitting ──────────────────────────────────────────────────────────────
+
+    def _on_draw(self, event):
+        # a full draw (first show, resize, sim change) leaves out the animated
+        # artists: keep that as the background and put them on top
+        if not self._blit:
+            return
+        self._bg = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_dynamic()
+
+    def _draw_dynamic(self):
+        for ax in self._dynamic_axes:
+            self.fig.draw_artist(ax)
+        for artist in self._dynamic:
+            self.fig.draw_artist(artist)
+
+    def _refresh(self):
+        canvas = self.fig.canvas
+        if not self._blit or self._bg is None:
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self._bg)
+        self._draw_dynamic()
+        canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+
     # ── title ─────────────────────────────────────────────────────────────────
 
     def _title(self):
@@ -385,26 +1363,46 @@ class NTNDashboard:
     # ── KPI cards ─────────────────────────────────────────────────────────────
 
     def _kpis(self):
-        delays = self.tick_data[self.sim][self.cur_tick]
-        active = [v for v in delays.values() if v is not None]
-        avg    = round(sum(active) / len(active), 1) if active else 0.0
-        t_s    = self.time_data[self.sim].get(self.cur_tick, 0)
-        n      = len(self.sim_nums)
-
-        link_col = GREEN if len(active) >= 6 else (YELLOW if len(active) >= 3 else RED)
+        n = len(self.sim_nums)
         cards = [
-            ('Simulation Run',  f'#{self.sim}',
-             f'{self.sim_idx + 1} of {n}',  ACCENT),
-            ('Current Tick',    str(self.cur_tick),
-             f'time = {t_s:.0f} s',          YELLOW),
-            ('Active Links',    f'{len(active)} / {len(ALL_LINKS)}',
-             'links currently up',           link_col),
-            ('Avg Link Delay',  str(avg),
-             'ms (active links only)',       PURPLE),
+            ('Simulation Run',  f'#{self.sim}', f'{self.sim_idx + 1} of {n}', ACCENT),
+            ('Current Tick',    '',             '',                            YELLOW),
+            ('Active Links',    '',             'links currently up',          GREEN),
+            ('Avg Link Delay',  '',             'ms (active links only)',      PURPLE),
         ]
+        if self.model:
+            cards.append(('Prediction Error', '', '', RED))
+        self._kpi_text = []
         for ax, (lbl, val, unit, col) in zip(self.ax_kpi, cards):
             ax.clear()
-            _kpi(ax, lbl, val, unit, col)
+            self._kpi_text.append(_kpi(ax, lbl, val, unit, col))
+        # the tick-dependent cards are small: redraw them whole
+        self._dynamic_axes += self.ax_kpi[1:]
+
+    def _update_kpis(self):
+        k      = self.stats.tick_pos[self.cur_tick]
+        n_up   = int(self.stats.active[k])
+        avg    = float(self.stats.tick_avg[k])
+        t_s    = self.time_data[self.sim].get(self.cur_tick, 0)
+
+        link_col = GREEN if n_up >= 6 else (YELLOW if n_up >= 3 else RED)
+        (tick_val, tick_unit), (link_val, _), (avg_val, _) = self._kpi_text[1:4]
+        tick_val.set_text(str(self.cur_tick))
+        tick_unit.set_text(f'time = {t_s:.0f} s')
+        link_val.set_text(f'{n_up} / {len(ALL_LINKS)}')
+        link_val.set_color(link_col)
+        for sp in self.ax_kpi[2].spines.values():
+            sp.set_color(link_col)
+        avg_val.set_text(str(avg))
+
+        if self.model:
+            # cached per run: an array lookup, never a model call
+            pred = self.runs[self.sim].predictions(self.model)
+            err_val, err_unit = self._kpi_text[4]
+            mae = float(pred.tick_mae[k])
+            err_val.set_text('—' if mae != mae else f'{mae:.1f}')
+            err_unit.set_text(f'ms MAE now  ·  run {pred.mae:.1f} / RMSE {pred.rmse:.1f}'
+                              if pred.n else 'no ticks to score')
 
     # ── delay over time ───────────────────────────────────────────────────────
 
@@ -413,40 +1411,57 @@ class NTNDashboard:
         ax.clear()
         _style(ax, 'Link Delay over Time', 'Tick', 'Delay (ms)')
 
-        ticks = self.ticks
         handles = []
+        self._lines = {}
+        self._pred_lines = {}
         for link in ALL_LINKS:
-            vals = [self.tick_data[self.sim][t].get(link) for t in ticks]
-            # split into continuous segments
-            segs_x, segs_y, cur_x, cur_y = [], [], [], []
-            for t, d in zip(ticks, vals):
-                if d is not None:
-                    cur_x.append(t); cur_y.append(d)
-                else:
-                    if cur_x:
-                        segs_x.append(cur_x); segs_y.append(cur_y)
-                    cur_x, cur_y = [], []
-            if cur_x:
-                segs_x.append(cur_x); segs_y.append(cur_y)
-
+            if not len(self.stats.segments[link]):
+                continue
+            # NaN while the link is down: matplotlib breaks the line there
             col = LINK_COLOR[link]
-            first = True
-            for sx, sy in zip(segs_x, segs_y):
-                lbl = link if first else '_'
-                line, = ax.plot(sx, sy, color=col, linewidth=1.6,
-                                alpha=0.85, label=lbl)
-                first = False
-            if segs_x:
-                handles.append(matplotlib.lines.Line2D(
-                    [], [], color=col, linewidth=1.6, label=link))
-
-        ax.axvline(self.cur_tick, color=TEXT, linewidth=1.3,
-                   linestyle='--', alpha=0.75, zorder=10)
+            self._lines[link], = ax.plot([], [], color=col, linewidth=1.6, alpha=0.85, label=link)
+            handles.append(matplotlib.lines.Line2D(
+                [], [], color=col, linewidth=1.6, label=link))
+            if self.model:
+                self._pred_lines[link], = ax.plot([], [], color=col, linewidth=1.1,
+                                                  linestyle='--', alpha=0.6)
+        if self._pred_lines:
+            handles.append(matplotlib.lines.Line2D(
+                [], [], color=MUTED, linewidth=1.1, linestyle='--',
+                label=f'predicted ({self.model.version})'))
+        self._lod_lines(full_range=True)
+        ax.relim()
+        ax.autoscale_view()
+
+        self._line_cursor = ax.axvline(self.cur_tick, color=TEXT, linewidth=1.3,
+                                       linestyle='--', alpha=0.75, zorder=10)
+        self._dynamic.append(self._line_cursor)
         if handles:
             ax.legend(handles=handles, fontsize=6, loc='upper right',
                       framealpha=0.25, labelcolor=TEXT,
                       facecolor=PANEL, edgecolor=BORDER, ncol=2, handlelength=1.2)
         ax.xaxis.set_major_locator(MaxNLocator(integer=True))
+        ax.callbacks.connect('xlim_changed', lambda _ax: self._lod_lines())
+
+    def _lod_lines(self, full_range=False):
+        """Point the delay lines at a min/max decimation of the visible tick range."""
+        run = self.runs[self.sim]
+        if full_range:
+            i0, i1 = 0, len(run.ticks)
+        else:
+            i0, i1 = _view_rows(run.ticks, *self.ax_line.get_xlim())
+        n = max(int(self.ax_line.bbox.width), 100)
+        for link, line in self._lines.items():
+            line.set_data(*_minmax_lod(run.ticks[i0:i1], run.delay[i0:i1, ALL_LINKS.index(link)], n))
+        if self._pred_lines:
+            pred = run.predictions(self.model).pred
+            for link, line in self._pred_lines.items():
+                line.set_data(*_minmax_lod(run.ticks[i0:i1], pred[i0:i1, ALL_LINKS.index(link)], n))
+
+    def _on_view(self, event=None):
+        # the figure was resized: redo the level of detail for the new pixel widths
+        self._lod_lines()
+        self._timeline_bars()
 
     # ── avg delay bar ─────────────────────────────────────────────────────────
 
@@ -455,13 +1470,7 @@ class NTNDashboard:
         ax.clear()
         _style(ax, 'Avg Delay per Link', 'ms', grid_y=False)
 
-        avgs = []
-        for link in ALL_LINKS:
-            vals = [self.tick_data[self.sim][t][link]
-                    for t in self.ticks
-                    if self.tick_data[self.sim][t].get(link) is not None]
-            avgs.append((link, round(sum(vals) / len(vals), 1) if vals else 0.0))
-        avgs.sort(key=lambda x: x[1], reverse=True)
+        avgs = sorted(self.stats.link_avg.items(), key=lambda x: x[1], reverse=True)
 
         names  = [a[0] for a in avgs]
         values = [a[1] for a in avgs]
@@ -492,33 +1501,87 @@ class NTNDashboard:
         ax.clear()
         _style(ax, 'Link Up/Down Timeline', 'Tick', grid_x=False, grid_y=False)
 
-        ticks = self.ticks
-        for i, link in enumerate(ALL_LINKS):
-            for t in ticks:
-                d = self.tick_data[self.sim][t].get(link)
-                col = GREEN if d is not None else RED
-                ax.barh(i, 1, left=t - 0.5, color=col, alpha=0.78,
-                        height=0.72, edgecolor=BG, linewidth=0.4)
-                if d is not None:
-                    ax.text(t, i, f'{d:.0f}', ha='center', va='center',
-                            fontsize=5.5, color=BG, fontweight='bold')
+        self._tl_bars = []
+        self._timeline_xlim()
+        self._timeline_bars()
 
         # Highlight current tick column
-        ax.axvline(self.cur_tick, color=TEXT, linewidth=1.5,
-                   linestyle='--', alpha=0.85, zorder=5)
-        ax.axvspan(self.cur_tick - 0.5, self.cur_tick + 0.5,
-                   alpha=0.10, color=ACCENT, zorder=4)
+        self._tl_cursor = ax.axvline(self.cur_tick, color=TEXT, linewidth=1.5,
+                                     linestyle='--', alpha=0.85, zorder=5)
+        self._tl_span = mpatches.Rectangle(
+            (self.cur_tick - 0.5, 0), 1, 1, transform=ax.get_xaxis_transform(),
+            alpha=0.10, color=ACCENT, zorder=4)
+        ax.add_patch(self._tl_span)
+        self._dynamic += [self._tl_span, self._tl_cursor]
 
         ax.set_yticks(range(len(ALL_LINKS)))
         ax.set_yticklabels(ALL_LINKS, fontsize=7, color=TEXT)
         ax.tick_params(axis='y', length=0)
-        ax.set_xlim(min(ticks) - 0.6, max(ticks) + 0.6)
+        ax.set_ylim(-0.6, len(ALL_LINKS) - 0.4)
         ax.xaxis.set_major_locator(MaxNLocator(integer=True))
 
         up_p   = mpatches.Patch(color=GREEN, alpha=0.78, label='Up')
         down_p = mpatches.Patch(color=RED,   alpha=0.78, label='Down')
-        ax.legend(handles=[up_p, down_p], fontsize=7, loc='upper right',
+        legend = [up_p, down_p]
+        if len(self.ticks) > ax.bbox.width:
+            # more ticks than pixels: zoomed out, a bar can cover both states
+            legend.append(mpatches.Patch(color=YELLOW, alpha=0.78, label='Both'))
+        ax.legend(handles=legend, fontsize=7, loc='upper right',
                   facecolor=PANEL, edgecolor=BORDER, labelcolor=TEXT)
+        ax.callbacks.connect('xlim_changed', self._on_timeline_view)
+
+    def _timeline_xlim(self):
+        ticks = self.ticks
+        with self.ax_timeline.callbacks.blocked(signal='xlim_changed'):
+            self.ax_timeline.set_xlim(min(ticks) - 0.6, max(ticks) + 0.6)
+        self._tl_full = True
+
+    def _on_timeline_view(self, ax):
+        # zoomed or panned by the user: stop growing with a followed run
+        self._tl_full = False
+        self._timeline_bars()
+
+    def _timeline_bars(self):
+        """(Re)draw the up/down bars — the part of the timeline that grows with the run."""
+        ax = self.ax_timeline
+        for artist in self._tl_bars:
+            artist.remove()
+        self._tl_bars = []
+
+        ticks = self.ticks
+        run   = self.runs[self.sim]
+        label_cells = len(ticks) <= TIMELINE_LABEL_TICKS
+        n = max(int(ax.bbox.width), 100)
+        i0, i1 = _view_rows(run.ticks, *ax.get_xlim())
+        if i1 - i0 == len(ticks) and len(ticks) <= n:
+            intervals = [self.stats.intervals[link] + ([],) for link in ALL_LINKS]
+        else:
+            intervals = _state_lod(run.ticks, self.stats.up, i0, i1, n)
+        # one rectangle per continuous up/down/mixed run, one collection per state
+        verts = {GREEN: [], RED: [], YELLOW: []}
+        for i, link in enumerate(ALL_LINKS):
+            for col, spans in zip((GREEN, RED, YELLOW), intervals[i]):
+                verts[col] += [[(x, i - 0.36), (x, i + 0.36), (x + w, i + 0.36), (x + w, i - 0.36)]
+                               for x, w in spans]
+            if label_cells:
+                for t, d in zip(ticks, run.delay[:, i].tolist()):
+                    if d == d:
+                        self._tl_bars.append(ax.text(
+                            t, i, f'{d:.0f}', ha='center', va='center',
+                            fontsize=5.5, color=BG, fontweight='bold'))
+        for col, polys in verts.items():
+            self._tl_bars.append(ax.add_collection(PolyCollection(
+                polys, facecolors=col, alpha=0.78, edgecolor=BG, linewidth=0.4)))
+
+    def _update_cursors(self):
+        t = self.cur_tick
+        self._line_cursor.set_xdata([t, t])
+        self._tl_cursor.set_xdata([t, t])
+        self._tl_span.set_x(t - 0.5)
+        if self.slider.val != t:
+            self.slider.eventson = False
+            self.slider.set_val(t)
+            self.slider.eventson = True
 
     # ── satellite position map ────────────────────────────────────────────────
 
@@ -550,38 +1613,449 @@ class NTNDashboard:
         ax.text(CENTER, CENTER, '⊕', ha='center', va='center',
                 color='#79c0ff', fontsize=11, zorder=4)
 
-        # Active links
+        # Active links: one collection, segments swapped per tick
+        self._map_links = LineCollection([], alpha=0.45, linewidths=1.0, zorder=2)
+        ax.add_collection(self._map_links)
+
+        # Satellites: one scatter per layer (marker shape), one label per satellite
+        sats = self._map_sats = self.stats.sats
+        self._map_layers = {}
+        for layer, marker in SAT_MARKERS.items():
+            self._map_layers[layer] = ax.scatter(
+                [], [], s=62, c=SAT_COLORS[layer], marker=marker, zorder=5,
+                edgecolors=BG, linewidths=0.8)
+        self._map_labels = {
+            sat: ax.text(0, 0, sat, color=SAT_COLORS[SAT_LAYER.get(sat, 'L1')],
+                         fontsize=6, zorder=6, alpha=0.90)
+            for sat in sats
+        }
+        self._dynamic += [self._map_links, *self._map_layers.values(), *self._map_labels.values()]
+
+        pad = 22
+        ax.set_xlim(-pad, GRID + pad)
+        ax.set_ylim(-pad, GRID + pad)
+        ax.grid(True, color='#111825', linewidth=0.5)
+
+    def _update_sat_map(self):
         positions = self.pos_data[self.sim][self.cur_tick]
         delays    = self.tick_data[self.sim][self.cur_tick]
+
+        segments, colors = [], []
         for link, delay in delays.items():
             if delay is not None:
                 a, b = link.split('-', 1)
                 if a in positions and b in positions:
-                    x1, y1 = positions[a]['x'], positions[a]['y']
-                    x2, y2 = positions[b]['x'], positions[b]['y']
-                    ax.plot([x1, x2], [y1, y2], '-',
-                            color=LINK_COLOR[link], alpha=0.45, linewidth=1.0, zorder=2)
+                    segments.append([(positions[a]['x'], positions[a]['y']),
+                                     (positions[b]['x'], positions[b]['y'])])
+                    colors.append(LINK_COLOR[link])
+        self._map_links.set_segments(segments)
+        self._map_links.set_color(colors)
 
-        # Satellites
-        markers = {'L3': 'D', 'L2': '^', 'L1': 'o'}
+        by_layer = {layer: [] for layer in SAT_MARKERS}
         for sat, info in positions.items():
-            layer = SAT_LAYER.get(sat, 'L1')
-            col   = SAT_COLORS[layer]
-            ax.scatter(info['x'], info['y'], s=62, c=col,
-                       marker=markers[layer], zorder=5,
-                       edgecolors=BG, linewidths=0.8)
-            ax.text(info['x'] + 5, info['y'] + 4, sat,
-                    color=col, fontsize=6, zorder=6, alpha=0.90)
+            by_layer[SAT_LAYER.get(sat, 'L1')].append((info['x'], info['y']))
+        for layer, scatter in self._map_layers.items():
+            scatter.set_offsets(np.array(by_layer[layer]).reshape(-1, 2))
+
+        for sat, label in self._map_labels.items():
+            info = positions.get(sat)
+            label.set_visible(info is not None)
+            if info is not None:
+                label.set_position((info['x'] + 5, info['y'] + 4))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 5.  HEADLESS EXPORT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+VIDEO_EXTS = ('.mp4', '.mkv', '.webm', '.mov', '.avi', '.gif')
+
+# Video frames come back to the parent as raw RGBA (~8 MB each at dpi 100):
+# keep those chunks short and at most IN_FLIGHT chunks per worker outstanding,
+# so the parent never holds more than a few dozen frames.
+VIDEO_CHUNK = 4
+IN_FLIGHT   = 2
+
+# Set in the parent before the pool forks, so workers inherit the parsed data
+# instead of re-reading the CSV; _export_init() falls back to loading it.
+_EXPORT_DATA = None
+_EXPORT_DASH = None
+
+
+def _apply_theme():
+    _load_matplotlib()
+    matplotlib.rcParams.update({
+        'figure.facecolor': BG,
+        'axes.facecolor':   PANEL,
+        'text.color':       TEXT,
+        'xtick.color':      MUTED,
+        'ytick.color':      MUTED,
+        'axes.edgecolor':   BORDER,
+        'grid.color':       BORDER,
+        'font.family':      'monospace',
+    })
+
+
+def _export_init(csv_path, sims, dpi, model_path=None):
+    """Pool initializer: one Agg dashboard per worker, reused for every frame it renders."""
+    global _EXPORT_DASH
+    _load_matplotlib()
+    plt.switch_backend('Agg')
+    _apply_theme()
+    matplotlib.rcParams['figure.dpi'] = dpi
+    sim_nums, tick_data, pos_data, time_data, runs = _EXPORT_DATA or load_data(csv_path)
+    sim_nums = [s for s in sim_nums if s in sims]
+    model = DelayModel(model_path) if model_path else None
+    _EXPORT_DASH = NTNDashboard(sim_nums, tick_data, pos_data, time_data, runs, blit=False, model=model)
+
+
+def _export_chunk(sim, ticks, out_dir):
+    """
+    Render consecutive ticks of one run. Writes one PNG per tick into out_dir,
+    or, with out_dir None, returns the raw RGBA frames for the video pipe.
+    """
+    dash = _EXPORT_DASH
+    frames = []
+    for tick in ticks:
+        dash.goto(sim, tick)
+        if out_dir is not None:
+            dash.fig.savefig(os.path.join(out_dir, f'sim{sim}_tick{tick:06d}.png'))
+        else:
+            dash.fig.canvas.draw()
+            frames.append(bytes(dash.fig.canvas.buffer_rgba()))
+    return frames
+
+
+def _parse_range(text):
+    """'A:B' (either end optional) -> (A or None, B or None), inclusive."""
+    lo, _, hi = (text or ':').partition(':')
+    return (int(lo) if lo.strip() else None, int(hi) if hi.strip() else None)
 
-        pad = 22
-        ax.set_xlim(-pad, GRID + pad)
-        ax.set_ylim(-pad, GRID + pad)
-        ax.grid(True, color='#111825', linewidth=0.5)
+
+def export_frames(csv_path, data, out, tick_range=None, workers=None, fps=10,
+                  dpi=100, ffmpeg='ffmpeg', model_path=None):
+    """
+    Render every tick of every run in data (or the ticks inside tick_range)
+    with the Agg backend over a process pool — one figure per worker — into
+    PNGs in the directory out, or into a video when out ends in a VIDEO_EXTS
+    suffix (frames are piped to ffmpeg as raw RGBA). With model_path every
+    frame carries that model's prediction overlay. Returns frames written.
+    """
+    global _EXPORT_DATA
+    sim_nums, tick_data = data[0], data[1]
+    lo, hi = tick_range or (None, None)
+    jobs = []
+    for sim in sim_nums:
+        ticks = [t for t in sorted(tick_data[sim])
+                 if (lo is None or t >= lo) and (hi is None or t <= hi)]
+        jobs += [(sim, t) for t in ticks]
+    if not jobs:
+        print('[warn] no ticks in range — nothing to export')
+        return 0
+
+    workers = workers or os.cpu_count() or 1
+    video = out.lower().endswith(VIDEO_EXTS)
+    # a few chunks per worker keeps the pool busy; consecutive ticks of one run
+    # per chunk means a worker only rebuilds its figure when the run changes
+    size = max(1, min(VIDEO_CHUNK if video else 64, -(-len(jobs) // (workers * 4))))
+    chunks = []
+    for sim, tick in jobs:
+        if chunks and chunks[-1][0] == sim and len(chunks[-1][1]) < size:
+            chunks[-1][1].append(tick)
+        else:
+            chunks.append((sim, [tick]))
+
+    pipe = None
+    if video:
+        if shutil.which(ffmpeg) is None:
+            print(f'[error] {ffmpeg} not found — export PNGs to a directory instead')
+            sys.exit(1)
+        w, h = int(FIGSIZE[0] * dpi), int(FIGSIZE[1] * dpi)
+        pipe = subprocess.Popen(
+            [ffmpeg, '-loglevel', 'error', '-y',
+             '-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', f'{w}x{h}', '-r', str(fps), '-i', '-',
+             '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', out],
+            stdin=subprocess.PIPE)
+    else:
+        os.makedirs(out, exist_ok=True)
+
+    try:
+        ctx = multiprocessing.get_context('fork')
+        _EXPORT_DATA = data
+    except ValueError:
+        ctx = None
+    print(f'Exporting {len(jobs)} frame(s) with {workers} worker(s) → {out}')
+    done, start = 0, time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=ctx,
+            initializer=_export_init, initargs=(csv_path, set(sim_nums), dpi, model_path)) as pool:
+        # submit in a sliding window and collect in order: a chunk's frames go
+        # to the pipe as soon as it is the oldest one, not after the whole map
+        pending = collections.deque()
+
+        def collect():
+            nonlocal done
+            ticks, future = pending.popleft()
+            for frame in future.result():
+                pipe.stdin.write(frame)
+            done += len(ticks)
+            elapsed = time.perf_counter() - start
+            print(f'\r  {done}/{len(jobs)} frames  {done / elapsed:6.1f} frames/s', end='', flush=True)
+
+        for sim, ticks in chunks:
+            pending.append((ticks, pool.submit(_export_chunk, sim, ticks, None if video else out)))
+            if len(pending) >= workers * IN_FLIGHT:
+                collect()
+        while pending:
+            collect()
+    _EXPORT_DATA = None
+    if pipe is not None:
+        pipe.stdin.close()
+        if pipe.wait():
+            print(f'\n[error] {ffmpeg} exited with status {pipe.returncode}')
+            sys.exit(1)
+    elapsed = time.perf_counter() - start
+    print(f'\n  {done} frames in {elapsed:.1f} s  ({done / elapsed:.1f} frames/s)')
+    return done
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# 5.  MAIN
+# 6.  DATA SERVER
 # ═══════════════════════════════════════════════════════════════════════════════
+# --serve answers ntn_dashboard.html and simulation/simulation_viewer.html from
+# the parsed (cached) run arrays, so the browser fetches only the tick window it
+# is showing instead of parsing the whole CSV itself.
+#
+#   GET /                          ntn_dashboard.html
+#   GET /viewer                    simulation/simulation_viewer.html
+#   GET /api/runs                  every run: tick span, nodes, per-link avg / uptime
+#   GET /api/run/<sim>/ticks       ticks of one run, ?start=A&end=B (inclusive) or
+#                                  a "Range: ticks=A-B" header; &format=json|bin
+#
+# A slice holds at most PAGE_TICKS ticks. A longer or Range request is answered
+# 206 with "Content-Range: ticks A-B/<ticks in run>" and the JSON "next" field
+# says where the following page starts. Bodies are gzipped when the client
+# accepts it. Recently built slices are kept, up to SLICE_CACHE_BYTES of bodies.
+
+HERE       = os.path.dirname(os.path.abspath(__file__))
+PAGE_TICKS = 2000
+SLICE_CACHE_BYTES = 64 << 20
+STATIC     = {
+    '/':            ('ntn_dashboard.html', 'text/html; charset=utf-8'),
+    '/viewer':      (os.path.join('simulation', 'simulation_viewer.html'), 'text/html; charset=utf-8'),
+}
+
+
+class RunServer:
+    """
+    The JSON / binary views --serve hands out, built from {sim: RunData}.
+    Slice bodies are kept in a least-recently-used cache bounded by their
+    total size (cache_bytes); a body larger than that is never kept.
+    """
+
+    def __init__(self, runs, cache_bytes=SLICE_CACHE_BYTES):
+        self.runs = runs
+        self.cache_bytes = cache_bytes
+        self._cache = collections.OrderedDict()     # (format, sim, i0, i1) -> (body, size)
+        self._cache_size = 0
+        self._lock = threading.Lock()               # the server answers from many threads
+
+    def _cached(self, key, build):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key][0]
+        value = build()
+        size = len(value[0]) if isinstance(value, tuple) else len(value)
+        if size <= self.cache_bytes:
+            with self._lock:
+                if key not in self._cache:
+                    self._cache[key] = (value, size)
+                    self._cache_size += size
+                while self._cache_size > self.cache_bytes:
+                    _, (_, old) = self._cache.popitem(last=False)
+                    self._cache_size -= old
+        return value
+
+    def index(self):
+        out = []
+        for sim in sorted(self.runs):
+            run = self.runs[sim]
+            stats = run.stats
+            out.append({
+                'sim': sim, 'ticks': len(run.ticks),
+                'first': int(run.ticks[0]), 'last': int(run.ticks[-1]),
+                'nodes': run.nodes,
+                'link_avg': [stats.link_avg[l] for l in ALL_LINKS],
+                'uptime':   [round(stats.uptime[l], 4) for l in ALL_LINKS],
+            })
+        return {'links': ALL_LINKS, 'page_ticks': PAGE_TICKS, 'runs': out}
+
+    def rows(self, sim, start, end):
+        """
+        (i0, i1, truncated): rows of ticks start..end (None = open end), capped
+        at PAGE_TICKS; truncated if the cap cut the range short.
+        """
+        ticks = self.runs[sim].ticks
+        i0 = 0 if start is None else int(np.searchsorted(ticks, start, 'left'))
+        i1 = len(ticks) if end is None else int(np.searchsorted(ticks, end, 'right'))
+        return i0, min(i1, i0 + PAGE_TICKS), i1 > i0 + PAGE_TICKS
+
+    def slice_json(self, sim, i0, i1):
+        return self._cached(('json', sim, i0, i1), lambda: self._slice_json(sim, i0, i1))
+
+    def slice_bin(self, sim, i0, i1):
+        return self._cached(('bin', sim, i0, i1), lambda: self._slice_bin(sim, i0, i1))
+
+    def _slice_json(self, sim, i0, i1):
+        run = self.runs[sim]
+        vis = run.visibility(slice(i0, i1))
+        return json.dumps({
+            'sim': sim, 'links': ALL_LINKS, 'nodes': run.nodes,
+            'start': int(run.ticks[i0]), 'end': int(run.ticks[i1 - 1]),
+            'total': len(run.ticks),
+            'next': int(run.ticks[i1]) if i1 < len(run.ticks) else None,
+            'ticks':  run.ticks[i0:i1].tolist(),
+            'time_s': run.time_s[i0:i1].tolist(),
+            'x':      _nullable(run.x[i0:i1], 3),
+            'y':      _nullable(run.y[i0:i1], 3),
+            'alt':    _nullable(run.alt[i0:i1]),
+            # can_see[t][i] = indexes into nodes; [] for a node without a row
+            'can_see': [[np.flatnonzero(row).tolist() for row in tick] for tick in vis],
+            'delay':  _nullable(run.delay[i0:i1]),
+        }, separators=(',', ':')).encode()
+
+    def _slice_bin(self, sim, i0, i1):
+        """
+        Raw little-endian arrays back to back; the layout (name -> dtype, shape,
+        byte offset) goes out in the X-NTN-Layout header. NaN marks a missing
+        position or a down link; vis is uint8 (T, N, N).
+        """
+        run = self.runs[sim]
+        arrays = [
+            ('ticks',   run.ticks[i0:i1].astype('<i4')),
+            ('time_s',  run.time_s[i0:i1].astype('<f4')),
+            ('x',       run.x[i0:i1].astype('<f4')),
+            ('y',       run.y[i0:i1].astype('<f4')),
+            ('alt',     run.alt[i0:i1].astype('<f4')),
+            ('present', run.present[i0:i1].astype('u1')),
+            ('vis',     run.visibility(slice(i0, i1)).astype('u1')),
+            ('delay',   run.delay[i0:i1].astype('<f4')),
+        ]
+        layout, parts, offset = {}, [], 0
+        for name, arr in arrays:
+            pad = -offset % 4           # keep every typed array 4-byte aligned for JS views
+            parts.append(b'\0' * pad)
+            offset += pad
+            layout[name] = [arr.dtype.str, list(arr.shape), offset]
+            parts.append(arr.tobytes())
+            offset += arr.nbytes
+        layout['nodes'] = run.nodes
+        layout['links'] = ALL_LINKS
+        layout['next'] = int(run.ticks[i1]) if i1 < len(run.ticks) else None
+        return b''.join(parts), json.dumps(layout, separators=(',', ':'))
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    server_version = 'NTNDashboard/1.0'
+    api = None      # RunServer, set by serve()
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _send(self, status, body, ctype, headers=()):
+        if len(body) > 1024 and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=5)
+            headers = [*headers, ('Content-Encoding', 'gzip')]
+        self.send_response(status)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Accept-Ranges', 'ticks')
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._send(status, json.dumps({'error': message}).encode(), 'application/json')
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        parts = [p for p in url.path.split('/') if p]
+
+        if url.path in STATIC:
+            name, ctype = STATIC[url.path]
+            try:
+                with open(os.path.join(HERE, name), 'rb') as f:
+                    body = f.read()
+            except OSError:
+                return self._error(404, f'{name} not found')
+            return self._send(200, body, ctype)
+        if parts == ['api', 'runs']:
+            return self._send(200, json.dumps(self.api.index()).encode(), 'application/json')
+        if len(parts) == 4 and parts[:2] == ['api', 'run'] and parts[3] == 'ticks':
+            return self._ticks(parts[2], query)
+        self._error(404, f'no such resource: {url.path}')
+
+    def _ticks(self, sim, query):
+        try:
+            sim = int(sim)
+            start, end = _parse_range(f"{query.get('start', '')}:{query.get('end', '')}")
+            ranged = self.headers.get('Range', '')
+            if ranged:
+                unit, _, spec = ranged.partition('=')
+                if unit.strip() != 'ticks':
+                    return self._error(416, 'only "Range: ticks=A-B" is supported')
+                start, end = _parse_range(spec.replace('-', ':', 1))
+        except ValueError:
+            return self._error(400, 'start, end and Range must be tick numbers')
+        if sim not in self.api.runs:
+            return self._error(404, f'no simulation run #{sim}')
+
+        run = self.api.runs[sim]
+        i0, i1, truncated = self.api.rows(sim, start, end)
+        if i0 >= i1:
+            return self._error(416, f'no ticks of run #{sim} in that range')
+        partial = bool(ranged) or truncated
+        headers = [('Content-Range', f'ticks {run.ticks[i0]}-{run.ticks[i1 - 1]}/{len(run.ticks)}')]
+        if query.get('format', 'json') == 'bin':
+            body, layout = self.api.slice_bin(sim, i0, i1)
+            headers.append(('X-NTN-Layout', layout))
+            headers.append(('Access-Control-Expose-Headers', 'X-NTN-Layout, Content-Range'))
+            return self._send(206 if partial else 200, body, 'application/octet-stream', headers)
+        return self._send(206 if partial else 200, self.api.slice_json(sim, i0, i1),
+                          'application/json', headers)
+
+
+def serve(runs, host='127.0.0.1', port=8050, verbose=False):
+    """Serve the HTML viewers and the run-slice API until interrupted."""
+    handler = type('Handler', (_Handler,), {'api': RunServer(runs)})
+    httpd = http.server.ThreadingHTTPServer((host, port), handler)
+    httpd.verbose = verbose
+    print(f'Serving http://{host}:{httpd.server_port}/  (dashboard)  '
+          f'and /viewer  (simulation viewer) — Ctrl+C to stop')
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 7.  MAIN
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _locate(path):
+    """path if it exists, else the same name next to this script, else None."""
+    if os.path.exists(path):
+        return path
+    alt = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+    return alt if os.path.exists(alt) else None
+
 
 def main():
     ap = argparse.ArgumentParser(description='NTN Interactive Dashboard')
@@ -589,54 +2063,110 @@ def main():
                     help='Path to simulation results CSV  (default: "simulation results.csv")')
     ap.add_argument('--cli',  action='store_true',
                     help='Print formatted table to terminal instead of opening GUI')
+    ap.add_argument('--format', choices=FORMATS, default='table',
+                    help='(CLI mode) table (default), or stream every tick to stdout as '
+                         'json, ndjson or csv; anything but table implies --cli')
     ap.add_argument('--tick', type=int, default=None,
                     help='(CLI mode) show only this tick number')
     ap.add_argument('--sim',  type=int, default=None,
-                    help='(CLI mode) show only this simulation run number')
+                    help='(CLI / export mode) show only this simulation run number')
+    ap.add_argument('--no-cache', action='store_true',
+                    help='Parse the CSV even if an up-to-date parse cache (<csv>.cache) exists, and do not write one')
+    ap.add_argument('--follow', nargs='?', type=float, const=1.0, default=None, metavar='S',
+                    help='(GUI mode) keep reading rows appended to the CSV every S seconds (default 1)')
+    ap.add_argument('--export', metavar='OUT', default=None,
+                    help='Render frames headless instead of opening the GUI: PNGs into directory OUT, '
+                         f'or a video if OUT ends in {"/".join(VIDEO_EXTS)} (needs ffmpeg)')
+    ap.add_argument('--ticks', metavar='A:B', default=None,
+                    help='(export mode) only ticks A..B inclusive, either end optional')
+    ap.add_argument('--workers', type=int, default=None,
+                    help='(export mode) render processes (default: one per CPU)')
+    ap.add_argument('--fps', type=float, default=10, help='(export mode) video frame rate (default 10)')
+    ap.add_argument('--dpi', type=int, default=100, help='(export mode) frame resolution (default 100)')
+    ap.add_argument('--ffmpeg', default='ffmpeg', help='(export mode) ffmpeg executable')
+    ap.add_argument('--serve', nargs='?', type=int, const=8050, default=None, metavar='PORT',
+                    help='Serve ntn_dashboard.html and the simulation viewer with a tick-slice API '
+                         'on http://HOST:PORT/ (default port 8050)')
+    ap.add_argument('--host', default='127.0.0.1', help='(serve mode) address to bind (default 127.0.0.1)')
+    ap.add_argument('--model', nargs='?', const=MODEL_FILE, default=None, metavar='PKL',
+                    help='(GUI / export mode) overlay the predicted delays of a model trained by '
+                         f'ntn_mlm.py and show its error (default {MODEL_FILE})')
     args = ap.parse_args()
-
-    # locate CSV relative to script if not found at CWD
-    csv_path = args.csv
-    if not os.path.exists(csv_path):
-        alt = os.path.join(os.path.dirname(os.path.abspath(__file__)), args.csv)
-        if os.path.exists(alt):
-            csv_path = alt
-        else:
-            print(f'[error] CSV not found: {csv_path}')
-            print('        Run python3 simulation/NTN.py first to generate data.')
+    stream = args.format != 'table'
+    args.cli = args.cli or stream
+    log = sys.stderr if stream else sys.stdout     # keep a streamed export clean
+
+    # locate CSV (and model) relative to script if not found at CWD
+    csv_path = _locate(args.csv)
+    if csv_path is None:
+        print(f'[error] CSV not found: {args.csv}', file=log)
+        print('        Run python3 simulation/NTN.py first to generate data.', file=log)
+        sys.exit(1)
+    model_path = None
+    if args.model is not None:
+        model_path = _locate(args.model)
+        if model_path is None:
+            print(f'[error] No saved model found at {args.model}.', file=log)
+            print('        Run python3 ntn_mlm.py first to train and save one.', file=log)
             sys.exit(1)
 
-    print(f'Loading {csv_path} …')
-    sim_nums, tick_data, pos_data, time_data = load_data(csv_path)
-    print(f'  Found {len(sim_nums)} simulation run(s): {sim_nums}')
+    print(f'Loading {csv_path} …', file=log)
+    tail = CsvTail(csv_path) if args.follow is not None and not (args.cli or args.export or args.serve is not None) else None
+    sim_nums, tick_data, pos_data, time_data, runs = load_data(csv_path, tail, cache=not args.no_cache)
+    while tail is not None and not sim_nums:
+        print('  No rows yet — waiting for NTN.py to write some …')
+        time.sleep(args.follow)
+        cols = tail.read()
+        if cols is not None:
+            merge_rows(cols, sim_nums, tick_data, pos_data, time_data, runs)
+    print(f'  Found {len(sim_nums)} simulation run(s): {sim_nums}', file=log)
 
     # optionally filter to a single sim
     if args.sim is not None:
         if args.sim not in sim_nums:
-            print(f'[error] Simulation run #{args.sim} not found. Available: {sim_nums}')
+            print(f'[error] Simulation run #{args.sim} not found. Available: {sim_nums}', file=log)
             sys.exit(1)
         sim_nums  = [args.sim]
         tick_data = {args.sim: tick_data[args.sim]}
         pos_data  = {args.sim: pos_data[args.sim]}
         time_data = {args.sim: time_data[args.sim]}
 
+    if stream:
+        sys.stdout.flush()
+        try:
+            with open(sys.stdout.fileno(), 'w', buffering=1 << 20, encoding='utf-8',
+                      newline='', closefd=False) as out:
+                write_records(out, runs, sim_nums, args.format, tick_filter=args.tick)
+        except BrokenPipeError:
+            # reader went away (e.g. | head): silence the interpreter's own flush at exit
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return
+
     if args.cli:
-        print_cli(sim_nums, tick_data, pos_data, time_data, tick_filter=args.tick)
+        print_cli(sim_nums, tick_data, pos_data, time_data, runs, tick_filter=args.tick)
+        return
+
+    if args.serve is not None:
+        serve({sim: runs[sim] for sim in sim_nums}, args.host, args.serve)
+        return
+
+    if args.export:
+        export_frames(csv_path, (sim_nums, tick_data, pos_data, time_data, runs), args.export,
+                      tick_range=_parse_range(args.ticks), workers=args.workers,
+                      fps=args.fps, dpi=args.dpi, ffmpeg=args.ffmpeg, model_path=model_path)
         return
 
     # ── GUI mode ──────────────────────────────────────────────────────────────
     print('Opening dashboard … (close the window to exit)')
-    matplotlib.rcParams.update({
-        'figure.facecolor': BG,
-        'axes.facecolor':   PANEL,
-        'text.color':       TEXT,
-        'xtick.color':      MUTED,
-        'ytick.color':      MUTED,
-        'axes.edgecolor':   BORDER,
-        'grid.color':       BORDER,
-        'font.family':      'monospace',
-    })
-    NTNDashboard(sim_nums, tick_data, pos_data, time_data)
+    _apply_theme()
+    model = None
+    if model_path:
+        model = DelayModel(model_path)
+        print(f'Overlaying predictions of {model_path} (version {model.version})')
+    dash = NTNDashboard(sim_nums, tick_data, pos_data, time_data, runs, model=model)
+    if tail is not None:
+        print(f'Following {csv_path} every {args.follow:g} s')
+        dash.follow(tail, args.follow, sim=args.sim)
     plt.show()
 
 
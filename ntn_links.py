@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+ntn_links.py  —  NTN link model shared by every tool
+=====================================================
+The one definition of link distance, delay, jitter and visibility. It is used
+by simulation/NTN.py, ntn_mlm.py, ntn_dashboard.py and
+namespace-network/attempt-to-link.py, so a link gets the same numbers in the
+simulation, the training data, the dashboard and the namespaces.
+
+Every function takes numpy arrays (any shape, broadcast together) and returns
+an array of the same shape; plain floats work too. Call them once per tick or
+per run, not once per link. jitter_ms() is the exception: netem wants it per
+link, so a float gets a float back without going through numpy.
+
+  distance(x1, y1, x2, y2)               planar distance between two positions
+  pairwise_distance(x, y)                (..., N, N) distances between N nodes
+  delay_ms(alt_a, alt_b, x1, y1, x2, y2) one-way delay (ms), DELAY_DECIMALS places
+  jitter_ms(delay)                       netem jitter (ms) for a delay
+  visible(dist, max_range)               in range; a max_range of 0 never sees
+
+Dependencies : numpy
+"""
+
+import numpy as np
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 1.  MODEL CONSTANTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# delay = average altitude * ALT_MS_PER_KM + distance * DIST_MS_PER_UNIT.
+# Both factors are placeholders until a measured model replaces them.
+ALT_MS_PER_KM    = 8
+DIST_MS_PER_UNIT = 0.05
+DELAY_DECIMALS   = 1        # what tc netem is given and the dashboard shows
+
+JITTER_FRACTION  = 0.05     # 5% of the delay
+
+_SCALE = 10 ** DELAY_DECIMALS
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 2.  METRICS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _round(v):
+    # scale, round half to even, unscale: exactly np.round(v, DELAY_DECIMALS),
+    # with a pure-Python path that gives the same float for scalars
+    if isinstance(v, (float, int)):
+        return round(v * _SCALE) / _SCALE
+    return np.rint(np.multiply(v, _SCALE)) / _SCALE
+
+
+def distance(x1, y1, x2, y2):
+    """Planar distance from (x1, y1) to (x2, y2)."""
+    return np.hypot(np.subtract(x2, x1), np.subtract(y2, y1))
+
+
+def pairwise_distance(x, y):
+    """x, y : (..., N) node positions -> (..., N, N) distance of every node pair."""
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    return np.hypot(x[..., :, None] - x[..., None, :], y[..., :, None] - y[..., None, :])
+
+
+def delay_ms(alt_a, alt_b, x1, y1, x2, y2):
+    """One-way delay of the link between a at (x1, y1) and b at (x2, y2)."""
+    avg_alt = np.add(alt_a, alt_b) / 2
+    return _round(avg_alt * ALT_MS_PER_KM + distance(x1, y1, x2, y2) * DIST_MS_PER_UNIT)
+
+
+def jitter_ms(delay):
+    """netem jitter for a link delay (same rounding as the delay)."""
+    if isinstance(delay, (float, int)):
+        return _round(delay * JITTER_FRACTION)
+    return _round(np.multiply(delay, JITTER_FRACTION))
+
+
+def visible(dist, max_range):
+    """True where dist is within max_range; pairs with no range (0) never see each other."""
+    max_range = np.asarray(max_range)
+    return (max_range > 0) & (np.asarray(dist) <= max_range)
@@ -8,6 +8,7 @@ predict ONE-TICK-AHEAD link delay (ms), evaluates performance, and saves the
 trained model for integration into the routing pipeline.
 
 Dependencies : numpy, pandas  (stdlib only — no scikit-learn required)
+               pandas is only imported to train; --predict needs numpy alone.
 
 Usage
 -----
@@ -26,7 +27,8 @@ import sys
 from collections import defaultdict
 
 import numpy as np
-import pandas as pd
+
+import ntn_links
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -141,20 +143,29 @@ def compute_phases():
     return phases
 
 
-def compute_delay_ms(alt_a, alt_b, x1, y1, x2, y2):
-    """
-    One-way link delay estimate.
-    Matches compute_delay_ms() in namespace-network/attempt-to-link.py.
-    """
-    dist     = math.hypot(x2 - x1, y2 - y1)
-    avg_alt  = (alt_a + alt_b) / 2
-    return round(avg_alt * 8 + dist * 0.05, 2)
+# Link delay and visibility come from ntn_links.py, the model every tool shares
+# (so training targets match what attempt-to-link.py applies). Array in, array out.
+compute_delay_ms = ntn_links.delay_ms
 
+SAT_NAMES  = list(SAT_INFO)
+LINK_A     = np.array([SAT_NAMES.index(a) for a, _ in TOPOLOGY])
+LINK_B     = np.array([SAT_NAMES.index(b) for _, b in TOPOLOGY])
+LINK_RANGE = np.array([RANGE_MAP.get(link, 0) for link in TOPOLOGY], dtype=float)
+SAT_ALT    = np.array([SAT_INFO[s][0] for s in SAT_NAMES], dtype=float)
+LINK_TYPE_ENC = np.array([LINK_TYPE.get(link, 2) for link in TOPOLOGY], dtype=float)
 
-def link_is_up(a, b, pos_a, pos_b):
-    """True when the two satellites are within visibility range."""
-    key = tuple(sorted([a, b]))
-    return math.hypot(pos_a[0] - pos_b[0], pos_a[1] - pos_b[1]) <= RANGE_MAP.get(key, 0)
+
+def link_geometry(xy):
+    """
+    xy : (..., n_sats, 2) positions in SAT_NAMES order
+    -> distance, up (within range) and delay (ms) of every TOPOLOGY link, (..., n_links)
+    """
+    x_a, y_a = xy[..., LINK_A, 0], xy[..., LINK_A, 1]
+    x_b, y_b = xy[..., LINK_B, 0], xy[..., LINK_B, 1]
+    dist  = ntn_links.distance(x_a, y_a, x_b, y_b)
+    up    = ntn_links.visible(dist, LINK_RANGE)
+    delay = compute_delay_ms(SAT_ALT[LINK_A], SAT_ALT[LINK_B], x_a, y_a, x_b, y_b)
+    return dist, up, delay
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -190,32 +201,34 @@ def generate_dataset(n_scenarios=30, ticks=120, speed_variation=0.15):
                 for sat in SAT_INFO
             }
 
+        # Distance, visibility and delay of every link at every tick, in one pass
+        dist, up, delay = (a.tolist() for a in link_geometry(
+            np.array([[tick_pos[t][s] for s in SAT_NAMES] for t in range(ticks)])))
+
         # Build link-level rows: features at tick t, target at tick t+1
         for tick in range(ticks - 1):
             pos_cur  = tick_pos[tick]
             pos_next = tick_pos[tick + 1]
 
-            for (a, b) in TOPOLOGY:
+            for li, (a, b) in enumerate(TOPOLOGY):
                 alt_a, alt_b = SAT_INFO[a][0], SAT_INFO[b][0]
 
                 # ── current-tick values ──────────────────────────────────────
                 x_a,  y_a  = pos_cur[a]
                 x_b,  y_b  = pos_cur[b]
-                dist_cur   = math.hypot(x_a - x_b, y_a - y_b)
-                up_cur     = link_is_up(a, b, pos_cur[a],  pos_cur[b])
-                delay_cur  = (compute_delay_ms(alt_a, alt_b, x_a, y_a, x_b, y_b)
-                              if up_cur else 0.0)
+                dist_cur   = dist[tick][li]
+                up_cur     = up[tick][li]
+                delay_cur  = delay[tick][li] if up_cur else 0.0
 
                 # ── next-tick values (TARGET) ────────────────────────────────
                 x_an, y_an = pos_next[a]
                 x_bn, y_bn = pos_next[b]
-                up_next    = link_is_up(a, b, pos_next[a], pos_next[b])
 
-                if not up_next:
+                if not up[tick + 1][li]:
                     continue   # skip: target delay undefined when link is down
 
-                delay_next = compute_delay_ms(alt_a, alt_b, x_an, y_an, x_bn, y_bn)
-                dist_next  = math.hypot(x_an - x_bn, y_an - y_bn)
+                delay_next = delay[tick + 1][li]
+                dist_next  = dist[tick + 1][li]
 
                 # ── velocity components (Δposition / tick) ──────────────────
                 dx_a = x_an - x_a;  dy_a = y_an - y_a
@@ -257,6 +270,8 @@ def generate_dataset(n_scenarios=30, ticks=120, speed_variation=0.15):
                     "delay_next":  delay_next,
                 })
 
+    import pandas as pd     # training only: --predict starts without it
+
     df = pd.DataFrame(records)
     print(f"  Generated {len(df):,} samples  |  "
           f"{df['link'].nunique()} links  |  "
@@ -339,15 +354,23 @@ class DecisionTreeRegressor:
 
     # ── inference ─────────────────────────────────────────────────────────────
 
-    def _predict_row(self, x, node):
-        if node.value is not None:
-            return node.value
-        return (self._predict_row(x, node.left)
-                if x[node.feat] <= node.thresh
-                else self._predict_row(x, node.right))
-
     def predict(self, X):
-        return np.array([self._predict_row(x, self.root) for x in X])
+        # route every row down the tree together: one comparison per node
+        # (not per row and node), so a batch costs about as much as one row
+        X    = np.asarray(X, dtype=float)
+        pred = np.empty(len(X))
+        todo = [(self.root, np.arange(len(X)))]
+        while todo:
+            node, rows = todo.pop()
+            if not len(rows):
+                continue
+            if node.value is not None:
+                pred[rows] = node.value
+                continue
+            left = X[rows, node.feat] <= node.thresh
+            todo.append((node.left,  rows[left]))
+            todo.append((node.right, rows[~left]))
+        return pred
 
 
 class GradientBoostingRegressor:
@@ -541,9 +564,21 @@ def save(model, path=MODEL_FILE):
     size_kb = os.path.getsize(path) / 1024
     print(f"\n  Model saved → {path}  ({size_kb:.1f} KB)")
 
+class _ModelUnpickler(pickle.Unpickler):
+    """
+    Models trained via `python3 ntn_mlm.py` are pickled with their classes
+    under `__main__`; resolve those against this module so the bundle also
+    loads when ntn_mlm is imported (e.g. from attempt-to-link.py).
+    """
+
+    def find_class(self, module, name):
+        if module == "__main__":
+            return getattr(sys.modules[__name__], name)
+        return super().find_class(module, name)
+
 def load(path=MODEL_FILE):
     with open(path, "rb") as f:
-        return pickle.load(f)
+        return _ModelUnpickler(f).load()
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -551,6 +586,58 @@ def load(path=MODEL_FILE):
 #     Drop-in for use alongside attempt-to-link.py
 # ═══════════════════════════════════════════════════════════════════════════════
 
+def link_features(x_a, y_a, alt_a, x_b, y_b, alt_b, links, tick):
+    """
+    FEATURES matrix for link states seen one tick at a time (no previous
+    tick, so the velocity features are 0).
+
+    Every argument broadcasts to one shape — a tick's links, or ticks × links
+    of a whole run — and gives one row per element, in C order. links
+    indexes TOPOLOGY; tick is the current tick number.
+    """
+    x_a, y_a, alt_a, x_b, y_b, alt_b, links, tick = (
+        np.ravel(a) for a in np.broadcast_arrays(x_a, y_a, alt_a, x_b, y_b, alt_b, links, tick))
+    x_a, y_a, alt_a, x_b, y_b, alt_b = (
+        a.astype(float) for a in (x_a, y_a, alt_a, x_b, y_b, alt_b))
+
+    dist    = ntn_links.distance(x_a, y_a, x_b, y_b)
+    up      = ntn_links.visible(dist, LINK_RANGE[links])
+    delay_c = np.where(up, compute_delay_ms(alt_a, alt_b, x_a, y_a, x_b, y_b), 0.0)
+    rel_x   = x_a - x_b
+    rel_y   = y_a - y_b
+    # velocity unknown without previous tick → zeros (dx/dy of a and b, relative, approach)
+    zeros   = np.zeros(len(links))
+
+    return np.column_stack([
+        x_a,  y_a,  alt_a,
+        x_b,  y_b,  alt_b,
+        dist,
+        (alt_a + alt_b) / 2,  np.abs(alt_a - alt_b),
+        rel_x,  rel_y,
+        np.arctan2(rel_y, rel_x),
+        zeros, zeros,
+        zeros, zeros,
+        zeros, zeros,
+        zeros,
+        up.astype(float),  delay_c,
+        LINK_TYPE_ENC[links],
+        tick.astype(float),
+    ])
+
+
+def predict_delays(model, x_a, y_a, alt_a, x_b, y_b, alt_b, links, tick):
+    """
+    Next-tick delay (ms, >= 0) of every link state given, in one batched
+    model.predict call. Arguments as for link_features(); the result has
+    their broadcast shape.
+    """
+    shape = np.broadcast_shapes(*(np.shape(a) for a in (x_a, y_a, alt_a, x_b, y_b, alt_b, links, tick)))
+    if not np.prod(shape):
+        return np.zeros(shape)
+    X = link_features(x_a, y_a, alt_a, x_b, y_b, alt_b, links, tick)
+    return np.maximum(model.predict(X), 0.0).reshape(shape)
+
+
 def predict_next_tick(sat_states, model, tick=0):
     """
     Predict link delays for the NEXT tick given the current tick's sat states.
@@ -569,48 +656,18 @@ def predict_next_tick(sat_states, model, tick=0):
     -------
     dict  { "SatA-SatB": predicted_delay_ms }
     """
-    rows = []
-    link_keys = []
-
-    for (a, b) in TOPOLOGY:
-        if a not in sat_states or b not in sat_states:
-            continue
-        sa, sb = sat_states[a], sat_states[b]
-        x_a, y_a, alt_a = sa["x"], sa["y"], sa["alt"]
-        x_b, y_b, alt_b = sb["x"], sb["y"], sb["alt"]
-
-        dist    = math.hypot(x_a - x_b, y_a - y_b)
-        up      = link_is_up(a, b, (x_a, y_a), (x_b, y_b))
-        delay_c = compute_delay_ms(alt_a, alt_b, x_a, y_a, x_b, y_b) if up else 0.0
-        rel_x   = x_a - x_b
-        rel_y   = y_a - y_b
-        # velocity unknown without previous tick → zeros
-        dx_a = dy_a = dx_b = dy_b = 0.0
-        approach = 0.0
-
-        rows.append([
-            x_a,  y_a,  alt_a,
-            x_b,  y_b,  alt_b,
-            dist,
-            (alt_a + alt_b) / 2,  abs(alt_a - alt_b),
-            rel_x,  rel_y,
-            math.atan2(rel_y, rel_x),
-            dx_a,  dy_a,
-            dx_b,  dy_b,
-            dx_a - dx_b,  dy_a - dy_b,
-            approach,
-            int(up),  delay_c,
-            float(LINK_TYPE.get((a, b), 2)),
-            float(tick),
-        ])
-        link_keys.append(f"{a}-{b}")
-
-    if not rows:
+    # every link with both ends in this tick, predicted in one batch
+    links = [l for l, (a, b) in enumerate(TOPOLOGY) if a in sat_states and b in sat_states]
+    if not links:
         return {}
-
-    X    = np.array(rows, dtype=float)
-    pred = model.predict(X)
-    return {k: max(0.0, round(float(p), 1)) for k, p in zip(link_keys, pred)}
+    link_keys = [f"{TOPOLOGY[l][0]}-{TOPOLOGY[l][1]}" for l in links]
+    sa = [sat_states[TOPOLOGY[l][0]] for l in links]
+    sb = [sat_states[TOPOLOGY[l][1]] for l in links]
+    x_a, y_a, alt_a = (np.array([s[k] for s in sa], dtype=float) for k in ("x", "y", "alt"))
+    x_b, y_b, alt_b = (np.array([s[k] for s in sb], dtype=float) for k in ("x", "y", "alt"))
+
+    pred = predict_delays(model, x_a, y_a, alt_a, x_b, y_b, alt_b, np.array(links), tick)
+    return {k: round(float(p), 1) for k, p in zip(link_keys, pred)}
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
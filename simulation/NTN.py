@@ -1,7 +1,13 @@
 import csv
-import math
 import os
 import random
+import sys
+
+import numpy as np
+
+# ntn_links.py (the link model shared with ntn_mlm.py, the dashboard and the applier) is one level up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ntn_links
 
 class NTN:
     def __init__(self, satellites, ground_stations, planet):    
@@ -98,9 +104,6 @@ CSV_PATH = "simulation results.csv"
 def clamp(value, low, high):
     return max(low, min(value, high))
 
-def distance(a, b):
-    return math.hypot(a[0] - b[0], a[1] - b[1])
-
 def get_next_sim_number(csv_path):
     if not os.path.exists(csv_path):
         return 1
@@ -125,7 +128,8 @@ def place_ground_stations(planet_size_area):
     h2_post = [300, 250]
     return h1_pos, h2_post
 
-def can_see_sat_sat(sat_a, sat_b):
+def can_see_sat_sat(sat_a, sat_b, dist):
+    # dist: distance between the two satellites this tick
     # Get orbital layers based on altitude
     def get_layer(alt):
         if alt == 5:
@@ -150,7 +154,7 @@ def can_see_sat_sat(sat_a, sat_b):
             names = {sat_a.name, sat_b.name}
             if "Sat2" in names and "Sat3" in names:
                 max_range = 200
-                return distance(sat_a.position, sat_b.position) <= max_range
+                return bool(ntn_links.visible(dist, max_range))
             else:
                 return False
                 
@@ -160,7 +164,7 @@ def can_see_sat_sat(sat_a, sat_b):
             # Allow Sat4-Sat5 and Sat5-Sat6 (your actual connections)
             if ("Sat4" in names and "Sat5" in names) or ("Sat5" in names and "Sat6" in names):
                 max_range = 180
-                return distance(sat_a.position, sat_b.position) <= max_range
+                return bool(ntn_links.visible(dist, max_range))
             # Do NOT allow Sat4-Sat6 direct connection
             elif "Sat4" in names and "Sat6" in names:
                 return False
@@ -177,7 +181,7 @@ def can_see_sat_sat(sat_a, sat_b):
             names = {sat_a.name, sat_b.name}
             if "Sat1" in names and ("Sat2" in names or "Sat3" in names):
                 max_range = 250
-                return distance(sat_a.position, sat_b.position) <= max_range
+                return bool(ntn_links.visible(dist, max_range))
             else:
                 return False
         
@@ -190,12 +194,12 @@ def can_see_sat_sat(sat_a, sat_b):
             # Sat2 with Sat4 or Sat5
             if "Sat2" in names and ("Sat4" in names or "Sat5" in names):
                 max_range = 220
-                return distance(sat_a.position, sat_b.position) <= max_range
+                return bool(ntn_links.visible(dist, max_range))
             
             # Sat3 with Sat5 or Sat6
             elif "Sat3" in names and ("Sat5" in names or "Sat6" in names):
                 max_range = 220
-                return distance(sat_a.position, sat_b.position) <= max_range
+                return bool(ntn_links.visible(dist, max_range))
             
             # Do NOT allow Sat2-Sat6 or Sat3-Sat4 (these don't exist in your network)
             else:
@@ -207,7 +211,8 @@ def can_see_sat_sat(sat_a, sat_b):
     
     return False
 
-def can_see_sat_ground(sat, ground_pos, host_positions, ground_name):
+def can_see_sat_ground(sat, dist, ground_name):
+    # dist: distance from the satellite to the ground station this tick
     # Only specific low-orbit satellites can see specific ground stations
     if sat.orbit.altitude != 5:  # Only altitude 5 satellites
         return False
@@ -215,12 +220,12 @@ def can_see_sat_ground(sat, ground_pos, host_positions, ground_name):
     # Sat4 can only see Host1
     if sat.name == "Sat4" and ground_name == "Host1":
         max_range = 150
-        return distance(sat.position, ground_pos) <= max_range
+        return bool(ntn_links.visible(dist, max_range))
     
     # Sat6 can only see Host2
     elif sat.name == "Sat6" and ground_name == "Host2":
         max_range = 150
-        return distance(sat.position, ground_pos) <= max_range
+        return bool(ntn_links.visible(dist, max_range))
     
     # Sat5 can never see any ground station
     # Any other combination is invalid
@@ -283,19 +288,24 @@ def main():
             orbit_phase[sat.name] = i * step
 
     write_header = not os.path.exists(CSV_PATH)
+    fieldnames = [
+        "sim_number",
+        "time_s",
+        "tick",
+        "sat_name",
+        "orbit_altitude",
+        "orbit_speed",
+        "x",
+        "y",
+        "can_see",
+        "bandwidth_mbps",
+    ]
+    if not write_header:
+        # keep appending in the layout the file already has (older files have no bandwidth column)
+        with open(CSV_PATH, newline="") as f:
+            fieldnames = next(csv.reader(f), fieldnames)
     with open(CSV_PATH, "a", newline="") as f:
-        fieldnames = [
-            "sim_number",
-            "time_s",
-            "tick",
-            "sat_name",
-            "orbit_altitude",
-            "orbit_speed",
-            "x",
-            "y",
-            "can_see",
-        ]
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
         if write_header:
             writer.writeheader()
 
@@ -311,15 +321,21 @@ def main():
                 sat.position[0] = clamp(sat.position[0], 0, ntn.grid_size)
                 sat.position[1] = clamp(sat.position[1], 0, ntn.grid_size)
 
-            for sat in satellites:
+            # every satellite / ground-station distance this tick in one array call
+            nodes = [sat.position for sat in satellites] + list(host_positions.values())
+            xs, ys = np.array(nodes, dtype=float).T
+            dist = ntn_links.pairwise_distance(xs, ys).tolist()
+            n_sats = len(satellites)
+
+            for i, sat in enumerate(satellites):
                 visible = []
-                for other in satellites:
+                for j, other in enumerate(satellites):
                     if other is sat:
                         continue
-                    if can_see_sat_sat(sat, other):
+                    if can_see_sat_sat(sat, other, dist[i][j]):
                         visible.append(other.name)
-                for host_name, host_pos in host_positions.items():
-                    if can_see_sat_ground(sat, host_pos, host_positions, host_name):
+                for j, host_name in enumerate(host_positions, start=n_sats):
+                    if can_see_sat_ground(sat, dist[i][j], host_name):
                         visible.append(host_name)
 
                 print(
@@ -338,7 +354,10 @@ def main():
                     "x": f"{sat.position[0]:.6f}",
                     "y": f"{sat.position[1]:.6f}",
                     "can_see": ",".join(visible),
+                    "bandwidth_mbps": sat.links[0].bandwidth if sat.links else "",
                 })
+            # whole ticks reach the file as they finish (ntn_dashboard.py --follow)
+            f.flush()
 
 
 